@@ -0,0 +1,83 @@
+"""Benchmarks on reading multiple FISPACT flux files.
+
+See https://pytest-benchmark.readthedocs.io/en/latest/index.html
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from xpypact.fluxes import print_709_fluxes, read_709_fluxes, read_fluxes_many
+from xpypact.utils.xpypact_io import print_cols
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from xpypact.fluxes import Fluxes
+
+FILES_NUMBER = 2000
+HERE = Path(__file__).parent
+FLUXES_TEXT = (HERE.parent / "tests/data/fluxes_1").read_bytes()
+
+
+@pytest.fixture(scope="module")
+def flux_paths(tmp_path_factory: pytest.TempPathFactory) -> list[Path]:
+    """Create many copies of a 709-group flux file."""
+    directory = tmp_path_factory.mktemp("fluxes")
+    paths = [directory / f"fluxes_{i}" for i in range(FILES_NUMBER)]
+    for path in paths:
+        path.write_bytes(FLUXES_TEXT)
+    return paths
+
+
+def _read_in_loop(paths: list[Path]) -> np.ndarray:
+    return np.stack([read_709_fluxes(path).fluxes for path in paths])
+
+
+def test_read_709_fluxes_in_loop(benchmark: Callable, flux_paths: list[Path]) -> None:
+    """Reading with read_709_fluxes file by file."""
+    fluxes = benchmark(_read_in_loop, flux_paths)
+    assert fluxes.shape == (FILES_NUMBER, 709)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_read_fluxes_many(benchmark: Callable, flux_paths: list[Path], workers: int) -> None:
+    """Reading with read_fluxes_many."""
+    _, fluxes, _, _ = benchmark(read_fluxes_many, flux_paths, workers=workers)
+    assert fluxes.shape == (FILES_NUMBER, 709)
+
+
+@pytest.fixture(scope="module")
+def fluxes_709() -> Fluxes:
+    """Load 709-group fluxes."""
+    return read_709_fluxes(FLUXES_TEXT.decode())
+
+
+def _print_per_value(fluxes: Fluxes) -> str:
+    stream = StringIO()
+    if print_cols(fluxes.fluxes[::-1], stream, 7, fmt="{:.5e}") != 0:
+        print(file=stream)
+    print(fluxes.norm, file=stream)
+    print(fluxes.comment, file=stream, end="")
+    return stream.getvalue()
+
+
+def _print_at_once(fluxes: Fluxes) -> str:
+    stream = StringIO()
+    print_709_fluxes(fluxes, stream)
+    return stream.getvalue()
+
+
+@pytest.mark.parametrize("printer", [_print_per_value, _print_at_once])
+def test_print_709_fluxes(
+    benchmark: Callable, fluxes_709: Fluxes, printer: Callable[[Fluxes], str]
+) -> None:
+    """Printing value by value with print_cols vs. formatting at once."""
+    text = benchmark(printer, fluxes_709)
+    assert text == _print_per_value(fluxes_709)
@@ -0,0 +1,30 @@
+"""Benchmarks on the package import time in a fresh interpreter.
+
+Short-lived worker processes import only some modules of xpypact.
+See https://pytest-benchmark.readthedocs.io/en/latest/index.html
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import subprocess
+import sys
+
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _import(module: str) -> None:
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True)  # noqa: S603
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["numpy", "xpypact", "xpypact.fluxes", "xpypact.inventory", "xpypact.collector"],
+)
+def test_import(benchmark: Callable, module: str) -> None:
+    """Import of a module, numpy is the baseline."""
+    benchmark(_import, module)
@@ -1,37 +1,132 @@
 """The `xpypact` package.
 
 Wraps FISPACT workflow. Transforms FISPACT output to Polars and duckdb datasets.
+
+The classes and the package metadata are loaded on first access,
+so, the processes using only some of the modules, for example, `xpypact.fluxes`,
+don't pay for importing Polars and reading the package metadata.
 """
 
 from __future__ import annotations
 
-from importlib import metadata as _meta
-from importlib.metadata import PackageNotFoundError, version
-
-from .collector import (
-    FullDataCollector,
-    GammaSchema,
-    NuclideSchema,
-    RunDataSchema,
-    TimeStepNuclideSchema,
-    TimeStepSchema,
-)
-from .inventory import Inventory, RunDataCorrected
-from .nuclide import Nuclide, NuclideInfo
-from .time_step import DoseRate, GammaSpectrum, TimeStep
-
-try:
-    __version__ = version(__name__)
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "unknown"
-
-__distribution__ = _meta.distribution(__name__)
-__meta_data__ = __distribution__.metadata
-__author__ = __meta_data__["Author"]
-__author_email__ = __meta_data__["Author-email"]
-__license__ = __meta_data__["License"]
-__summary__ = __meta_data__["Summary"]
-__copyright__ = f"Copyright 2021 {__author__}"
+from typing import TYPE_CHECKING, Any
+
+from importlib import import_module
+
+if TYPE_CHECKING:
+    from importlib.metadata import Distribution, PackageMetadata
+
+    from .collector import (
+        FullDataCollector,
+        GammaSchema,
+        NuclideSchema,
+        RunDataSchema,
+        TimeStepNuclideSchema,
+        TimeStepSchema,
+    )
+    from .inventory import Inventory, RunDataCorrected
+    from .nuclide import Nuclide, NuclideInfo
+    from .time_step import DoseRate, GammaSpectrum, TimeStep
+
+    __version__: str
+    __distribution__: Distribution
+    __meta_data__: PackageMetadata
+    __author__: str
+    __author_email__: str
+    __license__: str
+    __summary__: str
+    __copyright__: str
+
+_LAZY_ATTRIBUTES = {
+    "DoseRate": "time_step",
+    "FullDataCollector": "collector",
+    "GammaSchema": "collector",
+    "GammaSpectrum": "time_step",
+    "Inventory": "inventory",
+    "Nuclide": "nuclide",
+    "NuclideInfo": "nuclide",
+    "NuclideSchema": "collector",
+    "RunDataCorrected": "inventory",
+    "RunDataSchema": "collector",
+    "TimeStep": "time_step",
+    "TimeStepNuclideSchema": "collector",
+    "TimeStepSchema": "collector",
+}
+
+_METADATA_ATTRIBUTES = {
+    "__version__",
+    "__distribution__",
+    "__meta_data__",
+    "__author__",
+    "__author_email__",
+    "__license__",
+    "__summary__",
+    "__copyright__",
+}
+
+
+def _load_metadata() -> dict[str, Any]:
+    from importlib import metadata as _meta  # noqa: PLC0415 - slow, load on demand
+
+    try:
+        _version = _meta.version(__name__)
+    except _meta.PackageNotFoundError:  # pragma: no cover
+        _version = "unknown"
+
+    _distribution = _meta.distribution(__name__)
+    _meta_data = _distribution.metadata
+    _author = _meta_data["Author"]
+    return {
+        "__version__": _version,
+        "__distribution__": _distribution,
+        "__meta_data__": _meta_data,
+        "__author__": _author,
+        "__author_email__": _meta_data["Author-email"],
+        "__license__": _meta_data["License"],
+        "__summary__": _meta_data["Summary"],
+        "__copyright__": f"Copyright 2021 {_author}",
+    }
+
+
+def __getattr__(name: str) -> object:
+    """Load the package attributes on first access.
+
+    Parameters
+    ----------
+    name
+        attribute name
+
+    Returns
+    -------
+    the attribute value
+
+    Raises
+    ------
+    AttributeError: if there's no such attribute
+    """
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is not None:
+        value = getattr(import_module(f".{module}", __name__), name)
+    elif name in _METADATA_ATTRIBUTES:
+        metadata = _load_metadata()
+        globals().update(metadata)
+        value = metadata[name]
+    else:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the package attributes including not loaded yet.
+
+    Returns
+    -------
+    sorted attribute names
+    """
+    return sorted(set(globals()) | set(__all__))
+
 
 __all__ = [
     "DoseRate",
@@ -0,0 +1,272 @@
+"""Aggregate nuclide quantities.
+
+Sums by element or by element and mass number:
+the atomic number Z and mass number A are decoded from zai arithmetically,
+zai = Z * 10000 + A * 10 + state. So, no join with the nuclide table is required.
+
+Dominant nuclides: the top contributors to a quantity in every time step.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, overload
+
+import numpy as np
+import polars as pl
+
+from xpypact.inventory import Inventory
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+NUCLIDE_KEYS = ["material_id", "case_id", "time_step_number", "zai"]
+"""Key columns of timestep_nuclide table."""
+
+NUCLIDE_QUANTITIES = [
+    "atoms",
+    "grams",
+    "activity",
+    "alpha_activity",
+    "beta_activity",
+    "gamma_activity",
+    "heat",
+    "alpha_heat",
+    "beta_heat",
+    "gamma_heat",
+    "dose",
+    "ingestion",
+    "inhalation",
+]
+"""Additive quantities of timestep_nuclide table."""
+
+
+def z_from_zai(zai: pl.Expr | None = None) -> pl.Expr:
+    """Decode atomic number from zai.
+
+    Parameters
+    ----------
+    zai
+        expression for zai, default - column "zai"
+
+    Returns
+    -------
+    expression for Z named "z"
+    """
+    if zai is None:
+        zai = pl.col("zai")
+    return (zai // 10000).cast(pl.UInt8).alias("z")
+
+
+def a_from_zai(zai: pl.Expr | None = None) -> pl.Expr:
+    """Decode mass number from zai.
+
+    Parameters
+    ----------
+    zai
+        expression for zai, default - column "zai"
+
+    Returns
+    -------
+    expression for A named "a"
+    """
+    if zai is None:
+        zai = pl.col("zai")
+    return (zai // 10 % 1000).cast(pl.UInt16).alias("a")
+
+
+def aggregate_by_element[Frame: (pl.DataFrame, pl.LazyFrame)](
+    timestep_nuclide: Frame,
+    *,
+    by_mass_number: bool = False,
+    quantities: Iterable[str] | None = None,
+) -> Frame:
+    """Sum nuclide quantities by element in one pass.
+
+    The sums are computed in double precision and presented in the precision of the source.
+    The result for a LazyFrame is also lazy, so, it can be collected with streaming engine.
+
+    Parameters
+    ----------
+    timestep_nuclide
+        table in timestep_nuclide layout, the key columns other than zai are optional
+    by_mass_number
+        group by element and mass number
+    quantities
+        columns to sum, default - all the available nuclide quantities
+
+    Returns
+    -------
+    table with the available keys, z, [a], and the sums of the quantities sorted by the keys
+    """
+    schema = timestep_nuclide.collect_schema()
+    keys: list[str] = [c for c in NUCLIDE_KEYS[:-1] if c in schema]
+    groups = [*keys, "z", "a"] if by_mass_number else [*keys, "z"]
+    if quantities is None:
+        quantities = [c for c in NUCLIDE_QUANTITIES if c in schema]
+    sums = [pl.col(q).cast(pl.Float64).sum().cast(schema[q]) for q in quantities]
+    decoded = [z_from_zai(), a_from_zai()] if by_mass_number else [z_from_zai()]
+    return timestep_nuclide.with_columns(decoded).group_by(groups).agg(sums).sort(groups)
+
+
+DOMINANT_NUCLIDES_SCHEMA = {
+    "time_step_number": pl.UInt32,
+    "quantity": pl.String,
+    "rank": pl.UInt16,
+    "zai": pl.UInt32,
+    "value": pl.Float64,
+    "fraction": pl.Float64,
+    "cumulative_fraction": pl.Float64,
+}
+
+
+@overload
+def dominant_nuclides(
+    timestep_nuclide: pl.LazyFrame,
+    quantity: str | Iterable[str],
+    *,
+    top_n: int | None = 20,
+    cum_fraction: float | None = None,
+) -> pl.LazyFrame: ...
+
+
+@overload
+def dominant_nuclides(
+    timestep_nuclide: pl.DataFrame | Inventory,
+    quantity: str | Iterable[str],
+    *,
+    top_n: int | None = 20,
+    cum_fraction: float | None = None,
+) -> pl.DataFrame: ...
+
+
+def dominant_nuclides(
+    timestep_nuclide: pl.DataFrame | pl.LazyFrame | Inventory,
+    quantity: str | Iterable[str],
+    *,
+    top_n: int | None = 20,
+    cum_fraction: float | None = None,
+) -> pl.DataFrame | pl.LazyFrame:
+    """Select the top contributors to quantities in every time step.
+
+    The nuclides with positive values are ranked by value descending, then by zai.
+    A nuclide is selected, if its rank is not above top_n and the cumulative fraction
+    of the nuclides ranked above it is less than cum_fraction.
+    The fractions are relative to the quantity total over all the nuclides in a time step.
+    The ranking and columns are the same as in timestep_top_nuclides table
+    maintained by :func:`xpypact.dao.duckdb.save`, so, the results compare directly.
+
+    Parameters
+    ----------
+    timestep_nuclide
+        DataFrame or LazyFrame in timestep_nuclide layout
+        (the key columns other than zai are optional) or Inventory
+    quantity
+        name or names of the quantities, for example, "dose" or ["activity", "heat"]
+    top_n
+        max number of nuclides per time step and quantity, None - no limit
+    cum_fraction
+        cumulative fraction to cover, for example, 0.99, None - no limit
+
+    Returns
+    -------
+    long table: the available keys, quantity, rank, zai, value, fraction, cumulative_fraction,
+    lazy for LazyFrame
+    """
+    quantities = [quantity] if isinstance(quantity, str) else list(quantity)
+    if isinstance(timestep_nuclide, Inventory):
+        return _select_dominant_nuclides_in_inventory(
+            timestep_nuclide, quantities, top_n, cum_fraction
+        )
+    if isinstance(timestep_nuclide, pl.DataFrame):
+        return _select_dominant_nuclides(
+            timestep_nuclide.lazy(), quantities, top_n, cum_fraction
+        ).collect()
+    return _select_dominant_nuclides(timestep_nuclide, quantities, top_n, cum_fraction)
+
+
+def _select_dominant_nuclides_in_inventory(
+    inventory: Inventory,
+    quantities: list[str],
+    top_n: int | None,
+    cum_fraction: float | None,
+) -> pl.DataFrame:
+    columns: dict[str, list[np.ndarray]] = {name: [] for name in DOMINANT_NUCLIDES_SCHEMA}
+    for ts in inventory:
+        zai = np.fromiter((n.zai for n in ts.nuclides), dtype=np.uint32, count=len(ts.nuclides))
+        for q in quantities:
+            values = np.fromiter(
+                (getattr(n, q) for n in ts.nuclides), dtype=float, count=len(ts.nuclides)
+            )
+            order = np.lexsort((zai, -values))
+            values = values[order]
+            total = values.sum()
+            if total <= 0.0:
+                total = 1.0  # no positive values to select
+            cumulative_values = np.cumsum(values)
+            fractions = values / total
+            cumulative = cumulative_values / total
+            selected = values > 0.0
+            if top_n is not None:
+                selected[top_n:] = False
+            if cum_fraction is not None:
+                selected &= (cumulative_values - values) / total < cum_fraction
+            size = int(np.count_nonzero(selected))
+            columns["time_step_number"].append(np.full(size, ts.number))
+            columns["quantity"].append(np.full(size, q, dtype=object))
+            columns["rank"].append(np.arange(1, size + 1))
+            columns["zai"].append(zai[order][selected])
+            columns["value"].append(values[selected])
+            columns["fraction"].append(fractions[selected])
+            columns["cumulative_fraction"].append(cumulative[selected])
+    return pl.DataFrame(
+        [
+            pl.Series(name, np.concatenate(arrays) if arrays else [], dtype=dtype)
+            for (name, dtype), arrays in zip(
+                DOMINANT_NUCLIDES_SCHEMA.items(), columns.values(), strict=True
+            )
+        ],
+    )
+
+
+def _select_dominant_nuclides(
+    timestep_nuclide: pl.LazyFrame,
+    quantities: list[str],
+    top_n: int | None,
+    cum_fraction: float | None,
+) -> pl.LazyFrame:
+    schema = timestep_nuclide.collect_schema()
+    keys: list[str] = [c for c in NUCLIDE_KEYS[:-1] if c in schema]
+    partition: list[str] = [*keys, "quantity"]
+    ranked = (
+        timestep_nuclide.unpivot(
+            on=quantities,
+            index=[*keys, "zai"],
+            variable_name="quantity",
+            value_name="value",
+        )
+        .with_columns(
+            pl.col("quantity").cast(pl.Enum(quantities)),  # to sort in order of quantities
+            pl.col("value").cast(pl.Float64),
+        )
+        .with_columns(pl.col("value").sum().over(partition).alias("total"))
+        .filter(pl.col("value") > 0.0)
+        .sort([*partition, "value", "zai"], descending=[*[False] * len(partition), True, False])
+        .with_columns(
+            (pl.int_range(1, pl.len() + 1).over(partition)).cast(pl.UInt16).alias("rank"),
+            pl.col("value").cum_sum().over(partition).alias("cumulative_value"),
+        )
+    )
+    if top_n is not None:
+        ranked = ranked.filter(pl.col("rank") <= top_n)
+    if cum_fraction is not None:
+        previous = (pl.col("cumulative_value") - pl.col("value")) / pl.col("total")
+        ranked = ranked.filter(previous < cum_fraction)
+    return ranked.select(
+        *keys,
+        pl.col("quantity").cast(pl.String),
+        "rank",
+        "zai",
+        "value",
+        (pl.col("value") / pl.col("total")).alias("fraction"),
+        (pl.col("cumulative_value") / pl.col("total")).alias("cumulative_fraction"),
+    )
@@ -5,6 +5,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import datetime as dt
+import shutil
 import threading
 
 from collections import OrderedDict
@@ -14,13 +15,25 @@ import msgspec as ms
 import numpy as np
 import polars as pl
 
+from xpypact.aggregation import aggregate_by_element, dominant_nuclides
+from xpypact.derived import gamma_mids, with_derived
+from xpypact.flux_bank import FluxBank
+from xpypact.fluxes import InconsistentEnergyBinsError
+from xpypact.gamma import rebin_gamma
+from xpypact.gamma_source import GammaSourceBank
+from xpypact.interpolation import extrapolate_decay, interpolate_nuclides
+from xpypact.mixture import mix_result
+
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
     from pathlib import Path
 
     import numpy.typing as npt
 
+    from xpypact.gamma import GammaMeasure
     from xpypact.inventory import Inventory
     from xpypact.nuclide import NuclideInfo
+    from xpypact.xpypact_types import NDArrayFloat
 
 # pylint: disable=invalid-name
 
@@ -117,6 +130,9 @@ class FullDataCollector(ms.Struct):
     )
     nuclides: set[NuclideInfo] = ms.field(default_factory=set)
     gbins_boundaries: npt.NDArray[np.float64] | None = None
+    fluxes: list[FluxBank] = ms.field(default_factory=list)  # stacked in get_flux_tables
+    flux_case_ids: list[int] = ms.field(default_factory=list)
+    _flux_case_id_set: set[int] = ms.field(default_factory=set)
 
     def append(self, inventory: Inventory, material_id: int, case_id: int) -> FullDataCollector:
         """Append inventory to this collector.
@@ -139,6 +155,44 @@ class FullDataCollector(ms.Struct):
 
         return self
 
+    def append_fluxes(self, fluxes: FluxBank, case_ids: Sequence[int]) -> FullDataCollector:
+        """Append neutron spectra of cases to this collector.
+
+        Args:
+            fluxes: spectra sharing the energy bins with the spectra appended before
+            case_ids: case_id for every spectrum
+
+        Returns
+        -------
+        self - for chaining
+
+        Raises
+        ------
+        ValueError: if the number of case_ids differs from the number of spectra
+                    or a case_id is already appended.
+        InconsistentEnergyBinsError: if the energy bins differ from the appended before.
+        """
+        if len(case_ids) != len(fluxes):
+            msg = f"Expected {len(fluxes)} case_ids, got {len(case_ids)}"
+            raise ValueError(msg)
+        ids = [int(c) for c in case_ids]
+        with self.lock:
+            duplicates: set[int] = set()
+            batch: set[int] = set()
+            for c in ids:
+                if c in self._flux_case_id_set or c in batch:
+                    duplicates.add(c)
+                batch.add(c)
+            if duplicates:
+                msg = f"Spectra of the cases {sorted(duplicates)} are already appended"
+                raise ValueError(msg)
+            if self.fluxes and not np.array_equal(self.fluxes[0].energy_bins, fluxes.energy_bins):
+                raise InconsistentEnergyBinsError
+            self.fluxes.append(fluxes)
+            self.flux_case_ids.extend(ids)
+            self._flux_case_id_set.update(ids)
+        return self
+
     def _append_rundata(self, inventory: Inventory, material_id: int, case_id: int) -> None:
         rundata = inventory.meta_info
         st = strptime(rundata.timestamp, "%H:%M:%S %d %B %Y")
@@ -317,21 +371,12 @@ class FullDataCollector(ms.Struct):
         if self.timestep_gamma.is_empty():  # pragma: no cover
             return None
 
-        mids = pl.DataFrame(
-            (
-                (g + 1, m)
-                for g, m in enumerate(
-                    0.5 * (self.gbins_boundaries[:-1] + self.gbins_boundaries[1:]),  # type: ignore[index]
-                )
-            ),
-            schema={"g": pl.UInt8, "mid": pl.Float32},
-        ).lazy()
         # Convert
         ql = (
             self.timestep_gamma.lazy()
-            .join(mids, on="g")
-            .with_columns((pl.col("rate") / pl.col("mid")).alias("rate"))
-            .select(pl.all().exclude("mid"))
+            .join(gamma_mids(self.gbins_boundaries), on="g")  # type: ignore[arg-type]
+            .with_columns((pl.col("rate") / pl.col("gamma_mid")).alias("rate"))
+            .select(pl.all().exclude("gamma_mid"))
             .sort("material_id", "case_id", "time_step_number", "g", maintain_order=True)
             .set_sorted("material_id")
         )
@@ -351,8 +396,215 @@ class FullDataCollector(ms.Struct):
         timestep_nuclide: pl.DataFrame
         gbins: pl.DataFrame | None
         timestep_gamma: pl.DataFrame | None
+        flux: pl.DataFrame | None = None
+        flux_bins: pl.DataFrame | None = None
 
-        def save_to_parquets(self, out: Path, *, override: bool = False) -> None:
+        def timestep_element(
+            self,
+            *,
+            by_mass_number: bool = False,
+            lazy: bool = False,
+        ) -> pl.DataFrame | pl.LazyFrame:
+            """Sum nuclide quantities by element per material, case and time step.
+
+            See :func:`xpypact.aggregation.aggregate_by_element`.
+
+            Parameters
+            ----------
+            by_mass_number
+                group by element and mass number
+            lazy
+                return LazyFrame to collect later, for example, with streaming engine
+
+            Returns
+            -------
+            table with keys material_id, case_id, time_step_number, z, [a] and the sums
+            """
+            if lazy:
+                return aggregate_by_element(
+                    self.timestep_nuclide.lazy(), by_mass_number=by_mass_number
+                )
+            return aggregate_by_element(self.timestep_nuclide, by_mass_number=by_mass_number)
+
+        def dominant_nuclides(
+            self,
+            quantity: str | Sequence[str],
+            *,
+            top_n: int | None = 20,
+            cum_fraction: float | None = None,
+        ) -> pl.DataFrame:
+            """Select the top contributors to quantities per material, case and time step.
+
+            See :func:`xpypact.aggregation.dominant_nuclides`.
+
+            Parameters
+            ----------
+            quantity
+                name or names of the quantities, for example, "dose" or ["activity", "heat"]
+            top_n
+                max number of nuclides per time step and quantity, None - no limit
+            cum_fraction
+                cumulative fraction to cover, for example, 0.99, None - no limit
+
+            Returns
+            -------
+            long table: keys, quantity, rank, zai, value, fraction, cumulative_fraction
+            """
+            return dominant_nuclides(
+                self.timestep_nuclide, quantity, top_n=top_n, cum_fraction=cum_fraction
+            )
+
+        def interpolate_nuclides(self, cooling_times: Iterable[float]) -> pl.DataFrame:
+            """Interpolate nuclide quantities at the given cooling times.
+
+            See :func:`xpypact.interpolation.interpolate_nuclides`.
+
+            Parameters
+            ----------
+            cooling_times
+                seconds after the end of irradiation
+
+            Returns
+            -------
+            table in timestep_nuclide layout with cooling_time instead of time_step_number
+            """
+            return interpolate_nuclides(
+                self.timestep, self.timestep_nuclide, self.nuclide, cooling_times
+            )
+
+        def extrapolate_decay(
+            self,
+            cooling_times: Iterable[float],
+            *,
+            chains: pl.DataFrame | None = None,
+        ) -> pl.DataFrame:
+            """Extrapolate nuclide quantities beyond the last time step with decay only.
+
+            See :func:`xpypact.interpolation.extrapolate_decay`.
+
+            Parameters
+            ----------
+            cooling_times
+                seconds after the end of irradiation
+            chains
+                optional table with columns parent, daughter and branching_ratio
+
+            Returns
+            -------
+            synthetic time steps in timestep_nuclide layout with cooling_time, synthetic
+            and error_bound columns
+            """
+            return extrapolate_decay(
+                self.timestep, self.timestep_nuclide, self.nuclide, cooling_times, chains=chains
+            )
+
+        def mix(self, composition: pl.DataFrame) -> FullDataCollector.Result:
+            """Compose results of mixtures from the results of their components.
+
+            See :func:`xpypact.mixture.mix_result`.
+
+            Parameters
+            ----------
+            composition
+                mixture, material, fraction
+
+            Returns
+            -------
+            collected results of the mixtures
+            """
+            return mix_result(self, composition)
+
+        def with_derived(
+            self,
+            table: str,
+            quantities: Iterable[str] | None = None,
+        ) -> pl.LazyFrame:
+            """Add derived quantities to a table lazily.
+
+            See :mod:`xpypact.derived`.
+
+            Parameters
+            ----------
+            table
+                "timestep", "timestep_nuclide" or "timestep_gamma"
+            quantities
+                names of the derived quantities, None - all for the table
+
+            Returns
+            -------
+            lazy table with the quantities appended
+
+            Raises
+            ------
+            ValueError: if the table is not in the result.
+            """
+            frame: pl.DataFrame | None = getattr(self, table)
+            if frame is None:
+                msg = f"No {table} table in the result"
+                raise ValueError(msg)
+            return with_derived(
+                frame.lazy(), table, quantities, timestep=self.timestep, gbins=self.gbins
+            )
+
+        def rebin_gamma(
+            self,
+            target_bins: NDArrayFloat,
+            conserve: GammaMeasure = "energy",
+        ) -> pl.DataFrame | None:
+            """Rebin the gamma spectra to other group structure.
+
+            See :func:`xpypact.gamma.rebin_gamma`.
+
+            Parameters
+            ----------
+            target_bins
+                ascending boundaries of the target groups, MeV
+            conserve
+                "energy" - conserve the emitted energy, "photons" - the number of photons
+
+            Returns
+            -------
+            table in timestep_gamma layout over the target groups, photons/s,
+            None if there's no gamma
+            """
+            if self.timestep_gamma is None or self.gbins is None:
+                return None
+            return rebin_gamma(self.timestep_gamma, self.gbins, target_bins, conserve)
+
+        def gamma_sources(
+            self,
+            *,
+            selection: pl.DataFrame | None = None,
+            energy_bins: NDArrayFloat | None = None,
+        ) -> GammaSourceBank | None:
+            """Compute gamma source distributions for the time steps.
+
+            See :meth:`xpypact.gamma_source.GammaSourceBank.from_timestep_gamma`.
+
+            Parameters
+            ----------
+            selection
+                keys of the sources to compute, None - all
+            energy_bins
+                group structure of the sources, None - gbins
+
+            Returns
+            -------
+            the sources, None if there's no gamma
+            """
+            if self.timestep_gamma is None or self.gbins is None:
+                return None
+            return GammaSourceBank.from_timestep_gamma(
+                self.timestep_gamma, self.gbins, selection=selection, energy_bins=energy_bins
+            )
+
+        def save_to_parquets(
+            self,
+            out: Path,
+            *,
+            override: bool = False,
+            partition_by: Sequence[str] | None = None,
+        ) -> None:
             """Save collectd data as parquet files.
 
             Parameters
@@ -361,6 +613,9 @@ class FullDataCollector(ms.Struct):
                 directory where to save
             override
                 override existing files, default - raise exception
+            partition_by
+                columns to partition tables by, the tables containing all these columns
+                are saved as hive-partitioned datasets in directories <name>.parquet
 
             Raises
             ------
@@ -372,13 +627,47 @@ class FullDataCollector(ms.Struct):
                 if df is None:  # pragma: no cover
                     continue
                 dst = out / f"{name}.parquet"
-                if dst.exists() and not override:
-                    msg = f"File {dst} already exists and override is not specified."
-                    raise FileExistsError(msg)
-                df.write_parquet(dst)
+                if dst.exists():
+                    if not override:
+                        msg = f"File {dst} already exists and override is not specified."
+                        raise FileExistsError(msg)
+                    if dst.is_dir():
+                        shutil.rmtree(dst)
+                    else:
+                        dst.unlink()
+                if partition_by and all(c in df.columns for c in partition_by):
+                    df.write_parquet(dst, partition_by=list(partition_by))
+                else:
+                    df.write_parquet(dst)
+
+    def get_flux_tables(self) -> tuple[pl.DataFrame | None, pl.DataFrame | None]:
+        """Retrieve neutron spectra.
+
+        Returns
+        -------
+        flux table sorted by case_id, flux_bins table, see :meth:`FluxBank.to_tables`,
+        or None, None if there are no spectra
+        """
+        with self.lock:
+            if not self.fluxes:
+                return None, None
+            if len(self.fluxes) > 1:  # stack once, keep the result for the next calls
+                first = self.fluxes[0]
+                self.fluxes = [
+                    FluxBank(
+                        first.energy_bins,
+                        np.vstack([f.fluxes for f in self.fluxes]),
+                        [c for f in self.fluxes for c in f.comments],
+                        np.concatenate([f.norms for f in self.fluxes]),
+                    ),
+                ]
+            bank = self.fluxes[0]
+        flux, flux_bins = bank.to_tables(self.flux_case_ids)
+        return flux.sort("case_id", maintain_order=True).set_sorted("case_id"), flux_bins
 
     def get_result(self) -> FullDataCollector.Result:
         """Finish and present collected data."""
+        flux, flux_bins = self.get_flux_tables()
         return FullDataCollector.Result(
             rundata=self.rundata.sort("material_id", "case_id").set_sorted("material_id"),
             time_step_times=self._get_timestep_times(),
@@ -396,4 +685,6 @@ class FullDataCollector(ms.Struct):
             ).set_sorted("material_id"),
             gbins=self.get_gbins(),
             timestep_gamma=self.get_timestep_gamma_as_spectrum(),
+            flux=flux,
+            flux_bins=flux_bins,
         )
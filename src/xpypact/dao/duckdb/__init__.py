@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-from .implementation import DuckDBDAO, create_indices, save
+from .implementation import DuckDBDAO, create_indices, list_snapshots, prune_snapshots, save
 
 __all__ = [
     "DuckDBDAO",
     "create_indices",
+    "list_snapshots",
+    "prune_snapshots",
     "save",
 ]
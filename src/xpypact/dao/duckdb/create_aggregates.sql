@@ -0,0 +1,44 @@
+-- sqlfluff:dialect:duckdb
+-- sqlfluff:max_line_length:120
+
+-- Optional summary tables over timestep_nuclide.
+-- The tables are maintained by xpypact.dao.duckdb.save() and DuckDBDAO.refresh_aggregates()
+-- for the (material_id, case_id) keys being saved or refreshed.
+
+create table if not exists timestep_element (
+    material_id uinteger not null,
+    case_id uinteger not null,
+    time_step_number uinteger not null,
+    z utinyint not null, -- atomic number decoded from zai
+    atoms real not null,
+    grams real not null,
+
+    activity real not null,
+    alpha_activity real not null,
+    beta_activity real not null,
+    gamma_activity real not null,
+
+    heat real not null,
+    alpha_heat real not null,
+    beta_heat real not null,
+    gamma_heat real not null,
+
+    dose real not null,
+    ingestion real not null,
+    inhalation real not null
+);
+
+-- top contributors to activity, heat and dose in every time step,
+-- the same columns as xpypact.aggregation.dominant_nuclides() computes
+create table if not exists timestep_top_nuclides (
+    material_id uinteger not null,
+    case_id uinteger not null,
+    time_step_number uinteger not null,
+    quantity varchar not null,
+    rank usmallint not null check (0 < rank),
+    zai uinteger not null,
+    value double not null,
+    -- of the quantity total over all the nuclides in the time step
+    fraction double not null,
+    cumulative_fraction double not null -- of this and the higher ranked nuclides
+);
@@ -94,3 +94,20 @@ create table if not exists timestep_gamma (
     g utinyint not null, -- only upper bin boundaries in this table
     rate real not null
 );
+
+create table if not exists flux_bins (
+    g usmallint not null,
+    boundary double not null check (0.0 <= boundary)
+);
+
+-- neutron spectra over flux_bins, fluxes[g] is the value in the group (boundary[g-1], boundary[g])
+-- All the spectra of a database share flux_bins, so the values have the same length,
+-- but it is not always 709: arbitrary spectra (arb_flux) have other group structures.
+-- The group count is unknown when the schema is created, so a list is declared here.
+-- save() replaces the table with the saved data as a fixed-size array, e.g. double[709].
+create table if not exists flux (
+    case_id uinteger not null,
+    comment varchar not null,
+    norm double not null,
+    fluxes double [] not null
+);
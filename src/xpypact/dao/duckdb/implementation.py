@@ -4,14 +4,28 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import re
+import threading
+
+from collections.abc import Iterable
+from contextlib import contextmanager
 from pathlib import Path
 
 import msgspec as ms
 
+from xpypact.aggregation import NUCLIDE_QUANTITIES
+from xpypact.derived import DERIVED_QUANTITIES, select_derived
+from xpypact.flux_bank import FluxBank
+
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     import duckdb as db
 
     from xpypact.collector import FullDataCollector
+    from xpypact.xpypact_types import NDArrayInt
+
+    IdFilter = int | Iterable[int] | None
 
 HERE = Path(__file__).parent
 
@@ -23,6 +37,10 @@ class DuckDBDAOSaveError(ValueError):
     """Error on accessing/saving FISPACT data."""
 
 
+class DuckDBDAOQueryError(ValueError):
+    """Error on building a query to FISPACT data."""
+
+
 _TABLES = [
     "gbins",
     "nuclide",
@@ -32,12 +50,178 @@ _TABLES = [
     "timestep_nuclide",
 ]
 
+# optional tables with neutron spectra of cases
+_FLUX_TABLES = [
+    "flux",
+    "flux_bins",
+]
+
+# save() loads tables as <name>__staging and retains replaced tables as <name>__v<version>
+_STAGING_SUFFIX = "__staging"
+_SNAPSHOT_SEP = "__v"
+_SNAPSHOT_PATTERN = re.compile(rf"^(?P<table>\w+?){_SNAPSHOT_SEP}(?P<version>\d+)$")
+
+# DuckDB types of the columns used as hive partitioning keys, others are autodetected
+_PARTITION_KEY_TYPES = {
+    "material_id": "uinteger",
+    "case_id": "uinteger",
+    "time_step_number": "uinteger",
+    "zai": "uinteger",
+    "g": "utinyint",
+}
+
+_IDENTIFIER_PATTERN = re.compile(r"^[a-z_]\w*$")
+
+_AGGREGATE_TABLES = [
+    "timestep_element",
+    "timestep_top_nuclides",
+]
+
+TOP_NUCLIDES_NUMBER = 20
+"""The number of the top contributors retained in timestep_top_nuclides table."""
+
+_TOP_QUANTITIES = ["activity", "heat", "dose"]
+
+# Templates to compute aggregates over (staging or current) tables
+# optionally restricted to (material_id, case_id) keys passed as lists $material_ids, $case_ids.
+
+_KEYS_CONDITION = """
+    where (material_id, case_id) in (
+        select (unnest($material_ids), unnest($case_ids))
+    )
+"""
+
+_KEYS_FILTER = """
+    semi join (select unnest($material_ids) as material_id, unnest($case_ids) as case_id) as k
+    using (material_id, case_id)
+"""
+
+# z and a are decoded from zai = z * 10000 + a * 10 + state, no join with nuclide table is needed
+_TIMESTEP_ELEMENT_SQL = """
+select
+    material_id,
+    case_id,
+    time_step_number,
+    {decoded},
+    {sums}
+from {timestep_nuclide} {keys_filter}
+group by all
+"""
+
+# the same ranking and columns as xpypact.aggregation.dominant_nuclides()
+_TIMESTEP_TOP_NUCLIDES_SQL = """
+with u as (
+    unpivot (
+        select material_id, case_id, time_step_number, zai, {quantities}
+        from {timestep_nuclide} {keys_filter}
+    )
+    on {quantities} into name quantity value value
+)
+select
+    material_id,
+    case_id,
+    time_step_number,
+    quantity,
+    (row_number() over w)::usmallint as rank,
+    zai,
+    value::double as value,
+    coalesce(value::double / nullif(sum(value::double) over p, 0), 0) as fraction,
+    coalesce(sum(value::double) over w / nullif(sum(value::double) over p, 0), 0)
+        as cumulative_fraction
+from u
+where value > 0
+window
+    p as (partition by material_id, case_id, time_step_number, quantity),
+    w as (p order by value desc, zai)
+qualify rank <= {top_n}
+"""
+
+# Joins providing context columns of derived quantities, see xpypact.derived
+_DERIVED_CONTEXT_SQL = {
+    "timestep_mass": """
+left join (
+    select material_id, case_id, time_step_number, mass as timestep_mass from timestep
+) using (material_id, case_id, time_step_number)
+""",
+    "gamma_mid": """
+left join (
+    select g, (0.5 * (lag(boundary) over (order by g) + boundary))::real as gamma_mid from gbins
+) using (g)
+""",
+}
+
+_DERIVED_CONTEXT_TABLES = {
+    "timestep_mass": "timestep",
+    "gamma_mid": "gbins",
+}
+
+_DERIVED_SUFFIX = "_derived"
+
 
 # noinspection SqlNoDataSourceInspection
 class DuckDBDAO(ms.Struct):
-    """Implementation of DataAccessInterface for DuckDB."""
+    """Implementation of DataAccessInterface for DuckDB.
+
+    The ``query_*`` methods compile filters and projections to parameterized SQL.
+    The SQL text is cached per DAO (i.e. per connection) by the shape of a query,
+    so repeated queries differ only in parameters and DuckDB pushes the filters
+    down to the table scans. The methods return lazy relations: use ``.pl()``,
+    ``.arrow()`` or ``.fetchnumpy()`` to materialize only what is needed.
+
+    A DuckDB connection should not be shared between threads.
+    Use :meth:`checkout` in every thread to get a DAO over a thread-local cursor.
+    """
 
     con: db.DuckDBPyConnection
+    _statements: dict[tuple[object, ...], str] = ms.field(default_factory=dict)
+    _local: threading.local = ms.field(default_factory=threading.local)
+    _cursors: list[db.DuckDBPyConnection] = ms.field(default_factory=list)
+    _lock: threading.Lock = ms.field(default_factory=threading.Lock)
+
+    def configure(self, *, threads: int | None = None, memory_limit: str | None = None) -> None:
+        """Set resources available to DuckDB on the database of this DAO.
+
+        The settings are shared by the connection and all its cursors.
+
+        Args:
+            threads: number of threads DuckDB uses to run a query, None - don't change
+            memory_limit: max memory to use, for example "4GB", None - don't change
+        """
+        if threads is not None:
+            self.con.execute("set threads = ?", [threads])
+        if memory_limit is not None:
+            self.con.execute("set memory_limit = ?", [memory_limit])
+
+    @contextmanager
+    def checkout(self) -> Iterator[DuckDBDAO]:
+        """Check out a DAO over a cursor owned by the current thread.
+
+        Each thread gets its own cursor to the database of this DAO on the first call
+        and reuses it (with its statement cache) on subsequent ones.
+        So, concurrent read queries from a thread pool run safely and in parallel.
+
+        Yields
+        ------
+            DAO over the thread-local cursor
+        """
+        dao: DuckDBDAO | None = getattr(self._local, "dao", None)
+        if dao is None:
+            cursor = self.con.cursor()
+            with self._lock:
+                self._cursors.append(cursor)
+            dao = self._local.dao = DuckDBDAO(cursor)
+        yield dao
+
+    def close_cursors(self) -> None:
+        """Close the cursors created with :meth:`checkout`.
+
+        The connection itself remains open.
+        """
+        with self._lock:
+            cursors, self._cursors = self._cursors, []
+            self._local = threading.local()
+        for cursor in cursors:
+            cursor.close()
 
     def get_tables_info(self) -> db.DuckDBPyRelation:
         """Get information on tables in schema."""
@@ -63,9 +247,122 @@ class DuckDBDAO(ms.Struct):
 
     def drop_schema(self) -> None:
         """Drop our DB objects."""
-        for table in _TABLES:
+        for table in DERIVED_QUANTITIES:
+            self.con.execute(f"drop view if exists {table}{_DERIVED_SUFFIX}")
+        for table in _TABLES + _FLUX_TABLES + _AGGREGATE_TABLES:
             self.con.execute(f"drop table if exists {table}")
 
+    def attach_parquet(self, directory: Path) -> DuckDBDAO:
+        """Register views over parquet files instead of loading them into a database.
+
+        The parquet files are expected in the layout of
+        :meth:`xpypact.collector.FullDataCollector.Result.save_to_parquets`:
+        a file or a hive-partitioned directory <name>.parquet per table.
+        The views have the names of the tables, so, the ``load_*`` and ``query_*`` methods
+        work as usual, while DuckDB prunes partitions and skips row groups on reading.
+
+        Args:
+            directory: where the parquet files are
+
+        Returns
+        -------
+            self - for chaining
+        """
+        for path in sorted(directory.glob("*.parquet")):
+            name = path.stem
+            if not _IDENTIFIER_PATTERN.match(name):  # pragma: no cover - not our file
+                continue
+            if path.is_dir():
+                keys = _find_partition_keys(path)
+                hive_types = ", ".join(
+                    f"'{k}': '{_PARTITION_KEY_TYPES[k]}'" for k in keys if k in _PARTITION_KEY_TYPES
+                )
+                source = (
+                    f"read_parquet({_quote(str(path / '**' / '*.parquet'))}, "
+                    f"hive_partitioning = true, hive_types = {{{hive_types}}})"
+                )
+            else:
+                source = f"read_parquet({_quote(str(path))})"
+            self.con.execute(f"create or replace view {name} as select * from {source}")  # noqa: S608
+        return self
+
+    def has_aggregates(self) -> bool:
+        """Check if the aggregate tables are available in a database."""
+        return has_aggregates(self.con)
+
+    def create_aggregates(self) -> None:
+        """Create aggregate tables and compute them from the current dataset.
+
+        Since then, :func:`save` maintains the aggregates.
+        """
+        sql_path: Path = HERE / "create_aggregates.sql"
+        self.con.execute(sql_path.read_text(encoding="utf-8"))
+        self.refresh_aggregates()
+
+    def refresh_aggregates(self, keys: Iterable[tuple[int, int]] | None = None) -> None:
+        """Recompute aggregate tables for given keys.
+
+        The tables are updated in one transaction, on failure they are retained as they were.
+
+        Args:
+            keys: (material_id, case_id) pairs to refresh, None - all
+        """
+        if keys is None:
+            condition, keys_filter, params = "", "", None
+        else:
+            material_ids, case_ids = _split_keys(keys)
+            params = {"material_ids": material_ids, "case_ids": case_ids}
+            condition, keys_filter = _KEYS_CONDITION, _KEYS_FILTER
+        self.con.begin()
+        try:
+            for table in _AGGREGATE_TABLES:
+                self.con.execute(f"delete from {table} {condition}", params)  # noqa: S608
+                sql = _aggregate_sql(table, keys_filter=keys_filter)
+                self.con.execute(f"insert into {table} {sql}", params)
+        except Exception:
+            self.con.rollback()
+            raise
+        self.con.commit()
+
+    def create_derived_views(self) -> None:
+        """Create views <table>_derived with all the derived quantities of the tables.
+
+        See :mod:`xpypact.derived`. The views are evaluated on querying,
+        nothing is stored. They work over attached parquet files as well.
+        The tables missing in the database are skipped, as well as
+        the quantities which context tables are missing.
+        """
+        tables = set(_list_tables(self.con))
+        for table in DERIVED_QUANTITIES:
+            if table not in tables:
+                continue
+            quantities = [
+                q.name
+                for q in select_derived(table)
+                if all(_DERIVED_CONTEXT_TABLES[c] in tables for c in q.context)
+            ]
+            if quantities:
+                sql = _derived_sql(table, quantities)
+                self.con.execute(f"create or replace view {table}{_DERIVED_SUFFIX} as {sql}")
+
+    def load_timestep_elements(self) -> db.DuckDBPyRelation:
+        """Load time step x element aggregates.
+
+        Returns
+        -------
+            time step x element table
+        """
+        return self.con.table("timestep_element")
+
+    def load_timestep_top_nuclides(self) -> db.DuckDBPyRelation:
+        """Load the top contributors to activity, heat and dose per time step.
+
+        Returns
+        -------
+            time step x top nuclides table
+        """
+        return self.con.table("timestep_top_nuclides")
+
     def load_rundata(self) -> db.DuckDBPyRelation:
         """Load FISPACT run data as table.
 
@@ -130,26 +427,434 @@ class DuckDBDAO(ms.Struct):
         -------
             time step x gamma table
         """
-        sql = "select * from timestep_gamma"
-        if time_step_number is not None:
-            sql += f" where time_step_number == {time_step_number}"
-        return self.con.sql(sql)
+        return self.query_gamma(time_steps=time_step_number)
+
+    def load_flux_bins(self) -> db.DuckDBPyRelation:
+        """Load flux_bins table.
+
+        Returns
+        -------
+            flux_bins table
+        """
+        return self.con.table("flux_bins")
+
+    def query_flux(
+        self,
+        *,
+        case_ids: IdFilter = None,
+        columns: Iterable[str] | None = None,
+    ) -> db.DuckDBPyRelation:
+        """Select neutron spectra with filter and projection pushed down to DuckDB.
+
+        Args:
+            case_ids: case_id or ids to select, None - all
+            columns: columns to select, None - all
+
+        Returns
+        -------
+            lazy relation over flux table
+        """
+        return self._query("flux", columns, case_id=case_ids)
+
+    def load_flux_bank(self, case_ids: IdFilter = None) -> tuple[NDArrayInt, FluxBank]:
+        """Load neutron spectra to 2-D array.
+
+        Args:
+            case_ids: case_id or ids to select, None - all
+
+        Returns
+        -------
+            case_ids of the spectra, the spectra sorted by case_id
+        """
+        flux = self.query_flux(case_ids=case_ids).order("case_id").pl()
+        bank = FluxBank.from_tables(flux, self.load_flux_bins().pl())
+        return flux["case_id"].to_numpy(), bank
+
+    def query_timesteps(
+        self,
+        *,
+        material_ids: IdFilter = None,
+        case_ids: IdFilter = None,
+        time_steps: IdFilter = None,
+        columns: Iterable[str] | None = None,
+    ) -> db.DuckDBPyRelation:
+        """Select time steps with filters and projection pushed down to DuckDB.
+
+        Args:
+            material_ids: material_id or ids to select, None - all
+            case_ids: case_id or ids to select, None - all
+            time_steps: time_step_number or numbers to select, None - all
+            columns: columns to select, None - all
+
+        Returns
+        -------
+            lazy relation over timestep table
+        """
+        return self._query(
+            "timestep",
+            columns,
+            material_id=material_ids,
+            case_id=case_ids,
+            time_step_number=time_steps,
+        )
+
+    def query_nuclides(
+        self,
+        *,
+        material_ids: IdFilter = None,
+        case_ids: IdFilter = None,
+        time_steps: IdFilter = None,
+        zai: IdFilter = None,
+        columns: Iterable[str] | None = None,
+    ) -> db.DuckDBPyRelation:
+        """Select time step nuclides with filters and projection pushed down to DuckDB.
+
+        Args:
+            material_ids: material_id or ids to select, None - all
+            case_ids: case_id or ids to select, None - all
+            time_steps: time_step_number or numbers to select, None - all
+            zai: zai or zais to select, None - all
+            columns: columns to select, None - all
+
+        Returns
+        -------
+            lazy relation over timestep_nuclide table
+        """
+        return self._query(
+            "timestep_nuclide",
+            columns,
+            material_id=material_ids,
+            case_id=case_ids,
+            time_step_number=time_steps,
+            zai=zai,
+        )
+
+    def query_elements(
+        self,
+        *,
+        material_ids: IdFilter = None,
+        case_ids: IdFilter = None,
+        time_steps: IdFilter = None,
+        by_mass_number: bool = False,
+    ) -> db.DuckDBPyRelation:
+        """Sum time step nuclide quantities by element in one pass.
+
+        The atomic number z and mass number a are decoded from zai without join with nuclide table.
+        Without by_mass_number the result has the schema of timestep_element aggregate table.
+
+        Args:
+            material_ids: material_id or ids to select, None - all
+            case_ids: case_id or ids to select, None - all
+            time_steps: time_step_number or numbers to select, None - all
+            by_mass_number: group by element and mass number
+
+        Returns
+        -------
+            lazy relation with keys material_id, case_id, time_step_number, z, [a] and the sums
+        """
+        nuclides = self.query_nuclides(
+            material_ids=material_ids,
+            case_ids=case_ids,
+            time_steps=time_steps,
+        )
+        sql = _element_sql("nuclides", by_mass_number=by_mass_number)
+        order = "material_id, case_id, time_step_number, z" + (", a" if by_mass_number else "")
+        return nuclides.query("nuclides", sql).order(order)
+
+    def query_gamma(
+        self,
+        *,
+        material_ids: IdFilter = None,
+        case_ids: IdFilter = None,
+        time_steps: IdFilter = None,
+        columns: Iterable[str] | None = None,
+    ) -> db.DuckDBPyRelation:
+        """Select time step gamma with filters and projection pushed down to DuckDB.
+
+        Args:
+            material_ids: material_id or ids to select, None - all
+            case_ids: case_id or ids to select, None - all
+            time_steps: time_step_number or numbers to select, None - all
+            columns: columns to select, None - all
+
+        Returns
+        -------
+            lazy relation over timestep_gamma table
+        """
+        return self._query(
+            "timestep_gamma",
+            columns,
+            material_id=material_ids,
+            case_id=case_ids,
+            time_step_number=time_steps,
+        )
+
+    def query_derived(
+        self,
+        table: str,
+        *,
+        quantities: Iterable[str] | None = None,
+        material_ids: IdFilter = None,
+        case_ids: IdFilter = None,
+        time_steps: IdFilter = None,
+    ) -> db.DuckDBPyRelation:
+        """Select a table with derived quantities computed on the fly.
+
+        Only the context required by the selected quantities is joined,
+        see :mod:`xpypact.derived`.
+
+        Args:
+            table: "timestep", "timestep_nuclide" or "timestep_gamma"
+            quantities: names of the derived quantities, None - all for the table
+            material_ids: material_id or ids to select, None - all
+            case_ids: case_id or ids to select, None - all
+            time_steps: time_step_number or numbers to select, None - all
+
+        Returns
+        -------
+            lazy relation with the table columns and the derived quantities
+        """
+        sql = _derived_sql(table, quantities)
+        return self._query(
+            f"({sql}) as d",  # the query text is cached by the quantities selected
+            None,
+            material_id=material_ids,
+            case_id=case_ids,
+            time_step_number=time_steps,
+        )
+
+    def _query(
+        self,
+        table: str,
+        columns: Iterable[str] | None,
+        **filters: IdFilter,
+    ) -> db.DuckDBPyRelation:
+        params: dict[str, int | list[int]] = {
+            name: _as_parameter(value) for name, value in filters.items() if value is not None
+        }
+        projection = None if columns is None else tuple(columns)
+        key = (
+            table,
+            projection,
+            tuple((name, isinstance(value, list)) for name, value in params.items()),
+        )
+        sql = self._statements.get(key)
+        if sql is None:
+            sql = self._statements[key] = self._compile_query(table, projection, key[2])
+        return self.con.sql(sql, params=params)
+
+    def _compile_query(
+        self,
+        table: str,
+        projection: tuple[str, ...] | None,
+        filters: tuple[tuple[str, bool], ...],
+    ) -> str:
+        if projection is None:
+            select = "*"
+        else:
+            available = self.con.table(table).columns
+            unknown = [c for c in projection if c not in available]
+            if unknown or not projection:
+                msg = f"Cannot project {table} to columns {unknown or list(projection)}"
+                raise DuckDBDAOQueryError(msg)
+            select = ", ".join(f'"{c}"' for c in projection)
+        sql = f"select {select} from {table}"  # noqa: S608 - identifiers are validated
+        if filters:
+            conditions = (
+                f"{name} in (select unnest(${name}))" if is_list else f"{name} = ${name}"
+                for name, is_list in filters
+            )
+            sql += " where " + " and ".join(conditions)
+        return sql
+
+
+def _as_parameter(value: int | Iterable[int]) -> int | list[int]:
+    if isinstance(value, Iterable):
+        return [int(v) for v in value]
+    return int(value)
 
 
 def save(
     cursor: db.DuckDBPyConnection,
     collector_result: FullDataCollector.Result,
+    *,
+    keep_snapshot: bool = False,
 ) -> None:
     """Save collected inventories to a DuckDB database.
 
+    The tables are loaded to staging tables first. Then all the tables are swapped
+    in one transaction, so, readers on other cursors see either the previous or
+    the new dataset, never a mix, and are not blocked while the staging tables are loaded.
+    Only one writer at a time is supported.
+
     Args:
-        cursor: separate multi-threaded cursor to access DuckDB, use con.cursor() in caller
+        cursor: separate multi-threaded cursor to access DuckDB,
+                use con.cursor() or DuckDBDAO.checkout() in caller
         collector_result: collected inventories as Polars frames
+        keep_snapshot: retain the replaced tables as a new snapshot version,
+                       see :func:`list_snapshots` and :func:`prune_snapshots`
+
+    Note:
+        If the database has aggregate tables (see :meth:`DuckDBDAO.create_aggregates`),
+        they are computed from the staging tables and swapped together with them.
+
+    Raises
+    ------
+    DuckDBDAOSaveError: if swapping of the staging tables fails, the previous tables are retained.
     """
     collected = ms.structs.asdict(collector_result)
-    for name, df in collected.items():
-        if df is not None:  # pragma: no cover
-            cursor.execute(f"create or replace table {name} as select * from df")  # noqa: S608
+    names = [name for name, df in collected.items() if df is not None]
+    for name in names:
+        df = collected[name]  # noqa: F841 - used by DuckDB replacement scan
+        cursor.execute(f"create or replace table {name}{_STAGING_SUFFIX} as select * from df")  # noqa: S608
+    existing = set(_list_tables(cursor))
+    if "timestep_nuclide" in names and has_aggregates(cursor):
+        for name in _AGGREGATE_TABLES:
+            sql = _aggregate_sql(name, timestep_nuclide=f"timestep_nuclide{_STAGING_SUFFIX}")
+            cursor.execute(f"create or replace table {name}{_STAGING_SUFFIX} as {sql}")
+            names.append(name)
+    version = max(list_snapshots(cursor), default=0) + 1
+    cursor.begin()
+    try:
+        for name in names:
+            if name in existing:
+                if keep_snapshot:
+                    cursor.execute(f"alter table {name} rename to {name}{_SNAPSHOT_SEP}{version}")
+                else:
+                    cursor.execute(f"drop table {name}")
+            cursor.execute(f"alter table {name}{_STAGING_SUFFIX} rename to {name}")
+        cursor.commit()
+    except Exception as ex:  # pragma: no cover - defensive
+        cursor.rollback()
+        msg = "Failed to swap staging tables"
+        raise DuckDBDAOSaveError(msg) from ex
+
+
+def has_aggregates(con: db.DuckDBPyConnection) -> bool:
+    """Check if the aggregate tables are available in a database.
+
+    Args:
+        con: connection to DuckDB
+
+    Returns
+    -------
+        True, if all the aggregate tables exist
+    """
+    tables = set(_list_tables(con))
+    return all(name in tables for name in _AGGREGATE_TABLES)
+
+
+def _aggregate_sql(
+    table: str,
+    *,
+    timestep_nuclide: str = "timestep_nuclide",
+    keys_filter: str = "",
+) -> str:
+    if table == "timestep_element":
+        return _element_sql(timestep_nuclide, keys_filter=keys_filter)
+    return _TIMESTEP_TOP_NUCLIDES_SQL.format(
+        quantities=", ".join(_TOP_QUANTITIES),
+        timestep_nuclide=timestep_nuclide,
+        keys_filter=keys_filter,
+        top_n=TOP_NUCLIDES_NUMBER,
+    )
+
+
+def _element_sql(
+    timestep_nuclide: str,
+    *,
+    by_mass_number: bool = False,
+    keys_filter: str = "",
+) -> str:
+    decoded = ["(zai // 10000)::utinyint as z"]
+    if by_mass_number:
+        decoded.append("(zai // 10 % 1000)::usmallint as a")
+    return _TIMESTEP_ELEMENT_SQL.format(
+        decoded=", ".join(decoded),
+        sums=",\n    ".join(f"sum({q})::real as {q}" for q in NUCLIDE_QUANTITIES),
+        timestep_nuclide=timestep_nuclide,
+        keys_filter=keys_filter,
+    )
+
+
+def _derived_sql(table: str, quantities: Iterable[str] | None = None) -> str:
+    selected = select_derived(table, quantities)
+    context = sorted({c for q in selected for c in q.context})
+    columns = ", ".join(["t.*", *(f"({q.sql}) as {q.name}" for q in selected)])
+    joins = "".join(_DERIVED_CONTEXT_SQL[c] for c in context)
+    return f"select {columns} from {table} as t {joins}"  # noqa: S608 - registry expressions
+
+
+def _find_partition_keys(dataset: Path) -> list[str]:
+    first = next(dataset.rglob("*.parquet"), None)
+    if first is None:  # pragma: no cover
+        return []
+    return [part.split("=", 1)[0] for part in first.relative_to(dataset).parts[:-1] if "=" in part]
+
+
+def _quote(text: str) -> str:
+    escaped = text.replace("'", "''")
+    return f"'{escaped}'"
+
+
+def _split_keys(keys: Iterable[tuple[int, int]]) -> tuple[list[int], list[int]]:
+    material_ids: list[int] = []
+    case_ids: list[int] = []
+    for material_id, case_id in keys:
+        material_ids.append(int(material_id))
+        case_ids.append(int(case_id))
+    return material_ids, case_ids
+
+
+def _list_tables(con: db.DuckDBPyConnection) -> list[str]:
+    return [
+        row[0]
+        for row in con.execute(
+            "select table_name from information_schema.tables "
+            "where table_schema = current_schema() and table_catalog = current_database()",
+        ).fetchall()
+    ]
+
+
+def list_snapshots(con: db.DuckDBPyConnection) -> list[int]:
+    """List versions of snapshots retained by :func:`save`.
+
+    Args:
+        con: connection to DuckDB
+
+    Returns
+    -------
+        sorted snapshot versions, the latest is the last
+    """
+    versions = {
+        int(match["version"])
+        for match in map(_SNAPSHOT_PATTERN.match, _list_tables(con))
+        if match is not None
+    }
+    return sorted(versions)
+
+
+def prune_snapshots(con: db.DuckDBPyConnection, keep: int = 0) -> list[int]:
+    """Drop the tables of older snapshots.
+
+    Args:
+        con: connection to DuckDB
+        keep: the number of the latest snapshots to retain
+
+    Returns
+    -------
+        dropped snapshot versions
+    """
+    versions = list_snapshots(con)
+    dropped = versions[: max(len(versions) - keep, 0)]
+    if dropped:
+        con.begin()
+        for name in _list_tables(con):
+            match = _SNAPSHOT_PATTERN.match(name)
+            if match is not None and int(match["version"]) in dropped:
+                con.execute(f"drop table {name}")
+        con.commit()
+    return dropped
 
 
 def create_indices(con: db.DuckDBPyConnection) -> db.DuckDBPyConnection:
@@ -0,0 +1,232 @@
+"""Quantities derived from the stored tables on demand.
+
+The stored tables keep only the FISPACT quantities. The derived quantities,
+for example, specific activity in Bq/kg or gamma emission in MeV/s,
+are defined once in the registry as SQL expressions over the columns of a table
+and context columns joined from the other tables:
+
+============= ================================================ ===========
+context       meaning                                          table
+============= ================================================ ===========
+timestep_mass total mass of the time step, kg                  timestep
+gamma_mid     midpoint of the gamma group g, MeV               gbins
+============= ================================================ ===========
+
+The same expressions are evaluated lazily by Polars (:func:`with_derived`)
+and DuckDB (:meth:`xpypact.dao.duckdb.DuckDBDAO.query_derived` and the views
+<table>_derived). The context is joined only if the selected quantities need it.
+So, the base tables stay compact and a conversion costs nothing until it is used.
+Division by zero mass gives null.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import msgspec as ms
+import polars as pl
+
+from xpypact.gamma import gbins_boundaries
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from xpypact.xpypact_types import NDArrayFloat
+
+
+_TIMESTEP_KEYS = ["material_id", "case_id", "time_step_number"]
+
+
+class DerivedQuantityError(ValueError):
+    """Unknown derived quantity or missing context to compute it."""
+
+
+class DerivedQuantity(ms.Struct, frozen=True):  # pylint: disable=too-few-public-methods
+    """Definition of a derived quantity.
+
+    Attrs:
+        name: column name
+        table: the table to derive the quantity for
+        sql: expression over the table columns and context
+        unit: unit of the values
+        context: context columns used in the expression
+    """
+
+    name: str
+    table: str
+    sql: str
+    unit: str
+    context: tuple[str, ...] = ()
+
+    def expr(self) -> pl.Expr:
+        """Present the quantity as Polars expression.
+
+        Returns
+        -------
+        the expression aliased with the quantity name
+        """
+        return pl.sql_expr(self.sql).alias(self.name)
+
+
+_SPECIFIC_QUANTITIES = {
+    "activity": "Bq/kg",
+    "alpha_activity": "Bq/kg",
+    "beta_activity": "Bq/kg",
+    "gamma_activity": "Bq/kg",
+    "heat": "kW/kg",
+    "dose": "Sv/h/kg",
+    "ingestion": "Sv/kg",
+    "inhalation": "Sv/kg",
+}
+
+
+def _registry(*quantities: DerivedQuantity) -> dict[str, dict[str, DerivedQuantity]]:
+    registry: dict[str, dict[str, DerivedQuantity]] = {}
+    for q in quantities:
+        registry.setdefault(q.table, {})[q.name] = q
+    return registry
+
+
+DERIVED_QUANTITIES = _registry(
+    *(
+        DerivedQuantity(f"specific_{q}", "timestep", f"{q} / nullif(mass, 0)", unit)
+        for q, unit in _SPECIFIC_QUANTITIES.items()
+    ),
+    *(
+        DerivedQuantity(
+            f"specific_{q}",
+            "timestep_nuclide",
+            f"{q} / nullif(timestep_mass, 0)",
+            unit,
+            ("timestep_mass",),
+        )
+        for q, unit in _SPECIFIC_QUANTITIES.items()
+    ),
+    DerivedQuantity(
+        "mass_fraction",
+        "timestep_nuclide",
+        "grams / nullif(1000 * timestep_mass, 0)",
+        "-",
+        ("timestep_mass",),
+    ),
+    DerivedQuantity("energy_rate", "timestep_gamma", "rate * gamma_mid", "MeV/s", ("gamma_mid",)),
+    DerivedQuantity(
+        "specific_rate",
+        "timestep_gamma",
+        "rate / nullif(timestep_mass, 0)",
+        "photons/s/kg",
+        ("timestep_mass",),
+    ),
+)
+"""Derived quantities by table and name."""
+
+
+def select_derived(table: str, quantities: Iterable[str] | None = None) -> list[DerivedQuantity]:
+    """Find definitions of derived quantities.
+
+    Parameters
+    ----------
+    table
+        the table to derive the quantities for
+    quantities
+        names of the quantities, None - all for the table
+
+    Returns
+    -------
+    the definitions
+
+    Raises
+    ------
+    DerivedQuantityError: if a quantity is not defined for the table.
+    """
+    defined = DERIVED_QUANTITIES.get(table, {})
+    if quantities is None:
+        return list(defined.values())
+    quantities = list(quantities)
+    unknown = [q for q in quantities if q not in defined]
+    if unknown:
+        msg = f"Unknown derived quantities for {table}: {unknown}, available: {list(defined)}"
+        raise DerivedQuantityError(msg)
+    return [defined[q] for q in quantities]
+
+
+def gamma_mids(gbins: pl.DataFrame | NDArrayFloat) -> pl.LazyFrame:
+    """Compute midpoints of gamma groups.
+
+    Parameters
+    ----------
+    gbins
+        gbins table (g, boundary) or array of the boundaries
+
+    Returns
+    -------
+    lazy table g (>= 1), gamma_mid
+    """
+    boundaries = gbins_boundaries(gbins)
+    return pl.LazyFrame(
+        {
+            "g": pl.Series(range(1, boundaries.size), dtype=pl.UInt8),
+            "gamma_mid": pl.Series(0.5 * (boundaries[:-1] + boundaries[1:]), dtype=pl.Float32),
+        }
+    )
+
+
+def with_derived[Frame: (pl.DataFrame, pl.LazyFrame)](
+    frame: Frame,
+    table: str,
+    quantities: Iterable[str] | None = None,
+    *,
+    timestep: pl.DataFrame | pl.LazyFrame | None = None,
+    gbins: pl.DataFrame | NDArrayFloat | None = None,
+) -> Frame:
+    """Add derived quantities to a table.
+
+    Parameters
+    ----------
+    frame
+        table in the layout of `table`, may be filtered or projected
+        as long as the columns used by the quantities are present
+    table
+        name of the table layout, for example, "timestep_nuclide"
+    quantities
+        names of the quantities, None - all for the table
+    timestep
+        timestep table to take timestep_mass from
+    gbins
+        gbins table or boundaries to compute gamma_mid
+
+    Returns
+    -------
+    the table with the quantities appended, lazy for LazyFrame
+
+    Raises
+    ------
+    DerivedQuantityError: if a quantity is unknown or its context is not provided.
+    """
+    selected = select_derived(table, quantities)
+    context = {c for q in selected for c in q.context}
+    result = frame.lazy()
+    if "timestep_mass" in context:
+        if timestep is None:
+            msg = f"timestep table is required to derive {[q.name for q in selected]}"
+            raise DerivedQuantityError(msg)
+        result = result.join(
+            timestep.lazy().select(*_TIMESTEP_KEYS, pl.col("mass").alias("timestep_mass")),
+            on=_TIMESTEP_KEYS,
+            how="left",
+            maintain_order="left",
+        )
+    if "gamma_mid" in context:
+        if gbins is None:
+            msg = f"gbins are required to derive {[q.name for q in selected]}"
+            raise DerivedQuantityError(msg)
+        result = result.join(
+            gamma_mids(gbins).with_columns(pl.col("g").cast(frame.collect_schema()["g"])),
+            on="g",
+            how="left",
+            maintain_order="left",
+        )
+    result = result.with_columns(q.expr() for q in selected).drop(context)
+    if isinstance(frame, pl.DataFrame):
+        return result.collect()
+    return result
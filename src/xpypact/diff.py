@@ -0,0 +1,405 @@
+"""Compare FISPACT results, for example, before and after update of FISPACT or nuclear data.
+
+The tables timestep, timestep_nuclide and timestep_gamma are aligned on their keys
+(material_id, case_id, time_step_number and zai or g). A value missing on one side
+is compared as zero: FISPACT omits negligible nuclides. The values `a` and `b` differ, if
+
+    abs(a - b) > atol + rtol * max(abs(a), abs(b))
+
+with the tolerances specified per quantity.
+
+The data are compared partition by partition, a partition is a chunk of material ids.
+So, only the data of one partition from both sides are in memory at once.
+The result is a summary per table and quantity and the rows with the differing values.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from functools import reduce
+
+import msgspec as ms
+import polars as pl
+
+from xpypact.aggregation import NUCLIDE_QUANTITIES
+from xpypact.collector import FullDataCollector
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from xpypact.dao.duckdb import DuckDBDAO
+    from xpypact.inventory import Inventory
+
+    TableSource = Callable[[str, list[int]], pl.DataFrame | None]
+
+_CASE_KEYS = ["material_id", "case_id", "time_step_number"]
+
+DIFF_TABLES: dict[str, tuple[list[str], list[str]]] = {
+    "timestep": (
+        _CASE_KEYS,
+        [
+            "irradiation_time",
+            "cooling_time",
+            "duration",
+            "elapsed_time",
+            "flux",
+            "atoms",
+            "activity",
+            "alpha_activity",
+            "beta_activity",
+            "gamma_activity",
+            "mass",
+            "heat",
+            "alpha_heat",
+            "beta_heat",
+            "gamma_heat",
+            "ingestion",
+            "inhalation",
+            "dose",
+        ],
+    ),
+    "timestep_nuclide": ([*_CASE_KEYS, "zai"], NUCLIDE_QUANTITIES),
+    "timestep_gamma": ([*_CASE_KEYS, "g"], ["rate"]),
+}
+"""Compared tables: keys and quantities."""
+
+DIFF_SUMMARY_SCHEMA = {
+    "table": pl.String,
+    "quantity": pl.String,
+    "rows": pl.UInt64,
+    "only_left": pl.UInt64,
+    "only_right": pl.UInt64,
+    "differing": pl.UInt64,
+    "max_abs_diff": pl.Float64,
+    "max_rel_diff": pl.Float64,
+}
+
+
+class Tolerance(ms.Struct, frozen=True, gc=False):  # pylint: disable=too-few-public-methods
+    """Tolerance to compare values of a quantity.
+
+    Attrs:
+        rtol: relative tolerance
+        atol: absolute tolerance
+    """
+
+    rtol: float = 1e-5
+    atol: float = 0.0
+
+
+class Tolerances(ms.Struct, frozen=True):  # pylint: disable=too-few-public-methods
+    """Tolerances per quantity.
+
+    Attrs:
+        default: tolerance for the quantities not in `quantities`
+        quantities: tolerances for specific quantities
+    """
+
+    default: Tolerance = Tolerance()
+    quantities: dict[str, Tolerance] = ms.field(default_factory=dict)
+
+    def get(self, quantity: str) -> Tolerance:
+        """Get tolerance for a quantity.
+
+        Parameters
+        ----------
+        quantity
+            quantity name
+
+        Returns
+        -------
+        the tolerance
+        """
+        return self.quantities.get(quantity, self.default)
+
+
+class DiffResult(ms.Struct):  # pylint: disable=too-few-public-methods
+    """Outcome of comparison.
+
+    Attrs:
+        summary: per table and quantity: the number of compared rows,
+                 rows only on left and right sides, differing rows,
+                 max absolute and relative differences
+        differing: per table: keys, quantity, left and right values,
+                   absolute and relative differences of the differing values,
+                   a missing value is null
+    """
+
+    summary: pl.DataFrame
+    differing: dict[str, pl.DataFrame]
+
+    @property
+    def ok(self) -> bool:
+        """Check if all the values are within tolerances.
+
+        Returns
+        -------
+        True, if there are no differing values
+        """
+        return bool(self.summary["differing"].sum() == 0)
+
+
+def diff_frames(
+    left: pl.DataFrame | pl.LazyFrame,
+    right: pl.DataFrame | pl.LazyFrame,
+    keys: Iterable[str],
+    quantities: Iterable[str],
+    tolerances: Tolerances | None = None,
+) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+    """Compare two tables aligned on keys.
+
+    Parameters
+    ----------
+    left, right
+        the tables to compare
+    keys
+        columns to align the tables on
+    quantities
+        columns to compare
+    tolerances
+        tolerances per quantity, default - Tolerances()
+
+    Returns
+    -------
+    lazy summary per quantity and lazy table of the differing values
+    """
+    keys = list(keys)
+    quantities = list(quantities)
+    if tolerances is None:
+        tolerances = Tolerances()
+    limits = pl.LazyFrame(
+        {
+            "quantity": quantities,
+            "rtol": [tolerances.get(q).rtol for q in quantities],
+            "atol": [tolerances.get(q).atol for q in quantities],
+        },
+    )
+
+    def _long(frame: pl.DataFrame | pl.LazyFrame, side: str) -> pl.LazyFrame:
+        return (
+            frame.lazy()
+            .select(*keys, pl.col(quantities).cast(pl.Float64))
+            .unpivot(on=quantities, index=keys, variable_name="quantity", value_name=side)
+        )
+
+    a = pl.col("left").fill_null(0.0)
+    b = pl.col("right").fill_null(0.0)
+    scale = pl.max_horizontal(a.abs(), b.abs())
+    compared = (
+        _long(left, "left")
+        .join(_long(right, "right"), on=[*keys, "quantity"], how="full", coalesce=True)
+        .join(limits, on="quantity")
+        .with_columns(
+            (a - b).abs().alias("abs_diff"),
+            scale.alias("scale"),
+        )
+        .with_columns(
+            pl.when(pl.col("scale") > 0.0)
+            .then(pl.col("abs_diff") / pl.col("scale"))
+            .otherwise(0.0)
+            .alias("rel_diff"),
+            (pl.col("abs_diff") > pl.col("atol") + pl.col("rtol") * pl.col("scale")).alias(
+                "differs"
+            ),
+        )
+    )
+    summary = compared.group_by("quantity").agg(
+        pl.len().cast(pl.UInt64).alias("rows"),
+        pl.col("right").is_null().sum().cast(pl.UInt64).alias("only_left"),
+        pl.col("left").is_null().sum().cast(pl.UInt64).alias("only_right"),
+        pl.col("differs").sum().cast(pl.UInt64).alias("differing"),
+        pl.col("abs_diff").max().alias("max_abs_diff"),
+        pl.col("rel_diff").max().alias("max_rel_diff"),
+    )
+    differing = compared.filter("differs").select(
+        *keys, "quantity", "left", "right", "abs_diff", "rel_diff"
+    )
+    return summary, differing
+
+
+def diff_sources(
+    left: TableSource,
+    right: TableSource,
+    material_ids: Iterable[int],
+    *,
+    tolerances: Tolerances | None = None,
+    partition_size: int = 100,
+) -> DiffResult:
+    """Compare tables provided partition by partition.
+
+    Parameters
+    ----------
+    left, right
+        functions returning a table by name for material ids, None - no such table
+    material_ids
+        material ids to compare
+    tolerances
+        tolerances per quantity, default - Tolerances()
+    partition_size
+        the number of materials to compare at once
+
+    Returns
+    -------
+    summary and differing rows, the tables missing on any side are not compared
+    """
+    material_ids = sorted(set(material_ids))
+    summaries = []
+    differing: dict[str, list[pl.DataFrame]] = {}
+    for start in range(0, max(len(material_ids), 1), partition_size):
+        partition = material_ids[start : start + partition_size]
+        for table, (keys, quantities) in DIFF_TABLES.items():
+            left_table = left(table, partition)
+            right_table = right(table, partition)
+            if left_table is None or right_table is None:
+                continue
+            common = [q for q in quantities if q in left_table.columns and q in right_table.columns]
+            partition_summary, partition_rows = pl.collect_all(
+                diff_frames(left_table, right_table, keys, common, tolerances)
+            )
+            summaries.append(partition_summary.with_columns(table=pl.lit(table)))
+            differing.setdefault(table, []).append(partition_rows)
+    if summaries:
+        summary = (
+            pl.concat(summaries)
+            .group_by("table", "quantity", maintain_order=True)
+            .agg(
+                pl.col("rows", "only_left", "only_right", "differing").sum(),
+                pl.col("max_abs_diff", "max_rel_diff").max(),
+            )
+            .select(DIFF_SUMMARY_SCHEMA.keys())
+        )
+    else:
+        summary = pl.DataFrame(schema=DIFF_SUMMARY_SCHEMA)
+    return DiffResult(
+        summary.cast(DIFF_SUMMARY_SCHEMA),  # type: ignore[arg-type]
+        {table: pl.concat(frames) for table, frames in differing.items()},
+    )
+
+
+def diff_results(
+    left: FullDataCollector.Result,
+    right: FullDataCollector.Result,
+    *,
+    tolerances: Tolerances | None = None,
+    partition_size: int = 100,
+) -> DiffResult:
+    """Compare collected results.
+
+    See :func:`diff_sources`.
+
+    Parameters
+    ----------
+    left, right
+        the results to compare
+    tolerances
+        tolerances per quantity, default - Tolerances()
+    partition_size
+        the number of materials to compare at once
+
+    Returns
+    -------
+    summary and differing rows
+    """
+    material_ids = pl.concat([left.timestep["material_id"], right.timestep["material_id"]]).unique()
+    return diff_sources(
+        _result_source(left),
+        _result_source(right),
+        material_ids.to_list(),
+        tolerances=tolerances,
+        partition_size=partition_size,
+    )
+
+
+def diff_inventories(
+    left: Inventory,
+    right: Inventory,
+    *,
+    tolerances: Tolerances | None = None,
+) -> DiffResult:
+    """Compare two inventories.
+
+    The inventories are compared as collected with material_id and case_id equal to 1.
+
+    Parameters
+    ----------
+    left, right
+        the inventories to compare
+    tolerances
+        tolerances per quantity, default - Tolerances()
+
+    Returns
+    -------
+    summary and differing rows
+    """
+    results = [FullDataCollector().append(inv, 1, 1).get_result() for inv in (left, right)]
+    return diff_results(*results, tolerances=tolerances)
+
+
+def diff_databases(
+    left: DuckDBDAO,
+    right: DuckDBDAO,
+    *,
+    tolerances: Tolerances | None = None,
+    partition_size: int = 100,
+) -> DiffResult:
+    """Compare xpypact DuckDB databases.
+
+    The filters on material ids are pushed down to DuckDB,
+    so, only one partition is loaded from each database at once.
+    See :func:`diff_sources`.
+
+    Parameters
+    ----------
+    left, right
+        DAOs of the databases to compare
+    tolerances
+        tolerances per quantity, default - Tolerances()
+    partition_size
+        the number of materials to compare at once
+
+    Returns
+    -------
+    summary and differing rows
+    """
+    material_ids = reduce(
+        set.union,
+        (
+            set(dao.query_timesteps(columns=["material_id"]).distinct().pl()["material_id"])
+            for dao in (left, right)
+        ),
+    )
+    return diff_sources(
+        _database_source(left),
+        _database_source(right),
+        material_ids,
+        tolerances=tolerances,
+        partition_size=partition_size,
+    )
+
+
+def _result_source(result: FullDataCollector.Result) -> TableSource:
+    def _source(table: str, material_ids: list[int]) -> pl.DataFrame | None:
+        frame: pl.DataFrame | None = getattr(result, table)
+        if frame is None:
+            return None
+        return frame.filter(pl.col("material_id").is_in(material_ids))
+
+    return _source
+
+
+def _database_source(dao: DuckDBDAO) -> TableSource:
+    queries = {
+        "timestep": dao.query_timesteps,
+        "timestep_nuclide": dao.query_nuclides,
+        "timestep_gamma": dao.query_gamma,
+    }
+
+    tables = set(dao.get_tables_info().pl()["table_name"])
+
+    def _source(table: str, material_ids: list[int]) -> pl.DataFrame | None:
+        if table not in tables:
+            return None
+        return queries[table](material_ids=material_ids).pl()
+
+    return _source
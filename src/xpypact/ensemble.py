@@ -0,0 +1,327 @@
+"""Statistics of quantities over an ensemble of cases.
+
+For uncertainty studies a material is irradiated with many perturbed spectra, that is, cases.
+The statistics over the cases are computed per material, time step and nuclide
+(or whatever keys a table has) in one pass over chunks of cases.
+Only the accumulated state is kept in memory, its size depends on
+the number of keys, not on the number of cases.
+
+Mean, standard deviation, min and max are accumulated with the batched form
+of Welford's algorithm: the moments of a chunk are merged to the running ones
+with the parallel formulas of Chan et al.
+Quantiles are estimated with log-bucketed sketch (like DDSketch):
+a value x > 0 goes to bucket ceil(log(x) / log(gamma)),
+gamma = (1 + relative_accuracy) / (1 - relative_accuracy).
+So, the estimated quantiles have the given relative accuracy.
+The sketches are merged by summing the bucket counts.
+Non-positive values are counted as zeros in the sketches.
+
+A key missing in a case, for example, a nuclide omitted in a FISPACT output,
+is accounted as zero value for this case.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import math
+
+from pathlib import Path
+
+import msgspec as ms
+import polars as pl
+
+from xpypact.aggregation import NUCLIDE_QUANTITIES
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+ENSEMBLE_KEYS = ["material_id", "time_step_number", "zai", "g"]
+"""Columns to compute statistics by, if present, case_id is the ensemble dimension."""
+
+_MEMBER_KEYS = {"zai", "g"}  # may be missing in some cases
+_ZERO_BUCKET = -(2**31)  # sorted before the buckets of positive values
+
+
+class EnsembleStatistics(ms.Struct):
+    """Accumulated statistics over cases.
+
+    Attrs:
+        keys: columns to compute the statistics by
+        quantities: columns to compute the statistics for
+        relative_accuracy: of the quantile estimates
+        moments: keys, quantity, n, mean, m2 (sum of squared deviations), min, max
+        sketch: keys, quantity, bucket, count
+        cases: the number of cases per keys except zai and g
+    """
+
+    keys: list[str]
+    quantities: list[str]
+    relative_accuracy: float = 0.01
+    moments: pl.DataFrame | None = None
+    sketch: pl.DataFrame | None = None
+    cases: pl.DataFrame | None = None
+
+    @property
+    def gamma(self) -> float:
+        """Base of the sketch buckets."""
+        return (1.0 + self.relative_accuracy) / (1.0 - self.relative_accuracy)
+
+    @property
+    def case_keys(self) -> list[str]:
+        """Keys defining a set of cases."""
+        return [k for k in self.keys if k not in _MEMBER_KEYS]
+
+    def update(self, chunk: pl.DataFrame | pl.LazyFrame) -> EnsembleStatistics:
+        """Add data of some cases.
+
+        The cases in the chunks should not repeat.
+
+        Parameters
+        ----------
+        chunk
+            table with case_id, the keys and the quantities
+
+        Returns
+        -------
+        self - for chaining
+        """
+        long = (
+            chunk.lazy()
+            .select("case_id", *self.keys, pl.col(self.quantities).cast(pl.Float64))
+            .unpivot(
+                on=self.quantities,
+                index=["case_id", *self.keys],
+                variable_name="quantity",
+                value_name="value",
+            )
+            .with_columns(pl.col("quantity").cast(pl.Enum(self.quantities)))
+        )
+        groups = [*self.keys, "quantity"]
+        x = pl.col("value")
+        moments = long.group_by(groups).agg(
+            pl.len().cast(pl.Float64).alias("n"),
+            x.mean().alias("mean"),
+            ((x - x.mean()) ** 2).sum().alias("m2"),
+            x.min().alias("min"),
+            x.max().alias("max"),
+        )
+        log_gamma = math.log(self.gamma)
+        bucket = (
+            pl.when(x > 0.0)
+            .then((x.log() / log_gamma).ceil().cast(pl.Int32))
+            .otherwise(pl.lit(_ZERO_BUCKET, dtype=pl.Int32))
+        )
+        sketch = long.group_by(*groups, bucket.alias("bucket")).agg(
+            pl.len().cast(pl.Float64).alias("count"),
+        )
+        cases = long.group_by(self.case_keys).agg(
+            pl.col("case_id").n_unique().cast(pl.Float64).alias("cases"),
+        )
+        self._merge(*pl.collect_all([moments, sketch, cases]))
+        return self
+
+    def merge(self, other: EnsembleStatistics) -> EnsembleStatistics:
+        """Merge statistics accumulated over other cases, for example, in other process.
+
+        Parameters
+        ----------
+        other
+            statistics to add
+
+        Returns
+        -------
+        self - for chaining
+        """
+        if other.moments is not None and other.sketch is not None and other.cases is not None:
+            self._merge(other.moments, other.sketch, other.cases)
+        return self
+
+    def _merge(self, moments: pl.DataFrame, sketch: pl.DataFrame, cases: pl.DataFrame) -> None:
+        if self.moments is None or self.sketch is None or self.cases is None:
+            self.moments, self.sketch, self.cases = moments, sketch, cases
+            return
+        groups = [*self.keys, "quantity"]
+        self.moments = _merge_moments(self.moments, moments, groups)
+        self.sketch = (
+            pl.concat([self.sketch, sketch]).group_by(*groups, "bucket").agg(pl.col("count").sum())
+        )
+        self.cases = (
+            pl.concat([self.cases, cases]).group_by(self.case_keys).agg(pl.col("cases").sum())
+        )
+
+    def result(self, quantiles: Sequence[float] = (0.05, 0.5, 0.95)) -> pl.DataFrame:
+        """Compute the statistics.
+
+        Parameters
+        ----------
+        quantiles
+            probabilities of the quantiles to estimate
+
+        Returns
+        -------
+        keys, quantity, cases, mean, std (with ddof=1), min, max,
+        and the quantile estimates in columns named like p5, p50, p95
+
+        Raises
+        ------
+        ValueError: if no data are added.
+        """
+        if self.moments is None or self.sketch is None or self.cases is None:
+            msg = "No data to compute ensemble statistics"
+            raise ValueError(msg)
+        groups = [*self.keys, "quantity"]
+        # account the missing values as zeros
+        zeros = (
+            self.moments.join(self.cases, on=self.case_keys)
+            .with_columns((pl.col("cases") - pl.col("n")).alias("zeros"))
+            .select(*groups, "cases", "zeros")
+        )
+        moments = (
+            _merge_moments(
+                self.moments,
+                zeros.filter(pl.col("zeros") > 0.0).select(
+                    *groups,
+                    pl.col("zeros").alias("n"),
+                    mean=pl.lit(0.0),
+                    m2=pl.lit(0.0),
+                    min=pl.lit(0.0),
+                    max=pl.lit(0.0),
+                ),
+                groups,
+            )
+            .join(zeros.select(*groups, "cases"), on=groups)
+            .select(
+                *groups,
+                pl.col("cases").cast(pl.UInt32),
+                "mean",
+                pl.when(pl.col("n") > 1.0)
+                .then((pl.col("m2") / (pl.col("n") - 1.0)).sqrt())
+                .otherwise(0.0)
+                .alias("std"),
+                "min",
+                "max",
+            )
+        )
+        sketch = pl.concat(
+            [
+                self.sketch,
+                zeros.filter(pl.col("zeros") > 0.0).select(
+                    *groups,
+                    bucket=pl.lit(_ZERO_BUCKET, dtype=pl.Int32),
+                    count=pl.col("zeros"),
+                ),
+            ],
+        )
+        result = moments
+        if quantiles:
+            estimates = _estimate_quantiles(sketch, groups, quantiles, self.gamma)
+            result = result.join(estimates, on=groups, how="left")
+        # the bucket estimates are clamped to the exact range
+        return result.with_columns(
+            pl.col(_quantile_name(q)).clip(pl.col("min"), pl.col("max")) for q in quantiles
+        ).sort(groups)
+
+
+def _merge_moments(a: pl.DataFrame, b: pl.DataFrame, groups: list[str]) -> pl.DataFrame:
+    """Merge moments of disjoint sets of values with Chan et al. formulas."""
+    na = pl.col("n").fill_null(0.0)
+    nb = pl.col("n_b").fill_null(0.0)
+    n = na + nb
+    delta = pl.col("mean_b").fill_null(0.0) - pl.col("mean").fill_null(0.0)
+    return a.join(b, on=groups, how="full", coalesce=True, suffix="_b").select(
+        *groups,
+        n.alias("n"),
+        (pl.col("mean").fill_null(0.0) + delta * nb / n).alias("mean"),
+        (
+            pl.col("m2").fill_null(0.0) + pl.col("m2_b").fill_null(0.0) + delta**2 * na * nb / n
+        ).alias("m2"),
+        pl.min_horizontal("min", "min_b").alias("min"),
+        pl.max_horizontal("max", "max_b").alias("max"),
+    )
+
+
+def _quantile_name(q: float) -> str:
+    return f"p{100.0 * q:g}"
+
+
+def _estimate_quantiles(
+    sketch: pl.DataFrame,
+    groups: list[str],
+    quantiles: Sequence[float],
+    gamma: float,
+) -> pl.DataFrame:
+    """Find the buckets containing the values of the ranks q * (n - 1) for every quantile q."""
+    bucket_value = (
+        pl.when(pl.col("bucket") == _ZERO_BUCKET)
+        .then(0.0)
+        .otherwise(2.0 * pl.lit(gamma).pow(pl.col("bucket")) / (gamma + 1.0))
+    )
+    ranked = (
+        sketch.sort(*groups, "bucket")
+        .with_columns(
+            pl.col("count").cum_sum().over(groups).alias("cumulative"),
+            pl.col("count").sum().over(groups).alias("total"),
+        )
+        .join(
+            pl.DataFrame({"q": list(quantiles), "name": [_quantile_name(q) for q in quantiles]}),
+            how="cross",
+        )
+        .filter(pl.col("cumulative") > pl.col("q") * (pl.col("total") - 1.0))
+        .group_by(*groups, "name")
+        .agg(pl.col("bucket").min())
+        .with_columns(bucket_value.alias("value"))
+    )
+    return ranked.pivot(on="name", index=groups, values="value").select(
+        *groups, *(_quantile_name(q) for q in quantiles)
+    )
+
+
+def ensemble_statistics(
+    source: pl.DataFrame | pl.LazyFrame | Path,
+    *,
+    quantities: Iterable[str] | None = None,
+    quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+    relative_accuracy: float = 0.01,
+    cases_per_chunk: int = 100,
+) -> pl.DataFrame:
+    """Compute statistics over cases reading the source chunk by chunk.
+
+    Parameters
+    ----------
+    source
+        table with case_id column, for example, timestep_nuclide,
+        or parquet file or hive-partitioned directory with such a table
+    quantities
+        columns to compute statistics for, default - the present nuclide quantities
+    quantiles
+        probabilities of the quantiles to estimate
+    relative_accuracy
+        of the quantile estimates
+    cases_per_chunk
+        the number of cases to load at once
+
+    Returns
+    -------
+    keys, quantity, cases, mean, std, min, max, and the quantile estimates
+    """
+    frame = _scan(source) if isinstance(source, Path) else source.lazy()
+    schema = frame.collect_schema()
+    if quantities is None:
+        quantities = [q for q in NUCLIDE_QUANTITIES if q in schema]
+    statistics = EnsembleStatistics(
+        keys=[k for k in ENSEMBLE_KEYS if k in schema],
+        quantities=list(quantities),
+        relative_accuracy=relative_accuracy,
+    )
+    case_ids = frame.select(pl.col("case_id").unique().sort()).collect()["case_id"]
+    for start in range(0, len(case_ids), cases_per_chunk):
+        chunk = case_ids.slice(start, cases_per_chunk).implode()
+        statistics.update(frame.filter(pl.col("case_id").is_in(chunk)))
+    return statistics.result(quantiles)
+
+
+def _scan(path: Path) -> pl.LazyFrame:
+    if path.is_dir():
+        return pl.scan_parquet(path / "**" / "*.parquet", hive_partitioning=True)
+    return pl.scan_parquet(path)
@@ -0,0 +1,581 @@
+"""The Class to represent many neutron spectra sharing one group structure."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, cast
+
+import json
+
+from dataclasses import dataclass
+
+import numpy as np
+import polars as pl
+
+from numpy import array_equal
+
+from xpypact.fluxes import (
+    Fluxes,
+    InconsistentEnergyBinsError,
+    digest_arrays,
+    fispact_709_bins,
+    read_fluxes_many,
+    write_fluxes_many,
+)
+from xpypact.rebinning import rebin
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from pathlib import Path
+
+    import pyarrow as pa
+
+    from xpypact.fluxes import FluxesKind
+    from xpypact.rebinning import Conservation
+    from xpypact.xpypact_types import NDArrayFloat, NDArrayInt
+
+# relative rounding error allowance for sums over groups, see FluxBank.group_close()
+_SUMS_SLACK = 1.0e-12
+
+ENERGY_BINS_METADATA_KEY = "xpypact.energy_bins"
+"""Key of the energy bins in Arrow schema and parquet file metadata."""
+
+
+@dataclass(eq=False, order=False)
+class FluxBank:
+    """Many spectra over one shared energy bins vector.
+
+    The spectra are stored as a contiguous array [N, G],
+    where N is the number of spectra and G is the number of energy groups.
+    """
+
+    energy_bins: NDArrayFloat
+    fluxes: NDArrayFloat
+    comments: list[str]
+    norms: NDArrayFloat
+
+    def __post_init__(self) -> None:
+        """Validate sizes of arrays.
+
+        Raises
+        ------
+        ValueError: if sizes of bins, fluxes, comments and norms are not compatible.
+        """
+        self.fluxes = np.ascontiguousarray(self.fluxes, dtype=float)
+        self.norms = np.asarray(self.norms, dtype=float)
+        if self.fluxes.ndim != 2 or self.fluxes.shape[1] != self.energy_bins.size - 1:  # noqa: PLR2004
+            msg = (
+                "Incompatible shapes of bins and fluxes, "
+                f"{self.energy_bins.shape} and {self.fluxes.shape}"
+            )
+            raise ValueError(msg)
+        if not len(self.comments) == self.norms.size == self.fluxes.shape[0]:
+            msg = (
+                "Incompatible sizes of fluxes, comments and norms, "
+                f"{self.fluxes.shape[0]}, {len(self.comments)} and {self.norms.size}"
+            )
+            raise ValueError(msg)
+        bins_709 = fispact_709_bins()
+        if self.energy_bins is not bins_709 and array_equal(self.energy_bins, bins_709):
+            self.energy_bins = bins_709  # see is_709_fluxes()
+
+    def __len__(self) -> int:
+        """Get the number of spectra.
+
+        Returns
+        -------
+        int: the number of spectra
+        """
+        return int(self.fluxes.shape[0])
+
+    def __getitem__(self, item: int) -> Fluxes:
+        """Get a spectrum as Fluxes, the values are a view on the bank.
+
+        Parameters
+        ----------
+        item
+            index of a spectrum
+
+        Returns
+        -------
+        Fluxes: the spectrum
+        """
+        return Fluxes(self.energy_bins, self.fluxes[item], self.comments[item], self.norms[item])
+
+    def __iter__(self) -> Iterator[Fluxes]:
+        """Iterate over spectra.
+
+        Returns
+        -------
+        Iterator over the spectra as Fluxes.
+        """
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def totals(self) -> NDArrayFloat:
+        """Return flux totals.
+
+        Returns
+        -------
+        totals of all the spectra
+        """
+        return self.fluxes.sum(axis=1)
+
+    @property
+    def energy_mids(self) -> NDArrayFloat:
+        """Return middles of energy bins.
+
+        Returns
+        -------
+        the middles of the energy bins
+        """
+        return 0.5 * (self.energy_bins[1:] + self.energy_bins[:-1])
+
+    @property
+    def lethargy_widths(self) -> NDArrayFloat:
+        """Return widths of energy bins in lethargy, ln(E[g+1]/E[g]).
+
+        Returns
+        -------
+        the lethargy widths of the energy bins
+        """
+        return cast("NDArrayFloat", np.log(self.energy_bins[1:] / self.energy_bins[:-1]))
+
+    @property
+    def mean_energies(self) -> NDArrayFloat:
+        """Return flux weighted mean energies, zero for zero spectra.
+
+        Returns
+        -------
+        the mean energies of all the spectra
+        """
+        totals = self.totals
+        weighted = self.fluxes @ self.energy_mids
+        return np.divide(weighted, totals, out=np.zeros_like(totals), where=totals != 0.0)
+
+    def per_unit_lethargy(self) -> NDArrayFloat:
+        """Convert the fluxes to fluxes per unit lethargy.
+
+        Returns
+        -------
+        array [N, G] of the fluxes divided by the lethargy widths of the bins
+        """
+        return self.fluxes / self.lethargy_widths
+
+    def normalized(self, total: float = 1.0) -> FluxBank:
+        """Scale spectra to the given total, zero spectra are left as is.
+
+        Parameters
+        ----------
+        total
+            the total of every spectrum in the result
+
+        Returns
+        -------
+        FluxBank: the normalized spectra
+        """
+        totals = self.totals
+        scale = np.divide(total, totals, out=np.ones_like(totals), where=totals != 0.0)
+        return FluxBank(
+            self.energy_bins, self.fluxes * scale[:, np.newaxis], self.comments, self.norms
+        )
+
+    def rebin(
+        self,
+        energy_bins: NDArrayFloat | None = None,
+        conserve: Conservation = "lethargy",
+    ) -> FluxBank:
+        """Rebin all the spectra to other group structure at once.
+
+        Parameters
+        ----------
+        energy_bins
+            target energy bins, default - FISPACT 709 groups
+        conserve
+            measure overlapping of groups in lethargy or energy
+
+        Returns
+        -------
+        FluxBank: the rebinned spectra with the same comments and norms
+        """
+        if energy_bins is None:
+            energy_bins = fispact_709_bins()
+        return FluxBank(
+            energy_bins,
+            rebin(self.fluxes, self.energy_bins, energy_bins, conserve),
+            self.comments,
+            self.norms,
+        )
+
+    def digests(self) -> list[str]:
+        """Compute content digests of the spectra.
+
+        Returns
+        -------
+        list[str]: digests equal to :attr:`xpypact.fluxes.Fluxes.digest` of the spectra
+        """
+        return [digest_arrays(self.energy_bins, row) for row in self.fluxes]
+
+    def deduplicate(self) -> tuple[NDArrayInt, NDArrayInt]:
+        """Find bitwise unique spectra.
+
+        The comments and norms are disregarded.
+        Use the result to run FISPACT once per unique spectrum and
+        fan out the results with the inverse index.
+
+        Returns
+        -------
+        indices of representatives (first occurrences of unique spectra),
+        index of representative in the first array for every spectrum
+        """
+        n, g = self.fluxes.shape
+        rows = (self.fluxes + 0.0).view(np.dtype((np.void, 8 * g))).reshape(n)  # -0.0 -> 0.0
+        _, index, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        order = np.argsort(index)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(order.size)
+        return index[order], rank[inverse.reshape(n)]
+
+    def group_close(
+        self,
+        rtol: float = 1.0e-5,
+        atol: float = 1.0e-8,
+        blocks: int = 16,
+    ) -> tuple[NDArrayInt, NDArrayInt]:
+        """Group spectra close to representatives.
+
+        A spectrum not assigned yet becomes a representative in order of the spectra,
+        then all the unassigned spectra close to it join its group.
+        Closeness is checked with exact semantics of :func:`xpypact.fluxes.are_fluxes_close`
+        for a member and its representative (as the second argument).
+
+        To avoid comparison of all the pairs, the candidates are selected with
+        sorted totals and sums over blocks of equal lethargy width. The difference
+        of such sums is limited by the same tolerances, so no close spectrum is missed.
+
+        Parameters
+        ----------
+        rtol
+            relative tolerance
+        atol
+            absolute tolerance
+        blocks
+            the number of lethargy blocks to prefilter candidates
+
+        Returns
+        -------
+        indices of representatives, index of representative in the first array for every spectrum
+        """
+        n, g = self.fluxes.shape
+        starts = self._lethargy_block_starts(blocks)
+        sizes = np.diff(np.append(starts, g))
+        sums = np.add.reduceat(self.fluxes, starts, axis=1)
+        abs_sums = np.add.reduceat(np.abs(self.fluxes), starts, axis=1)
+        abs_totals = abs_sums.sum(axis=1)
+        totals = sums.sum(axis=1)
+        order = np.argsort(totals, kind="stable")
+        sorted_totals = totals[order]
+        inverse = np.full(n, -1, dtype=np.int64)
+        representatives: list[int] = []
+        for i in range(n):
+            if inverse[i] >= 0:
+                continue
+            inverse[i] = len(representatives)
+            representatives.append(i)
+            width = g * atol + rtol * abs_totals[i] + _SUMS_SLACK * abs_totals[i]
+            lo = np.searchsorted(sorted_totals, totals[i] - width, side="left")
+            hi = np.searchsorted(sorted_totals, totals[i] + width, side="right")
+            candidates = order[lo:hi]
+            candidates = candidates[inverse[candidates] < 0]
+            slack = _SUMS_SLACK * (abs_sums[candidates] + abs_sums[i])
+            bound = sizes * atol + rtol * abs_sums[i] + slack
+            candidates = candidates[np.all(np.abs(sums[candidates] - sums[i]) <= bound, axis=1)]
+            reference = self.fluxes[i]
+            close = np.all(
+                np.abs(self.fluxes[candidates] - reference) <= atol + rtol * np.abs(reference),
+                axis=1,
+            )
+            inverse[candidates[close]] = inverse[i]
+        return np.asarray(representatives, dtype=np.int64), inverse
+
+    def _lethargy_block_starts(self, blocks: int) -> NDArrayInt:
+        g = self.fluxes.shape[1]
+        if self.energy_bins[0] > 0.0:
+            lethargy = np.cumsum(self.lethargy_widths)
+            edges = np.linspace(0.0, lethargy[-1], blocks + 1)[1:-1]
+            starts = np.searchsorted(lethargy, edges, side="right")
+        else:  # lethargy is not defined, use blocks of equal sizes
+            starts = np.linspace(0, g, blocks + 1, dtype=np.int64)[1:-1]
+        return np.unique(np.concatenate([[0], starts[starts < g]]))
+
+    @classmethod
+    def from_fluxes(cls, fluxes: Iterable[Fluxes]) -> FluxBank:
+        """Stack Fluxes with the same energy bins.
+
+        Parameters
+        ----------
+        fluxes
+            spectra to stack
+
+        Returns
+        -------
+        FluxBank: the stacked spectra
+
+        Raises
+        ------
+        ValueError: if there are no spectra, the energy bins are undefined then.
+        InconsistentEnergyBinsError: if energy bins differ.
+        """
+        items = list(fluxes)
+        if not items:
+            msg = "Cannot stack empty sequence of spectra: the energy bins are undefined"
+            raise ValueError(msg)
+        energy_bins = items[0].energy_bins
+        if any(not array_equal(energy_bins, f.energy_bins) for f in items[1:]):
+            raise InconsistentEnergyBinsError
+        return cls(
+            energy_bins,
+            np.stack([f.fluxes for f in items]),
+            [f.comment for f in items],
+            np.fromiter((f.norm for f in items), dtype=float, count=len(items)),
+        )
+
+    @classmethod
+    def from_files(
+        cls,
+        paths: Sequence[Path],
+        kind: FluxesKind = "709",
+        workers: int = 1,
+    ) -> FluxBank:
+        """Read FISPACT flux files.
+
+        Parameters
+        ----------
+        paths
+            files to read
+        kind
+            "709" - for FISPACT 709-group fluxes, "arb" - for arbitrary fluxes
+        workers
+            the number of processes to parse the files
+
+        Returns
+        -------
+        FluxBank: the loaded spectra
+        """
+        return cls(*read_fluxes_many(paths, kind, workers))
+
+    def to_files(self, paths: Sequence[Path], workers: int = 1) -> None:
+        """Write the spectra to FISPACT flux files.
+
+        Parameters
+        ----------
+        paths
+            where to write, one file per spectrum
+        workers
+            the number of processes to write the files
+        """
+        write_fluxes_many(list(self), paths, workers)
+
+    @classmethod
+    def from_directory(
+        cls,
+        directory: Path,
+        pattern: str = "fluxes_*",
+        kind: FluxesKind = "709",
+        workers: int = 1,
+    ) -> FluxBank:
+        """Read FISPACT flux files from a directory in order of names.
+
+        Parameters
+        ----------
+        directory
+            where to read from
+        pattern
+            glob pattern to select the files
+        kind
+            "709" - for FISPACT 709-group fluxes, "arb" - for arbitrary fluxes
+        workers
+            the number of processes to parse the files
+
+        Returns
+        -------
+        FluxBank: the loaded spectra
+        """
+        return cls.from_files(sorted(directory.glob(pattern)), kind, workers)
+
+    def to_directory(
+        self, directory: Path, prefix: str = "fluxes_", workers: int = 1
+    ) -> list[Path]:
+        """Write the spectra to files <prefix><index> in a directory.
+
+        The indices are padded with zeros to retain the order on :meth:`from_directory`.
+
+        Parameters
+        ----------
+        directory
+            where to write, is created if absent
+        prefix
+            file names prefix
+        workers
+            the number of processes to write the files
+
+        Returns
+        -------
+        list[Path]: the written files
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        width = len(str(max(len(self) - 1, 0)))
+        paths = [directory / f"{prefix}{i:0{width}d}" for i in range(len(self))]
+        self.to_files(paths, workers)
+        return paths
+
+    def to_polars(self) -> pl.DataFrame:
+        """Present the spectra as Polars table.
+
+        Returns
+        -------
+        table with columns comment, norm and fluxes as fixed size array
+        """
+        return pl.DataFrame(
+            [
+                pl.Series("comment", self.comments, dtype=pl.String),
+                pl.Series("norm", self.norms, dtype=pl.Float64),
+                pl.Series("fluxes", self.fluxes),
+            ],
+        )
+
+    @classmethod
+    def from_polars(cls, df: pl.DataFrame, energy_bins: NDArrayFloat) -> FluxBank:
+        """Load spectra from Polars table.
+
+        Parameters
+        ----------
+        df
+            table in the format of :meth:`to_polars`
+        energy_bins
+            the energy bins shared by the spectra
+
+        Returns
+        -------
+        FluxBank: the loaded spectra
+        """
+        values = df["fluxes"]
+        if isinstance(values.dtype, pl.List):  # variable size lists, as in DuckDB schema
+            values = values.explode()
+        return cls(
+            energy_bins,
+            values.to_numpy().reshape(df.height, energy_bins.size - 1),
+            df["comment"].to_list(),
+            df["norm"].to_numpy(),
+        )
+
+    def to_tables(self, case_ids: Sequence[int] | NDArrayInt) -> tuple[pl.DataFrame, pl.DataFrame]:
+        """Present the spectra as flux and flux_bins tables of xpypact dataset.
+
+        Parameters
+        ----------
+        case_ids
+            case_id for every spectrum
+
+        Returns
+        -------
+        flux table: case_id and the columns of :meth:`to_polars`,
+        flux_bins table: g [0..G], boundary[g]
+
+        Raises
+        ------
+        ValueError: if the number of case_ids differs from the number of spectra.
+        """
+        if len(case_ids) != len(self):
+            msg = f"Expected {len(self)} case_ids, got {len(case_ids)}"
+            raise ValueError(msg)
+        flux = self.to_polars().insert_column(0, pl.Series("case_id", case_ids, dtype=pl.UInt32))
+        flux_bins = pl.DataFrame(
+            [
+                pl.Series("g", np.arange(self.energy_bins.size), dtype=pl.UInt16),
+                pl.Series("boundary", self.energy_bins, dtype=pl.Float64),
+            ],
+        ).with_columns(pl.col("g").set_sorted(), pl.col("boundary").set_sorted())
+        return flux, flux_bins
+
+    @classmethod
+    def from_tables(cls, flux: pl.DataFrame, flux_bins: pl.DataFrame) -> FluxBank:
+        """Load spectra from flux and flux_bins tables.
+
+        Parameters
+        ----------
+        flux
+            table in the format of :meth:`to_tables`, the spectra are taken in order of rows
+        flux_bins
+            the energy bins shared by the spectra
+
+        Returns
+        -------
+        FluxBank: the loaded spectra
+        """
+        energy_bins = flux_bins.sort("g")["boundary"].to_numpy()
+        return cls.from_polars(flux, energy_bins)
+
+    def to_arrow(self) -> pa.Table:
+        """Present the spectra as Arrow table.
+
+        The energy bins are stored in the schema metadata.
+
+        Returns
+        -------
+        table in the format of :meth:`to_polars`
+        """
+        table = self.to_polars().to_arrow()
+        return table.replace_schema_metadata({ENERGY_BINS_METADATA_KEY: self._bins_as_json()})
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table) -> FluxBank:
+        """Load spectra from Arrow table.
+
+        Parameters
+        ----------
+        table
+            table in the format of :meth:`to_arrow`
+
+        Returns
+        -------
+        FluxBank: the loaded spectra
+        """
+        energy_bins = _bins_from_json(table.schema.metadata[ENERGY_BINS_METADATA_KEY.encode()])
+        return cls.from_polars(cast("pl.DataFrame", pl.from_arrow(table)), energy_bins)
+
+    def write_parquet(self, path: Path) -> None:
+        """Save the spectra to parquet file.
+
+        The energy bins are stored in the file metadata.
+
+        Parameters
+        ----------
+        path
+            where to save
+        """
+        self.to_polars().write_parquet(
+            path, metadata={ENERGY_BINS_METADATA_KEY: self._bins_as_json()}
+        )
+
+    @classmethod
+    def read_parquet(cls, path: Path) -> FluxBank:
+        """Load spectra from parquet file.
+
+        Parameters
+        ----------
+        path
+            file saved with :meth:`write_parquet`
+
+        Returns
+        -------
+        FluxBank: the loaded spectra
+        """
+        energy_bins = _bins_from_json(pl.read_parquet_metadata(path)[ENERGY_BINS_METADATA_KEY])
+        return cls.from_polars(pl.read_parquet(path), energy_bins)
+
+    def _bins_as_json(self) -> str:
+        return json.dumps(self.energy_bins.tolist())
+
+
+def _bins_from_json(text: str | bytes) -> NDArrayFloat:
+    return np.asarray(json.loads(text), dtype=float)
@@ -2,32 +2,37 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, TextIO, cast
+from typing import TYPE_CHECKING, Literal, TextIO, cast
 
+import hashlib
+
+from concurrent import futures  # ProcessPoolExecutor is loaded on first access
 from dataclasses import dataclass
-from functools import singledispatch
+from functools import cache, singledispatch
 from io import StringIO
+from itertools import repeat
 from pathlib import Path
 
 import numpy as np
 
 from numpy import allclose, array_equal
 
-from xpypact.utils.xpypact_io import print_cols
+from xpypact.rebinning import rebin
+from xpypact.utils.xpypact_io import format_cols
 
 FISPACT_709_BINS_NUMBER = 709
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable, Sequence
 
     from _typeshed import SupportsWrite
 
-    from xpypact.xpypact_types import NDArrayFloat
+    from xpypact.rebinning import Conservation
+    from xpypact.xpypact_types import NDArrayFloat, NDArrayInt
 
 # pylint: disable=function-redefined
 
-LAST_TWO_DECADES = np.fromstring(
-    """
+_LAST_TWO_DECADES_TEXT = """
         1.0000E+9
         9.6000E+8
         9.2000E+8
@@ -137,10 +142,49 @@ LAST_TWO_DECADES = np.fromstring(
         1.0600E+7
         1.0400E+7
         1.0200E+7
-    """,
-    dtype=float,
-    sep=" \n",
-)[::-1]
+"""
+
+if TYPE_CHECKING:
+    LAST_TWO_DECADES: NDArrayFloat
+    FISPACT_709_BINS: NDArrayFloat
+
+
+def __getattr__(name: str) -> NDArrayFloat:
+    """Compute the constants on first access.
+
+    Parameters
+    ----------
+    name
+        LAST_TWO_DECADES or FISPACT_709_BINS
+
+    Returns
+    -------
+    the constant array
+
+    Raises
+    ------
+    AttributeError: for other names
+    """
+    if name == "LAST_TWO_DECADES":
+        value = last_two_decades()
+    elif name == "FISPACT_709_BINS":
+        value = fispact_709_bins()
+    else:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    globals()[name] = value
+    return value
+
+
+@cache
+def last_two_decades() -> NDArrayFloat:
+    """Return the bins of FISPACT 709 groups above 10 MeV, computed on first call.
+
+    Returns
+    -------
+    ascending array shared by all the callers
+    """
+    return np.fromstring(_LAST_TWO_DECADES_TEXT, dtype=float, sep=" \n")[::-1]
 
 
 def compute_709_bins() -> NDArrayFloat:
@@ -159,11 +203,22 @@ def compute_709_bins() -> NDArrayFloat:
     array of 709 bins
     """
     template = np.logspace(0, 1, 51)
-    res = np.hstack([template[1:] * 10**i for i in range(-5, 7)] + [LAST_TWO_DECADES])
+    res = np.hstack([template[1:] * 10**i for i in range(-5, 7)] + [last_two_decades()])
     return np.insert(res, 0, 1e-5)
 
 
-FISPACT_709_BINS = compute_709_bins()
+@cache
+def fispact_709_bins() -> NDArrayFloat:
+    """Return FISPACT 709 group bins, computed on first call.
+
+    The same array is used for all the fluxes read as 709 group fluxes,
+    see :func:`is_709_fluxes`. It is also available as FISPACT_709_BINS.
+
+    Returns
+    -------
+    array of 709 bins shared by all the callers
+    """
+    return compute_709_bins()
 
 
 @dataclass(eq=False, order=False)
@@ -199,14 +254,26 @@ class Fluxes:
         """
         return cast("float", np.sum(self.fluxes))
 
+    @property
+    def digest(self) -> str:
+        """Return content digest of energy bins and fluxes values.
+
+        The comment and norm are disregarded, as in :func:`are_fluxes_equal`.
+
+        Returns
+        -------
+        str: hex digest, the same for fluxes with equal data
+        """
+        return digest_arrays(self.energy_bins, self.fluxes)
+
     def __hash__(self) -> int:
-        """Use available information for hash.
+        """Use content digest, comment and norm for hash.
 
         Returns
         -------
         hash
         """
-        return hash((self.energy_bins.size, self.fluxes.size, self.comment, self.norm))
+        return hash((self.digest, self.comment, self.norm))
 
     def __eq__(self, other: object) -> bool:
         """Compare fluxes.
@@ -243,6 +310,60 @@ class Fluxes:
         return not self.__eq__(other)
 
 
+def _canonical_values(values: NDArrayFloat) -> NDArrayFloat:
+    """Present values as contiguous float64 array with -0.0 replaced by 0.0.
+
+    So, arrays equal by value are equal bitwise.
+    """
+    return np.ascontiguousarray(values, dtype=np.float64) + 0.0
+
+
+def digest_arrays(*arrays: NDArrayFloat) -> str:
+    """Compute digest of float arrays values.
+
+    Parameters
+    ----------
+    arrays
+        what to digest
+
+    Returns
+    -------
+    str: hex digest, the same for arrays with equal values and sizes
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        values = _canonical_values(a)
+        h.update(values.size.to_bytes(8, "little"))
+        h.update(values.tobytes())
+    return h.hexdigest()
+
+
+def deduplicate_fluxes(fluxes: Iterable[Fluxes]) -> tuple[NDArrayInt, NDArrayInt]:
+    """Find unique spectra by content digest.
+
+    The comments and norms are disregarded, as in :func:`are_fluxes_equal`.
+
+    Parameters
+    ----------
+    fluxes
+        spectra to deduplicate
+
+    Returns
+    -------
+    indices of representatives (first occurrences of unique spectra),
+    index of representative in the first array for every input spectrum
+    """
+    ranks: dict[str, int] = {}
+    representatives: list[int] = []
+    inverse: list[int] = []
+    for i, f in enumerate(fluxes):
+        rank = ranks.setdefault(f.digest, len(ranks))
+        if rank == len(representatives):
+            representatives.append(i)
+        inverse.append(rank)
+    return np.asarray(representatives, dtype=np.int64), np.asarray(inverse, dtype=np.int64)
+
+
 def is_709_fluxes(fluxes: Fluxes) -> bool:
     """Check if fluxes are 709-kind of fluxes.
 
@@ -258,7 +379,9 @@ def is_709_fluxes(fluxes: Fluxes) -> bool:
     -------
     bool: True, if fluxes are 709 kind of fluxes.
     """
-    return fluxes.energy_bins is FISPACT_709_BINS and fluxes.fluxes.size == FISPACT_709_BINS_NUMBER
+    return (
+        fluxes.energy_bins is fispact_709_bins() and fluxes.fluxes.size == FISPACT_709_BINS_NUMBER
+    )
 
 
 def are_fluxes_equal(a: Fluxes, b: Fluxes) -> bool:
@@ -321,6 +444,36 @@ def are_fluxes_close(
     )
 
 
+def rebin_fluxes(
+    fluxes: Fluxes,
+    energy_bins: NDArrayFloat | None = None,
+    conserve: Conservation = "lethargy",
+) -> Fluxes:
+    """Rebin fluxes to other group structure.
+
+    Parameters
+    ----------
+    fluxes
+        the fluxes to rebin
+    energy_bins
+        target energy bins, default - FISPACT 709 groups
+    conserve
+        measure overlapping of groups in lethargy or energy
+
+    Returns
+    -------
+    Fluxes: the rebinned fluxes with the same comment and norm
+    """
+    if energy_bins is None:
+        energy_bins = fispact_709_bins()
+    return Fluxes(
+        energy_bins,
+        rebin(fluxes.fluxes, fluxes.energy_bins, energy_bins, conserve),
+        fluxes.comment,
+        fluxes.norm,
+    )
+
+
 def read_fluxes(
     stream: TextIO,
     define_bins_and_fluxes: Callable[[NDArrayFloat], tuple[NDArrayFloat, NDArrayFloat]],
@@ -517,33 +670,177 @@ def define_709_bins_and_fluxes(data: NDArrayFloat) -> tuple[NDArrayFloat, NDArra
     """
     if data.size != FISPACT_709_BINS_NUMBER:
         raise StandardFluxesDataSizeError
-    return FISPACT_709_BINS, data[::-1]
+    return fispact_709_bins(), data[::-1]
+
+
+class InconsistentEnergyBinsError(FluxesDataSizeError):
+    """All the fluxes read together should have the same energy bins."""
+
+
+FluxesKind = Literal["709", "arb"]
+
+
+def read_fluxes_many(
+    paths: Sequence[Path],
+    kind: FluxesKind = "709",
+    workers: int = 1,
+) -> tuple[NDArrayFloat, NDArrayFloat, list[str], NDArrayFloat]:
+    """Read multiple FISPACT flux files sharing the same energy bins.
+
+    The files are parsed from bytes directly to rows of one preallocated 2-D array.
+    The norm and comment are found scanning from the end of a file.
+
+    Parameters
+    ----------
+    paths
+        files to read
+    kind
+        "709" - for FISPACT 709-group fluxes, "arb" - for arbitrary fluxes
+    workers
+        the number of processes to parse the files, 1 - parse in the current process
 
+    Returns
+    -------
+    energy bins, fluxes as array [len(paths), len(energy_bins) - 1], comments, norms
 
-def _print_bin_values(fluxes: Fluxes, fid: SupportsWrite[str], max_columns: int = 5) -> None:
-    """Print fluxes bins for FISPACT.
+    Raises
+    ------
+    InconsistentEnergyBinsError: if energy bins of arbitrary fluxes differ.
+    """
+    if workers > 1 and len(paths) > 1:
+        chunk_size = -(-len(paths) // (4 * workers))
+        chunks = [paths[i : i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_read_fluxes_chunk, chunks, repeat(kind)))
+        energy_bins = results[0][0]
+        if kind == "709":
+            energy_bins = fispact_709_bins()  # retain identity, see is_709_fluxes()
+        elif any(not array_equal(energy_bins, r[0]) for r in results[1:]):
+            raise InconsistentEnergyBinsError
+        fluxes = np.empty((len(paths), energy_bins.size - 1), dtype=float)
+        comments: list[str] = []
+        norms = np.empty(len(paths), dtype=float)
+        start = 0
+        for _, chunk_fluxes, chunk_comments, chunk_norms in results:
+            stop = start + chunk_norms.size
+            fluxes[start:stop] = chunk_fluxes
+            norms[start:stop] = chunk_norms
+            comments.extend(chunk_comments)
+            start = stop
+        return energy_bins, fluxes, comments, norms
+    return _read_fluxes_chunk(paths, kind)
+
+
+def _read_fluxes_chunk(
+    paths: Sequence[Path],
+    kind: FluxesKind,
+) -> tuple[NDArrayFloat, NDArrayFloat, list[str], NDArrayFloat]:
+    norms = np.empty(len(paths), dtype=float)
+    comments: list[str] = []
+    energy_bins: NDArrayFloat = fispact_709_bins()
+    fluxes = np.empty((len(paths), FISPACT_709_BINS_NUMBER), dtype=float)
+    for i, path in enumerate(paths):
+        data, norms[i], comment = _split_fluxes_bytes(path.read_bytes())
+        comments.append(comment)
+        if kind == "709":
+            if data.size != FISPACT_709_BINS_NUMBER:
+                raise StandardFluxesDataSizeError
+            fluxes[i] = data[::-1]
+            continue
+        bins, values = define_arb_bins_and_fluxes(data)
+        if i == 0:
+            energy_bins = bins.copy()
+            fluxes = np.empty((len(paths), values.size), dtype=float)
+        elif not array_equal(energy_bins, bins):
+            raise InconsistentEnergyBinsError
+        fluxes[i] = values
+    return energy_bins, fluxes, comments, norms
+
+
+def _split_fluxes_bytes(text: bytes) -> tuple[NDArrayFloat, float, str]:
+    """Split FISPACT fluxes file content to values, norm and comment.
+
+    Parameters
+    ----------
+    text
+        the file content
+
+    Returns
+    -------
+    values in order of the file, norm, comment
+    """
+    end = len(text) - 1 if text.endswith(b"\n") else len(text)
+    comment_start = text.rfind(b"\n", 0, end) + 1
+    norm_start = text.rfind(b"\n", 0, comment_start - 1) + 1
+    comment = text[comment_start:end].strip().decode()
+    norm = float(text[norm_start:comment_start])
+    values = np.array(text[:norm_start].split(), dtype=float)
+    return values, norm, comment
+
+
+def _format_bin_values(fluxes: Fluxes, max_columns: int = 5) -> str:
+    """Format fluxes bins for FISPACT.
 
     Parameters
     ----------
     fluxes
-        to print bins from
-    fid
-        a stream to print to
+        to format bins from
     max_columns
         max columns in output
+
+    Returns
+    -------
+    str: the fluxes values, norm and comment
     """
-    sequence = fluxes.fluxes[::-1]
-    column = print_cols(sequence, fid, max_columns, fmt="{:.5e}")
-    if column != 0:
-        print(file=fid)
-    print(fluxes.norm, file=fid)
-    print(fluxes.comment, file=fid, end="")
+    values = format_cols(fluxes.fluxes[::-1].tolist(), max_columns, fmt="{:.5e}")
+    return f"{values}{fluxes.norm}\n{fluxes.comment}"
 
 
 class NotA709Error(FluxesDataSizeError):
     """Expected 709-group fluxes."""
 
 
+def format_709_fluxes(fluxes: Fluxes, max_columns: int = 7) -> str:
+    """Format standard 709-group fluxes.
+
+    Parameters
+    ----------
+    fluxes
+        what to format
+    max_columns
+        max columns in output
+
+    Returns
+    -------
+    str: the content of FISPACT fluxes file
+
+    Raises
+    ------
+    NotA709Error: if not a valid 709 group "Fluxes" object is provided.
+    """
+    if not is_709_fluxes(fluxes):
+        raise NotA709Error
+    return _format_bin_values(fluxes, max_columns)
+
+
+def format_arbitrary_fluxes(fluxes: Fluxes, max_columns: int = 5) -> str:
+    """Format fluxes in FISPACT arbitrary flux format.
+
+    Parameters
+    ----------
+    fluxes
+        what to format
+    max_columns
+        max number of columns in a row
+
+    Returns
+    -------
+    str: the content of FISPACT arb_flux file
+    """
+    bins = format_cols(fluxes.energy_bins[::-1].tolist(), max_columns, fmt="{:.6e}")
+    return bins + _format_bin_values(fluxes, max_columns)
+
+
 def print_709_fluxes(fluxes: Fluxes, fid: SupportsWrite[str], max_columns: int = 7) -> None:
     """Print standard 709-group fluxes.
 
@@ -560,9 +857,7 @@ def print_709_fluxes(fluxes: Fluxes, fid: SupportsWrite[str], max_columns: int =
     ------
     NotA709Error: if not a valid 709 group "Fluxes" object is provided.
     """
-    if not is_709_fluxes(fluxes):
-        raise NotA709Error
-    _print_bin_values(fluxes, fid, max_columns)
+    fid.write(format_709_fluxes(fluxes, max_columns))
 
 
 def print_arbitrary_fluxes(fluxes: Fluxes, fid: SupportsWrite[str], max_columns: int = 5) -> None:
@@ -577,8 +872,42 @@ def print_arbitrary_fluxes(fluxes: Fluxes, fid: SupportsWrite[str], max_columns:
     max_columns
         max number of columns in a row
     """
-    sequence = fluxes.energy_bins[::-1]
-    column = print_cols(sequence, fid, max_columns, fmt="{:.6e}")
-    if column != 0:
-        print(file=fid)
-    _print_bin_values(fluxes, fid, max_columns)
+    fid.write(format_arbitrary_fluxes(fluxes, max_columns))
+
+
+def write_fluxes_many(
+    fluxes: Sequence[Fluxes],
+    paths: Sequence[Path],
+    workers: int = 1,
+) -> None:
+    """Write multiple fluxes to files.
+
+    The 709-group fluxes (see :func:`is_709_fluxes`) are written in the format of
+    FISPACT fluxes file, others - as arbitrary fluxes.
+    Each file is formatted to one buffer and written with a single call.
+
+    Parameters
+    ----------
+    fluxes
+        what to write
+    paths
+        where to write, parent directories should exist
+    workers
+        the number of processes to format and write the files, 1 - use the current process
+    """
+    tasks = [(f, path, is_709_fluxes(f)) for f, path in zip(fluxes, paths, strict=True)]
+    if workers > 1 and len(tasks) > 1:
+        chunk_size = -(-len(tasks) // (4 * workers))
+        chunks = [tasks[i : i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(_write_fluxes_chunk, chunks):
+                pass
+    else:
+        _write_fluxes_chunk(tasks)
+
+
+def _write_fluxes_chunk(tasks: Sequence[tuple[Fluxes, Path, bool]]) -> None:
+    for fluxes, path, is_709 in tasks:
+        # is_709 is defined by caller: identity of fispact_709_bins() is lost on pickling
+        text = _format_bin_values(fluxes, 7) if is_709 else format_arbitrary_fluxes(fluxes)
+        path.write_text(text, encoding="utf-8")
@@ -0,0 +1,201 @@
+"""Operations on gamma spectra of time steps.
+
+In timestep_gamma table the spectra are stored in long layout: a row per group g,
+where g is the index of the upper bound in gbins (>= 1). The collected results
+present the rates in photons/s, see
+:meth:`xpypact.collector.FullDataCollector.get_timestep_gamma_as_spectrum`,
+FISPACT outputs them in MeV/s. The conversion uses the group midpoints.
+Here the spectra are converted to wide array [spectra, groups]
+to process all of them with vectorized operations.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal, cast
+
+import numpy as np
+import polars as pl
+
+from xpypact.rebinning import overlap_matrix
+
+if TYPE_CHECKING:
+    from xpypact.xpypact_types import NDArrayFloat
+
+GAMMA_KEYS = ["material_id", "case_id", "time_step_number"]
+"""Key columns of a spectrum in timestep_gamma table."""
+
+GammaMeasure = Literal["energy", "photons"]
+"""What gamma rates measure: MeV/s or photons/s."""
+
+_MAX_UINT8 = 255
+
+
+def gbins_boundaries(gbins: pl.DataFrame | NDArrayFloat) -> NDArrayFloat:
+    """Get gamma bins boundaries.
+
+    Parameters
+    ----------
+    gbins
+        gbins table (g, boundary) or array of boundaries
+
+    Returns
+    -------
+    ascending boundaries in double precision
+    """
+    if isinstance(gbins, pl.DataFrame):
+        return gbins.sort("g")["boundary"].cast(pl.Float64).to_numpy()
+    return np.asarray(gbins, dtype=float)
+
+
+def to_gamma_array(timestep_gamma: pl.DataFrame, groups: int) -> tuple[pl.DataFrame, NDArrayFloat]:
+    """Convert gamma spectra from long to wide layout.
+
+    Parameters
+    ----------
+    timestep_gamma
+        table in timestep_gamma layout, the key columns other than g are optional
+    groups
+        the number of gamma groups
+
+    Returns
+    -------
+    sorted keys of the spectra and array [spectra, groups] of the rates,
+    the missing rates are zero
+    """
+    keys = [k for k in GAMMA_KEYS if k in timestep_gamma.columns]
+    if keys:
+        spectra = timestep_gamma.select(keys).unique().sort(keys)
+        rows = (
+            timestep_gamma.select(keys)
+            .join(spectra.with_row_index("row"), on=keys, how="left", maintain_order="left")
+            .get_column("row")
+            .to_numpy()
+        )
+        count = spectra.height
+    else:  # single spectrum
+        spectra = pl.DataFrame()
+        rows = np.zeros(timestep_gamma.height, dtype=np.uint32)
+        count = 1
+    values = np.zeros((count, groups))
+    columns = timestep_gamma["g"].cast(pl.Int64).to_numpy() - 1
+    values[rows, columns] = timestep_gamma["rate"].cast(pl.Float64).to_numpy()
+    return spectra, values
+
+
+def from_gamma_array(
+    spectra: pl.DataFrame,
+    values: NDArrayFloat,
+    dtype: pl.DataType | type[pl.DataType] = pl.Float32,
+) -> pl.DataFrame:
+    """Convert gamma spectra from wide to long layout.
+
+    Parameters
+    ----------
+    spectra
+        keys of the spectra
+    values
+        array [spectra, groups] of rates
+    dtype
+        type of rate column
+
+    Returns
+    -------
+    table in timestep_gamma layout sorted by keys and g
+    """
+    count, groups = values.shape
+    g_dtype = pl.UInt8 if groups <= _MAX_UINT8 else pl.UInt16
+    columns = [
+        pl.Series(name, np.repeat(spectra[name].to_numpy(), groups), dtype=spectra.schema[name])
+        for name in spectra.columns
+    ]
+    columns.append(pl.Series("g", np.tile(np.arange(1, groups + 1), count), dtype=g_dtype))
+    columns.append(pl.Series("rate", values.ravel(), dtype=dtype))
+    return pl.DataFrame(columns)
+
+
+def rebin_gamma_array(
+    values: NDArrayFloat,
+    gbins: NDArrayFloat,
+    target_bins: NDArrayFloat,
+    conserve: GammaMeasure = "energy",
+    *,
+    measure: GammaMeasure = "photons",
+) -> NDArrayFloat:
+    """Rebin gamma spectra to other group structure.
+
+    The conserved measure of a group is assumed to be distributed uniformly
+    over the group energy range. If the rates measure the other thing,
+    they are converted with the group midpoints before and after rebinning.
+
+    Parameters
+    ----------
+    values
+        array [G] or [spectra, G] of rates over gbins
+    gbins
+        ascending boundaries of the source groups
+    target_bins
+        ascending boundaries of the target groups
+    conserve
+        "energy" - conserve the emitted energy, "photons" - conserve the number of photons
+    measure
+        the rates are in "photons" - photons/s or "energy" - MeV/s
+
+    Returns
+    -------
+    array [Gt] or [spectra, Gt] of rates over target bins in the same units
+
+    Raises
+    ------
+    ValueError: if conserve or measure is neither "energy" nor "photons".
+    """
+    for name, value in (("conserve", conserve), ("measure", measure)):
+        if value not in ("energy", "photons"):
+            msg = f"Unknown {name} {value!r}, expected 'energy' or 'photons'"
+            raise ValueError(msg)
+    if conserve == measure:
+        return cast("NDArrayFloat", values @ overlap_matrix(gbins, target_bins, "energy"))
+    source_mids = 0.5 * (gbins[1:] + gbins[:-1])
+    target_mids = 0.5 * (target_bins[1:] + target_bins[:-1])
+    if measure == "photons":  # conserve energy
+        rebinned = (values * source_mids) @ overlap_matrix(gbins, target_bins, "energy")
+        return cast("NDArrayFloat", rebinned / target_mids)
+    rebinned = (values / source_mids) @ overlap_matrix(gbins, target_bins, "energy")
+    return cast("NDArrayFloat", rebinned * target_mids)
+
+
+def rebin_gamma(
+    timestep_gamma: pl.DataFrame,
+    gbins: pl.DataFrame | NDArrayFloat,
+    target_bins: NDArrayFloat,
+    conserve: GammaMeasure = "energy",
+    *,
+    measure: GammaMeasure = "photons",
+) -> pl.DataFrame:
+    """Rebin all the gamma spectra of timestep_gamma table to other group structure.
+
+    The spectra are rebinned with one matrix product, the overlap matrix is cached
+    for the pair of group structures.
+
+    Parameters
+    ----------
+    timestep_gamma
+        table in timestep_gamma layout
+    gbins
+        gbins table (g, boundary) or array of the source boundaries
+    target_bins
+        ascending boundaries of the target groups
+    conserve
+        "energy" - conserve the emitted energy, "photons" - conserve the number of photons
+    measure
+        the rates are in "photons" - photons/s, as in collected results, or "energy" - MeV/s
+
+    Returns
+    -------
+    table in timestep_gamma layout over the target groups, the rates in the same units
+    """
+    source_bins = gbins_boundaries(gbins)
+    spectra, values = to_gamma_array(timestep_gamma, source_bins.size - 1)
+    rebinned = rebin_gamma_array(
+        values, source_bins, np.asarray(target_bins, dtype=float), conserve, measure=measure
+    )
+    return from_gamma_array(spectra, rebinned, timestep_gamma.schema["rate"])
@@ -0,0 +1,294 @@
+"""Decay gamma sources for Monte Carlo transport.
+
+The gamma spectra of many time steps (cells, cases) are converted to source
+distributions at once: total intensities in photons/s and normalized cumulative
+distributions over energy groups. The distributions are computed once and reused
+for sampling and export: parquet table or MCNP SI/SP cards.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, cast
+
+import json
+
+from dataclasses import dataclass
+
+import numpy as np
+import polars as pl
+
+from xpypact.gamma import GAMMA_KEYS, gbins_boundaries, rebin_gamma_array, to_gamma_array
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from xpypact.xpypact_types import NDArrayFloat, NDArrayInt
+
+ENERGY_BINS_METADATA_KEY = "xpypact.gamma_bins"
+"""Key of the energy bins in parquet file metadata."""
+
+_MCNP_VALUES_PER_LINE = 6
+
+
+@dataclass(eq=False, order=False)
+class GammaSourceBank:
+    """Gamma source distributions over one shared energy bins vector.
+
+    Attrs:
+        energy_bins: ascending group boundaries, MeV
+        keys: material_id, case_id, time_step_number of every source
+        intensities: total intensities, photons/s [N]
+        cdf: cumulative distributions over groups [N, G], the last value is 1,
+             all zeros for zero intensity
+    """
+
+    energy_bins: NDArrayFloat
+    keys: pl.DataFrame
+    intensities: NDArrayFloat
+    cdf: NDArrayFloat
+
+    def __post_init__(self) -> None:
+        """Validate sizes of arrays.
+
+        Raises
+        ------
+        ValueError: if sizes of bins, keys, intensities and cdf are not compatible.
+        """
+        self.cdf = np.ascontiguousarray(self.cdf, dtype=float)
+        self.intensities = np.asarray(self.intensities, dtype=float)
+        if self.cdf.ndim != 2 or self.cdf.shape[1] != self.energy_bins.size - 1:  # noqa: PLR2004
+            msg = (
+                "Incompatible shapes of bins and distributions, "
+                f"{self.energy_bins.shape} and {self.cdf.shape}"
+            )
+            raise ValueError(msg)
+        if not self.keys.height == self.intensities.size == self.cdf.shape[0]:
+            msg = (
+                "Incompatible sizes of keys, intensities and distributions, "
+                f"{self.keys.height}, {self.intensities.size} and {self.cdf.shape[0]}"
+            )
+            raise ValueError(msg)
+
+    def __len__(self) -> int:
+        """Get the number of sources.
+
+        Returns
+        -------
+        int: the number of sources
+        """
+        return self.intensities.size
+
+    @property
+    def probabilities(self) -> NDArrayFloat:
+        """Probabilities of the groups [N, G]."""
+        return np.diff(self.cdf, axis=1, prepend=0.0)
+
+    @classmethod
+    def from_timestep_gamma(
+        cls,
+        timestep_gamma: pl.DataFrame,
+        gbins: pl.DataFrame | NDArrayFloat,
+        *,
+        selection: pl.DataFrame | None = None,
+        energy_bins: NDArrayFloat | None = None,
+    ) -> GammaSourceBank:
+        """Compute source distributions from gamma spectra.
+
+        Parameters
+        ----------
+        timestep_gamma
+            table in timestep_gamma layout, rates in photons/s as in collected results
+        gbins
+            gbins table (g, boundary) or array of the boundaries
+        selection
+            keys of the sources to compute, for example, material_id and time_step_number,
+            None - all
+        energy_bins
+            group structure of the sources, None - gbins,
+            the number of photons is conserved on rebinning
+
+        Returns
+        -------
+        GammaSourceBank: the sources sorted by keys
+        """
+        if selection is not None:
+            timestep_gamma = timestep_gamma.join(selection, on=selection.columns, how="semi")
+        source_bins = gbins_boundaries(gbins)
+        spectra, photons = to_gamma_array(timestep_gamma, source_bins.size - 1)
+        if energy_bins is None:
+            energy_bins = source_bins
+        else:
+            energy_bins = np.asarray(energy_bins, dtype=float)
+            photons = rebin_gamma_array(
+                photons, source_bins, energy_bins, "photons", measure="photons"
+            )
+        cumulative = np.cumsum(photons, axis=1)
+        intensities = cumulative[:, -1].copy()
+        np.divide(
+            cumulative,
+            intensities[:, np.newaxis],
+            out=cumulative,
+            where=intensities[:, np.newaxis] > 0.0,
+        )
+        cumulative[intensities > 0.0, -1] = 1.0  # exactly
+        cumulative[intensities <= 0.0] = 0.0
+        return cls(energy_bins, spectra, intensities, cumulative)
+
+    def sample(
+        self,
+        sources: NDArrayInt,
+        rng: np.random.Generator,
+    ) -> NDArrayFloat:
+        """Sample photon energies.
+
+        The energy is uniformly distributed within a group.
+
+        Parameters
+        ----------
+        sources
+            indices of the sources to sample from, one energy per index
+        rng
+            random generator
+
+        Returns
+        -------
+        energies of the photons, MeV
+
+        Raises
+        ------
+        ValueError: if a source has zero intensity.
+        """
+        empty = self.intensities[sources] <= 0.0
+        if np.any(empty):
+            msg = f"Cannot sample sources with zero intensity: {np.unique(sources[empty]).tolist()}"
+            raise ValueError(msg)
+        cdf = self.cdf[sources]
+        u = rng.random(sources.shape)
+        groups = np.minimum((cdf <= u[:, np.newaxis]).sum(axis=1), self.cdf.shape[1] - 1)
+        lo = self.energy_bins[groups]
+        return cast(
+            "NDArrayFloat", lo + rng.random(sources.shape) * (self.energy_bins[groups + 1] - lo)
+        )
+
+    def to_polars(self) -> pl.DataFrame:
+        """Present the sources as Polars table.
+
+        Returns
+        -------
+        table with the keys, intensity and cdf as fixed size array
+        """
+        return self.keys.with_columns(
+            pl.Series("intensity", self.intensities, dtype=pl.Float64),
+            pl.Series("cdf", self.cdf),
+        )
+
+    @classmethod
+    def from_polars(cls, df: pl.DataFrame, energy_bins: NDArrayFloat) -> GammaSourceBank:
+        """Load sources from Polars table.
+
+        Parameters
+        ----------
+        df
+            table in the format of :meth:`to_polars`
+        energy_bins
+            the energy bins shared by the sources
+
+        Returns
+        -------
+        GammaSourceBank: the loaded sources
+        """
+        values = df["cdf"]
+        if isinstance(values.dtype, pl.List):
+            values = values.explode()
+        return cls(
+            energy_bins,
+            df.select(c for c in GAMMA_KEYS if c in df.columns),
+            df["intensity"].to_numpy(),
+            values.to_numpy().reshape(df.height, energy_bins.size - 1),
+        )
+
+    def write_parquet(self, path: Path) -> None:
+        """Save the sources to parquet file.
+
+        The energy bins are stored in the file metadata.
+
+        Parameters
+        ----------
+        path
+            where to save
+        """
+        self.to_polars().write_parquet(
+            path, metadata={ENERGY_BINS_METADATA_KEY: json.dumps(self.energy_bins.tolist())}
+        )
+
+    @classmethod
+    def read_parquet(cls, path: Path) -> GammaSourceBank:
+        """Load sources from parquet file.
+
+        Parameters
+        ----------
+        path
+            file saved with :meth:`write_parquet`
+
+        Returns
+        -------
+        GammaSourceBank: the loaded sources
+        """
+        metadata = pl.read_parquet_metadata(path)
+        energy_bins = np.asarray(json.loads(metadata[ENERGY_BINS_METADATA_KEY]), dtype=float)
+        return cls.from_polars(pl.read_parquet(path), energy_bins)
+
+    def format_mcnp(self, first_distribution: int = 1) -> str:
+        """Format the sources as MCNP source distribution cards.
+
+        Every source is presented with histogram SI card over the energy bins
+        and SP card with the group probabilities, the distributions are numbered
+        from first_distribution in order of the sources. A source with zero intensity
+        has no distribution: only a comment is written and its number is skipped.
+
+        Parameters
+        ----------
+        first_distribution
+            number of the first distribution
+
+        Returns
+        -------
+        str: the cards with comments presenting the keys and intensities
+        """
+        bins = _format_values(self.energy_bins)
+        probabilities = self.probabilities
+        lines = []
+        for i, (keys, intensity) in enumerate(
+            zip(self.keys.iter_rows(named=True), self.intensities, strict=True)
+        ):
+            d = first_distribution + i
+            comment = " ".join(f"{k}={v}" for k, v in keys.items())
+            if intensity <= 0.0:
+                lines.append(f"c {comment} intensity=0, no distribution {d}")
+                continue
+            lines.append(f"c {comment} intensity={intensity:.6e} photons/s")
+            lines.append(f"SI{d} H {bins}")
+            lines.append(f"SP{d} D 0 {_format_values(probabilities[i])}")
+        return "\n".join(lines) + "\n"
+
+    def write_mcnp(self, path: Path, first_distribution: int = 1) -> None:
+        """Save the sources as MCNP source distribution cards.
+
+        Parameters
+        ----------
+        path
+            where to save
+        first_distribution
+            number of the first distribution
+        """
+        path.write_text(self.format_mcnp(first_distribution), encoding="utf-8")
+
+
+def _format_values(values: NDArrayFloat) -> str:
+    """Format values with MCNP continuation lines."""
+    texts = [f"{v:.6e}" for v in values]
+    chunks = [
+        " ".join(texts[i : i + _MCNP_VALUES_PER_LINE])
+        for i in range(0, len(texts), _MCNP_VALUES_PER_LINE)
+    ]
+    return "\n     ".join(chunks)
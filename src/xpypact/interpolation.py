@@ -0,0 +1,445 @@
+"""Interpolate nuclide quantities at arbitrary cooling times, extrapolate with decay.
+
+The values are interpolated between the time steps of cooling,
+including the last irradiation step, which ends at zero cooling time.
+
+All the quantities of a nuclide are proportional to its amount, so,
+the amount of atoms is interpolated and the other quantities are scaled
+with the amount. Within a cooling interval a nuclide amount is interpolated:
+
+- exactly with exponential decay, if the amounts at the interval ends
+  correspond to the decay of the nuclide, that is, there's no ingrowth;
+- in log-log scale of amount and cooling time otherwise,
+  in log-linear scale for the interval starting at zero cooling time;
+- linearly, if the amount is zero at one of the interval ends.
+
+Beyond the last time step the quantities are extrapolated with decay of the present
+nuclides, see :func:`extrapolate_decay`.
+
+All the nuclides, materials and cases are processed at once
+with vectorized Polars expressions.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import math
+
+import numpy as np
+import polars as pl
+
+from xpypact.aggregation import NUCLIDE_QUANTITIES
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+CASE_KEYS = ["material_id", "case_id"]
+"""Key columns of a case in the timestep tables."""
+
+DECAY_RTOL = 1e-3
+"""Tolerance to recognize pure decay of a nuclide in a cooling interval."""
+
+
+def cooling_steps(timestep: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
+    """Select the time steps to interpolate between.
+
+    These are the last irradiation step and the following cooling steps of every case.
+    If a case is not irradiated, all its steps are selected.
+
+    Parameters
+    ----------
+    timestep
+        table in timestep layout
+
+    Returns
+    -------
+    material_id, case_id, time_step_number, cooling_time (Float64)
+    """
+    steps = timestep.lazy().select(*CASE_KEYS, "time_step_number", "cooling_time", "flux")
+    last_irradiation = (
+        steps.filter(pl.col("flux") > 0.0)
+        .group_by(CASE_KEYS)
+        .agg(pl.col("time_step_number").max().alias("last_irradiation"))
+    )
+    return (
+        steps.join(last_irradiation, on=CASE_KEYS, how="left")
+        .filter(pl.col("time_step_number") >= pl.col("last_irradiation").fill_null(0))
+        .select(
+            *CASE_KEYS,
+            "time_step_number",
+            pl.col("cooling_time").cast(pl.Float64),
+        )
+    )
+
+
+def interpolate_nuclides(
+    timestep: pl.DataFrame | pl.LazyFrame,
+    timestep_nuclide: pl.DataFrame | pl.LazyFrame,
+    nuclide: pl.DataFrame | pl.LazyFrame,
+    cooling_times: Iterable[float],
+    *,
+    decay_rtol: float = DECAY_RTOL,
+) -> pl.DataFrame:
+    """Interpolate nuclide quantities at the given cooling times.
+
+    The cooling times out of the range of the cooling steps of a case are skipped.
+
+    Parameters
+    ----------
+    timestep
+        table in timestep layout
+    timestep_nuclide
+        table in timestep_nuclide layout
+    nuclide
+        table with zai and half_life (seconds, zero for stable nuclides)
+    cooling_times
+        seconds after the end of irradiation
+    decay_rtol
+        tolerance on log of amounts ratio to recognize pure decay in an interval
+
+    Returns
+    -------
+    table in timestep_nuclide layout with cooling_time instead of time_step_number
+    """
+    times = np.unique(np.asarray(list(cooling_times), dtype=float))
+    steps = cooling_steps(timestep)
+    requested = (
+        steps.select(CASE_KEYS)
+        .unique()
+        .join(pl.LazyFrame({"cooling_time": times}), how="cross")
+        .sort("cooling_time")
+    )
+    return (
+        _bracket(requested, steps, timestep_nuclide.lazy(), nuclide.lazy())
+        .pipe(_interpolate, timestep_nuclide.lazy().collect_schema(), decay_rtol)
+        .sort(*CASE_KEYS, "cooling_time", "zai")
+        .collect()
+    )
+
+
+def _bracket(
+    requested: pl.LazyFrame,
+    steps: pl.LazyFrame,
+    timestep_nuclide: pl.LazyFrame,
+    nuclide: pl.LazyFrame,
+) -> pl.LazyFrame:
+    """Join the nuclide values at the ends of the intervals containing the requested times.
+
+    Returns
+    -------
+    keys, cooling_time, t0, t1, zai, half_life, and the quantities with suffixes _0 and _1
+    """
+    steps = steps.sort("cooling_time")
+    brackets = requested.join_asof(
+        steps.select(*CASE_KEYS, pl.col("time_step_number").alias("step_0"), t0="cooling_time"),
+        left_on="cooling_time",
+        right_on="t0",
+        by=CASE_KEYS,
+        strategy="backward",
+        check_sortedness=False,  # sorted by cooling_time, can't be checked with by groups
+    ).join_asof(
+        steps.select(*CASE_KEYS, pl.col("time_step_number").alias("step_1"), t1="cooling_time"),
+        left_on="cooling_time",
+        right_on="t1",
+        by=CASE_KEYS,
+        strategy="forward",
+        check_sortedness=False,
+    )
+    brackets = brackets.drop_nulls(["step_0", "step_1"])
+    schema = timestep_nuclide.collect_schema()
+    quantities = [q for q in NUCLIDE_QUANTITIES if q in schema]
+    ends = []
+    for end in ("0", "1"):
+        values = timestep_nuclide.select(
+            *CASE_KEYS,
+            pl.col("time_step_number").alias(f"step_{end}"),
+            "zai",
+            *(pl.col(q).cast(pl.Float64).alias(f"{q}_{end}") for q in quantities),
+        )
+        ends.append(brackets.join(values, on=[*CASE_KEYS, f"step_{end}"]).drop("step_0", "step_1"))
+    on = [*CASE_KEYS, "cooling_time", "t0", "t1", "zai"]
+    return (
+        ends[0]
+        .join(ends[1], on=on, how="full", coalesce=True)
+        .with_columns(pl.col(r"^.*_[01]$").fill_null(0.0))
+        .join(
+            nuclide.select("zai", pl.col("half_life").cast(pl.Float64)),
+            on="zai",
+            how="left",
+        )
+        .with_columns(pl.col("half_life").fill_null(0.0))
+    )
+
+
+def _interpolate(
+    bracketed: pl.LazyFrame,
+    schema: pl.Schema,
+    decay_rtol: float,
+) -> pl.LazyFrame:
+    t, t0, t1 = pl.col("cooling_time"), pl.col("t0"), pl.col("t1")
+    a0, a1 = pl.col("atoms_0"), pl.col("atoms_1")
+    decay_constant = (
+        pl.when(pl.col("half_life") > 0.0).then(math.log(2.0) / pl.col("half_life")).otherwise(0.0)
+    )
+    span = t1 - t0
+    elapsed = t - t0
+    positive = (a0 > 0.0) & (a1 > 0.0)
+    decays = positive & (((a1 / a0).log() + decay_constant * span).abs() <= decay_rtol)
+    log_a0, log_a1 = a0.log(), a1.log()
+    atoms = (
+        pl.when(span <= 0.0)
+        .then(a0)
+        .when(decays)
+        .then(a0 * (-decay_constant * elapsed).exp())
+        .when(positive & (t0 > 0.0))
+        .then((log_a0 + (log_a1 - log_a0) * (t / t0).log() / (t1 / t0).log()).exp())
+        .when(positive)
+        .then((log_a0 + (log_a1 - log_a0) * elapsed / span).exp())
+        .otherwise(a0 + (a1 - a0) * elapsed / span)
+    )
+    quantities = [q for q in NUCLIDE_QUANTITIES if q in schema]
+
+    def _scale(q: str) -> pl.Expr:
+        q0, q1 = pl.col(f"{q}_0"), pl.col(f"{q}_1")
+        return (
+            pl.when(span <= 0.0)
+            .then(q0)
+            .when(a0 > 0.0)
+            .then(q0 * pl.col("atoms") / a0)
+            .when(a1 > 0.0)
+            .then(q1 * pl.col("atoms") / a1)
+            .otherwise(q0 + (q1 - q0) * elapsed / span)
+            .cast(schema[q])
+            .alias(q)
+        )
+
+    return (
+        bracketed.with_columns(atoms.alias("atoms"))
+        .with_columns(_scale(q) for q in quantities)
+        .select(*CASE_KEYS, "cooling_time", "zai", *quantities)
+    )
+
+
+def _bateman_ingrowth(
+    parent_atoms: pl.Expr,
+    parent_constant: pl.Expr,
+    daughter_constant: pl.Expr,
+    branching_ratio: pl.Expr,
+    time: pl.Expr,
+) -> pl.Expr:
+    """Atoms of daughter produced by decay of parent in time, two-member Bateman solution."""
+    difference = daughter_constant - parent_constant
+    return (
+        pl.when(difference.abs() <= 1e-12 * parent_constant)
+        .then(parent_atoms * parent_constant * time * (-parent_constant * time).exp())
+        .otherwise(
+            parent_atoms
+            * parent_constant
+            / difference
+            * ((-parent_constant * time).exp() - (-daughter_constant * time).exp()),
+        )
+        * branching_ratio
+    )
+
+
+def extrapolate_decay(
+    timestep: pl.DataFrame | pl.LazyFrame,
+    timestep_nuclide: pl.DataFrame | pl.LazyFrame,
+    nuclide: pl.DataFrame | pl.LazyFrame,
+    cooling_times: Iterable[float],
+    *,
+    chains: pl.DataFrame | pl.LazyFrame | None = None,
+) -> pl.DataFrame:
+    """Extrapolate nuclide quantities beyond the last time step with decay only.
+
+    The nuclides present at the last time step of a case decay with their half-lives.
+    Optionally, ingrowth of daughters from parents is added from two-member Bateman solutions.
+    A daughter should be present at the last time step to get quantities other than atoms,
+    so, the chains only increase the amounts of the present nuclides.
+
+    The same model is applied to the interval before the last time step, and the misfit
+    of the model there estimates the model error. The error is assumed to grow at the same rate:
+    error_bound = abs(exp(misfit * (t - t_last) / (t_last - t_prev)) - 1), where
+    misfit = log(atoms_last / modeled_atoms_last). The error_bound is infinite for a nuclide
+    appeared in the last interval not explained by the model, and null, if there's no previous
+    time step or it has the same cooling time.
+
+    Parameters
+    ----------
+    timestep
+        table in timestep layout
+    timestep_nuclide
+        table in timestep_nuclide layout
+    nuclide
+        table with zai and half_life (seconds, zero for stable nuclides)
+    cooling_times
+        seconds after the end of irradiation, the times not after the last time step are skipped
+    chains
+        optional table with columns parent, daughter (zai) and branching_ratio (default 1.0)
+
+    Returns
+    -------
+    synthetic time steps in timestep_nuclide layout with additional columns
+    cooling_time, synthetic (always True) and error_bound, the synthetic time steps are
+    numbered after the last real one
+    """
+    times = np.unique(np.asarray(list(cooling_times), dtype=float))
+    ts = timestep.lazy().select(
+        *CASE_KEYS, "time_step_number", pl.col("cooling_time").cast(pl.Float64)
+    )
+    last_steps = ts.group_by(CASE_KEYS).agg(
+        pl.col("time_step_number").max().alias("last_step"),
+        pl.col("cooling_time").sort_by("time_step_number").last().alias("t_last"),
+    )
+    last_steps = last_steps.join(
+        ts.select(
+            *CASE_KEYS,
+            (pl.col("time_step_number") + 1).alias("last_step"),
+            pl.col("cooling_time").alias("t_prev"),
+        ),
+        on=[*CASE_KEYS, "last_step"],
+        how="left",
+    )
+    requested = (
+        last_steps.join(pl.LazyFrame({"cooling_time": times}), how="cross")
+        .filter(pl.col("cooling_time") > pl.col("t_last"))
+        .sort(*CASE_KEYS, "cooling_time")
+        .select(
+            *CASE_KEYS,
+            "cooling_time",
+            (pl.col("last_step") + pl.int_range(1, pl.len() + 1).over(CASE_KEYS))
+            .cast(pl.UInt32)
+            .alias("time_step_number"),
+            (pl.col("cooling_time") - pl.col("t_last")).alias("elapsed"),
+        )
+    )
+    source = timestep_nuclide.lazy()
+    schema = source.collect_schema()
+    quantities = [q for q in NUCLIDE_QUANTITIES if q in schema]
+    decay_constants = nuclide.lazy().select(
+        "zai",
+        pl.when(pl.col("half_life") > 0.0)
+        .then(math.log(2.0) / pl.col("half_life").cast(pl.Float64))
+        .otherwise(0.0)
+        .alias("decay_constant"),
+    )
+    last = (
+        last_steps.join(
+            source.rename({"time_step_number": "last_step"}), on=[*CASE_KEYS, "last_step"]
+        )
+        .join(
+            source.select(
+                *CASE_KEYS,
+                (pl.col("time_step_number") + 1).alias("last_step"),
+                "zai",
+                pl.col("atoms").cast(pl.Float64).alias("atoms_prev"),
+            ),
+            on=[*CASE_KEYS, "last_step", "zai"],
+            how="left",
+        )
+        .join(decay_constants, on="zai", how="left")
+        .with_columns(
+            pl.col("atoms").cast(pl.Float64).alias("atoms_last"),
+            pl.col("atoms_prev").fill_null(0.0),
+            pl.col("decay_constant").fill_null(0.0),
+            (pl.col("t_last") - pl.col("t_prev")).alias("interval"),
+        )
+    )
+    modeled_last = pl.col("atoms_prev") * (-pl.col("decay_constant") * pl.col("interval")).exp()
+    rows = requested.join(last, on=CASE_KEYS)
+    atoms = pl.col("atoms_last") * (-pl.col("decay_constant") * pl.col("elapsed")).exp()
+    if chains is not None:
+        links = _chain_links(chains.lazy(), last)
+        previous_ingrowth = (
+            links.with_columns(
+                _bateman_ingrowth(
+                    pl.col("parent_atoms_prev"),
+                    pl.col("parent_constant"),
+                    pl.col("decay_constant"),
+                    pl.col("branching_ratio"),
+                    pl.col("interval"),
+                ).alias("ingrowth_prev"),
+            )
+            .group_by(*CASE_KEYS, "zai")
+            .agg(pl.col("ingrowth_prev").sum())
+        )
+        ingrowth = (
+            links.join(requested, on=CASE_KEYS)
+            .with_columns(
+                _bateman_ingrowth(
+                    pl.col("parent_atoms"),
+                    pl.col("parent_constant"),
+                    pl.col("decay_constant"),
+                    pl.col("branching_ratio"),
+                    pl.col("elapsed"),
+                ).alias("ingrowth"),
+            )
+            .group_by(*CASE_KEYS, "cooling_time", "zai")
+            .agg(pl.col("ingrowth").sum())
+        )
+        rows = (
+            rows.join(previous_ingrowth, on=[*CASE_KEYS, "zai"], how="left")
+            .join(ingrowth, on=[*CASE_KEYS, "cooling_time", "zai"], how="left")
+            .with_columns(pl.col("ingrowth_prev", "ingrowth").fill_null(0.0))
+        )
+        modeled_last += pl.col("ingrowth_prev")
+        atoms += pl.col("ingrowth")
+    misfit = (pl.col("atoms_last") / modeled_last).log()
+    error_bound = (
+        pl.when(pl.col("t_prev").is_null() | (pl.col("interval") <= 0.0))
+        .then(None)
+        .when(modeled_last > 0.0)
+        .then((misfit * pl.col("elapsed") / pl.col("interval")).exp().sub(1.0).abs())
+        .when(pl.col("atoms_last") > 0.0)
+        .then(float("inf"))
+        .otherwise(0.0)
+    )
+    scale = pl.col("atoms_extrapolated") / pl.col("atoms_last")
+    return (
+        rows.with_columns(
+            atoms.alias("atoms_extrapolated"),
+            error_bound.cast(pl.Float64).alias("error_bound"),
+        )
+        .select(
+            *CASE_KEYS,
+            "time_step_number",
+            "cooling_time",
+            "zai",
+            *(
+                pl.when(pl.col("atoms_last") > 0.0)
+                .then(pl.col(q).cast(pl.Float64) * scale)
+                .otherwise(pl.col(q))
+                .cast(schema[q])
+                .alias(q)
+                for q in quantities
+            ),
+            pl.lit(value=True).alias("synthetic"),
+            "error_bound",
+        )
+        .sort(*CASE_KEYS, "time_step_number", "zai")
+        .collect()
+    )
+
+
+def _chain_links(chains: pl.LazyFrame, last: pl.LazyFrame) -> pl.LazyFrame:
+    """Join the parents amounts at the last steps to the daughters present there."""
+    if "branching_ratio" not in chains.collect_schema():
+        chains = chains.with_columns(branching_ratio=pl.lit(1.0))
+    parents = last.select(
+        *CASE_KEYS,
+        pl.col("zai").alias("parent"),
+        pl.col("atoms_last").alias("parent_atoms"),
+        pl.col("atoms_prev").alias("parent_atoms_prev"),
+        pl.col("decay_constant").alias("parent_constant"),
+    )
+    daughters = last.select(*CASE_KEYS, "zai", "decay_constant", "interval")
+    return (
+        chains.select(
+            pl.col("parent").cast(pl.UInt32),
+            pl.col("daughter").cast(pl.UInt32).alias("zai"),
+            pl.col("branching_ratio").cast(pl.Float64),
+        )
+        .join(parents, on="parent")
+        .join(daughters, on=[*CASE_KEYS, "zai"])
+    )
@@ -0,0 +1,169 @@
+"""Compose inventories of mixtures from inventories of their components.
+
+FISPACT is run once per component, for example, per element, and the inventories
+of materials are computed as weighted sums of the component inventories.
+The composition table lists the components of every mixture:
+
+======== ========== ==============================================
+column   type       meaning
+======== ========== ==============================================
+mixture  UInt32     mixture id, material_id of the mixture tables
+material UInt32     material_id of a component in the source tables
+fraction Float64    weight of the component, for example, mass fraction
+======== ========== ==============================================
+
+The weights are applied as is, so, the component runs should be normalized
+consistently, for example, to 1 kg of material. The dose of a mixture is approximated
+with the weighted sum of the component doses as well.
+
+All the mixtures are computed at once with one grouped weighted sum per table.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import msgspec as ms
+import polars as pl
+
+from xpypact.aggregation import NUCLIDE_QUANTITIES
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from xpypact.collector import FullDataCollector
+
+ADDITIVE_QUANTITIES = frozenset(
+    [
+        *NUCLIDE_QUANTITIES,
+        "mass",
+        "rate",
+    ],
+)
+"""Columns of timestep, timestep_nuclide and timestep_gamma tables summed with weights."""
+
+_ROW_KEYS = ["case_id", "time_step_number", "zai", "g"]
+
+COMPOSITION_SCHEMA = {
+    "mixture": pl.UInt32,
+    "material": pl.UInt32,
+    "fraction": pl.Float64,
+}
+
+
+class MixtureError(ValueError):
+    """Composition is not consistent with the component data."""
+
+
+def mix_table[Frame: (pl.DataFrame, pl.LazyFrame)](
+    table: Frame,
+    composition: pl.DataFrame,
+    quantities: Iterable[str] | None = None,
+) -> Frame:
+    """Compute mixture table as weighted sums of the component rows.
+
+    The rows are aligned on case_id, time_step_number and zai or g, whatever are present.
+    The other not summed columns, for example, cooling_time, are taken from a component.
+
+    Parameters
+    ----------
+    table
+        table with material_id column, for example, timestep_nuclide
+    composition
+        mixture, material, fraction
+    quantities
+        columns to sum, default - the present additive quantities
+
+    Returns
+    -------
+    table of the same layout with mixture ids in material_id column, lazy for LazyFrame
+    """
+    schema = table.collect_schema()
+    if quantities is None:
+        quantities = [c for c in schema if c in ADDITIVE_QUANTITIES]
+    quantities = list(quantities)
+    keys = [c for c in _ROW_KEYS if c in schema]
+    others = [c for c in schema if c not in quantities and c not in keys and c != "material_id"]
+    weights = (
+        composition.lazy()
+        .select(COMPOSITION_SCHEMA.keys())
+        .cast(COMPOSITION_SCHEMA)  # type: ignore[arg-type]
+        .rename({"mixture": "material_id_mixture", "material": "material_id"})
+    )
+    mixed = (
+        table.lazy()
+        .join(weights, on="material_id")
+        .group_by("material_id_mixture", *keys)
+        .agg(
+            *(
+                (pl.col(q).cast(pl.Float64) * pl.col("fraction")).sum().cast(schema[q])
+                for q in quantities
+            ),
+            *(pl.col(c).first() for c in others),
+        )
+        .rename({"material_id_mixture": "material_id"})
+        .with_columns(pl.col("material_id").cast(schema["material_id"]))
+        .select(schema.names())
+        .sort("material_id", *keys)
+    )
+    if isinstance(table, pl.DataFrame):
+        return mixed.collect()
+    return mixed
+
+
+def mix_result(
+    result: FullDataCollector.Result,
+    composition: pl.DataFrame,
+) -> FullDataCollector.Result:
+    """Compose collected results of mixtures from the results of their components.
+
+    The rundata of a mixture is taken from its first component.
+    The other tables not keyed by material_id are shared with the source.
+
+    Parameters
+    ----------
+    result
+        collected results of the components
+    composition
+        mixture, material, fraction
+
+    Returns
+    -------
+    collected results of the mixtures
+
+    Raises
+    ------
+    MixtureError: if a component is not in the result.
+    """
+    materials = result.timestep["material_id"].unique()
+    missing = composition.filter(~pl.col("material").is_in(materials.implode()))
+    if not missing.is_empty():
+        msg = (
+            "Components are not found in the results: "
+            f"{sorted(missing['material'].unique().to_list())}"
+        )
+        raise MixtureError(msg)
+    first_components = (
+        composition.sort("mixture", "material")
+        .group_by("mixture", maintain_order=True)
+        .first()
+        .select(
+            pl.col("mixture").cast(pl.UInt32),
+            pl.col("material").cast(pl.UInt32).alias("material_id"),
+        )
+    )
+    rundata = (
+        result.rundata.join(first_components, on="material_id")
+        .with_columns(pl.col("mixture").alias("material_id"))
+        .select(result.rundata.columns)
+        .sort("material_id", "case_id")
+    )
+    return ms.structs.replace(
+        result,
+        rundata=rundata,
+        timestep=mix_table(result.timestep, composition),
+        timestep_nuclide=mix_table(result.timestep_nuclide, composition),
+        timestep_gamma=(
+            None if result.timestep_gamma is None else mix_table(result.timestep_gamma, composition)
+        ),
+    )
@@ -4,9 +4,6 @@ from __future__ import annotations
 
 import msgspec as ms
 
-from mckit_nuclides import z
-from mckit_nuclides.nuclides import get_nuclide_mass
-
 # pylint: disable=invalid-name
 
 Avogadro = 6.02214076e23
@@ -66,6 +63,10 @@ class Nuclide(ms.Struct):  # pylint: disable=too-many-instance-attributes
         if self.zai == 0 or (
             self.atoms == FLOAT_ZERO and self.grams > FLOAT_ZERO
         ):  # pragma: no cover
+            # mckit_nuclides is slow to import and is needed only for data from old FISPACT
+            from mckit_nuclides import z  # noqa: PLC0415
+            from mckit_nuclides.nuclides import get_nuclide_mass  # noqa: PLC0415
+
             _z = z(self.element)
             if self.zai == 0:
                 self.zai = _z * 10000 + self.isotope * 10
@@ -0,0 +1,126 @@
+"""Rebinning of group values between energy group structures.
+
+The fraction of a source group value going to a target group
+is the fraction of the source group overlapped by the target one.
+The fractions are measured either in lethargy or in energy.
+The matrix of the fractions is computed once per pair of group structures
+and applied to a whole batch of spectra with one matrix product.
+
+The values out of the target bins range are lost.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal, cast
+
+from functools import lru_cache
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from xpypact.xpypact_types import NDArrayFloat
+
+Conservation = Literal["lethargy", "energy"]
+
+_OVERLAP_CACHE_SIZE = 32
+
+
+class RebinningError(ValueError):
+    """Energy bins are not valid for rebinning."""
+
+
+def overlap_matrix(
+    source_bins: NDArrayFloat,
+    target_bins: NDArrayFloat,
+    conserve: Conservation = "lethargy",
+) -> NDArrayFloat:
+    """Compute fractions of source groups in target groups.
+
+    The result is cached for the given pair of group structures and
+    should not be modified.
+
+    Parameters
+    ----------
+    source_bins
+        ascending energy bins of source groups
+    target_bins
+        ascending energy bins of target groups
+    conserve
+        measure overlapping in lethargy or energy
+
+    Returns
+    -------
+    read only matrix [Gs, Gt] of the source group fractions in the target groups
+    """
+    source_bins = np.ascontiguousarray(source_bins, dtype=float)
+    target_bins = np.ascontiguousarray(target_bins, dtype=float)
+    return _overlap_matrix(
+        source_bins.tobytes(),
+        target_bins.tobytes(),
+        conserve,
+    )
+
+
+@lru_cache(maxsize=_OVERLAP_CACHE_SIZE)
+def _overlap_matrix(source: bytes, target: bytes, conserve: Conservation) -> NDArrayFloat:
+    source_bins = np.frombuffer(source)
+    target_bins = np.frombuffer(target)
+    _check_bins(source_bins, conserve)
+    _check_bins(target_bins, conserve)
+    lo = np.maximum(source_bins[:-1, np.newaxis], target_bins[np.newaxis, :-1])
+    hi = np.minimum(source_bins[1:, np.newaxis], target_bins[np.newaxis, 1:])
+    overlaps = hi > lo
+    if conserve == "lethargy":
+        widths = np.log(source_bins[1:] / source_bins[:-1])
+        parts = np.log(np.divide(hi, lo, out=np.ones_like(hi), where=overlaps))
+    elif conserve == "energy":
+        widths = np.diff(source_bins)
+        parts = np.where(overlaps, hi - lo, 0.0)
+    else:
+        msg = f"Unknown conservation {conserve!r}, expected 'lethargy' or 'energy'"
+        raise RebinningError(msg)
+    matrix = parts / widths[:, np.newaxis]
+    matrix.setflags(write=False)
+    return cast("NDArrayFloat", matrix)
+
+
+def _check_bins(bins: NDArrayFloat, conserve: Conservation) -> None:
+    if bins.size < 2 or not np.all(np.diff(bins) > 0.0):  # noqa: PLR2004
+        msg = "Energy bins should be strictly ascending and define at least one group"
+        raise RebinningError(msg)
+    if conserve == "lethargy" and bins[0] <= 0.0:
+        msg = f"Lethargy is not defined for energy bin {bins[0]}, use energy conservation"
+        raise RebinningError(msg)
+
+
+def rebin(
+    values: NDArrayFloat,
+    source_bins: NDArrayFloat,
+    target_bins: NDArrayFloat,
+    conserve: Conservation = "lethargy",
+) -> NDArrayFloat:
+    """Rebin group values to other group structure.
+
+    Parameters
+    ----------
+    values
+        array [G] or batch [N, G] of group values over the source bins
+    source_bins
+        ascending energy bins of source groups
+    target_bins
+        ascending energy bins of target groups
+    conserve
+        measure overlapping in lethargy or energy
+
+    Returns
+    -------
+    array [Gt] or [N, Gt] of values over the target bins
+
+    Raises
+    ------
+    RebinningError: if the number of values doesn't correspond to the source bins.
+    """
+    if values.shape[-1] != source_bins.size - 1:
+        msg = f"Cannot rebin {values.shape[-1]} values defined on {source_bins.size} energy bins"
+        raise RebinningError(msg)
+    return cast("NDArrayFloat", values @ overlap_matrix(source_bins, target_bins, conserve))
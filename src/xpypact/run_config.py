@@ -0,0 +1,234 @@
+"""Generate FISPACT run directories for many neutron spectra.
+
+Every run directory contains the FISPACT fluxes (or arb_flux) file, the `files` file
+and the input deck. The parts common for all the cases: material, irradiation schedule
+and nuclear data are specified with :class:`RunTemplate`.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import hashlib
+
+from concurrent import futures  # ProcessPoolExecutor is loaded on first access
+
+import msgspec as ms
+
+from xpypact.fluxes import (
+    Fluxes,
+    digest_arrays,
+    fispact_709_bins,
+    format_709_fluxes,
+    format_arbitrary_fluxes,
+    is_709_fluxes,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+    from xpypact.flux_bank import FluxBank
+    from xpypact.xpypact_types import NDArrayFloat
+
+DIGEST_FILE = ".xpypact-digest"
+"""File in a run directory with digest of the data the directory is generated from."""
+
+# change on changing the format of the generated files to regenerate existing directories
+_LAYOUT_VERSION = "3"
+
+
+class IrradiationStep(ms.Struct, frozen=True, gc=False):  # pylint: disable=too-few-public-methods
+    """Step of irradiation schedule.
+
+    Attrs:
+        duration: seconds
+        flux_scale: FISPACT flux amplitude relative to the spectrum total, 0.0 - cooling
+    """
+
+    duration: float
+    flux_scale: float = 1.0
+
+
+class RunTemplate(ms.Struct, frozen=True):  # pylint: disable=too-few-public-methods
+    """Case independent parts of FISPACT run configuration.
+
+    Attrs:
+        material: FISPACT keywords to set initial conditions, for example, DENSITY, MASS, MIND
+        schedule: irradiation and cooling steps
+        nuclear_data: entries of FISPACT `files` file except fluxes, for example
+                      {"ind_nuc": "...", "xs_endf": "...", "dk_endf": "..."}
+        title: FISPACT run title, the case name is appended
+        input_name: FISPACT input file name without extension, outputs are named the same way
+        library_groups: group structure of the nuclear data library to collapse
+                        an arbitrary spectrum into, GETXS -1 <library_groups>
+    """
+
+    material: str
+    schedule: tuple[IrradiationStep, ...]
+    nuclear_data: dict[str, str] = ms.field(default_factory=dict)
+    title: str = "xpypact"
+    input_name: str = "inventory"
+    library_groups: int = 709
+
+    def format_files(self, *, arbitrary: bool = False) -> str:
+        """Format FISPACT `files` file.
+
+        Parameters
+        ----------
+        arbitrary
+            use arb_flux file instead of fluxes
+
+        Returns
+        -------
+        str: the content of `files` file
+        """
+        lines = [f"{key} {value}" for key, value in self.nuclear_data.items()]
+        flux_file = "arb_flux" if arbitrary else "fluxes"
+        lines.append(f"{flux_file} {flux_file}")
+        return "\n".join(lines) + "\n"
+
+    def format_input(self, total_flux: float, name: str = "", *, arbitrary: bool = False) -> str:
+        """Format FISPACT input deck.
+
+        Parameters
+        ----------
+        total_flux
+            the total of the spectrum, n/cm^2/s
+        name
+            the case name to add to title
+        arbitrary
+            the spectrum is in arb_flux file, FISPACT collapses it into library_groups
+
+        Returns
+        -------
+        str: the content of input file
+        """
+        getxs = f"GETXS -1 {self.library_groups}" if arbitrary else "GETXS 1 709"
+        lines = [
+            "CLOBBER",
+            "JSON",
+            getxs,
+            "GETDECAY 1",
+            "FISPACT",
+            f"* {self.title} {name}".rstrip(),
+            self.material.strip(),
+        ]
+        irradiated = False
+        zeroed = False
+        for step in self.schedule:
+            lines.append(f"FLUX {step.flux_scale * total_flux:.6e}")
+            if step.flux_scale > 0.0:
+                irradiated = True
+            elif irradiated and not zeroed:
+                lines.append("ZERO")
+                zeroed = True
+            lines.append(f"TIME {step.duration:.6e} SECS ATOMS")
+        lines += ["END", "* END"]
+        return "\n".join(lines) + "\n"
+
+
+def write_run_directories(
+    root: Path,
+    fluxes: FluxBank,
+    template: RunTemplate,
+    names: Sequence[str] | None = None,
+    workers: int = 1,
+) -> list[Path]:
+    """Write FISPACT run directories, one per spectrum.
+
+    The directories are skipped, if they are generated from the same
+    spectrum, template and name before. The check uses digest of the data
+    stored in the file :data:`DIGEST_FILE`, the files are not formatted for that.
+    Each file is formatted to one buffer and written with a single call.
+
+    Parameters
+    ----------
+    root
+        where to create the run directories
+    fluxes
+        the spectra
+    template
+        case independent parts of the run configuration
+    names
+        names of the run directories, default - indices of the spectra padded with zeros
+    workers
+        the number of processes to format and write the files, 1 - use the current process
+
+    Returns
+    -------
+    list[Path]: the written directories, the unchanged ones are not included
+
+    Raises
+    ------
+    ValueError: if the number of names differs from the number of spectra.
+    """
+    if names is None:
+        width = len(str(max(len(fluxes) - 1, 0)))
+        names = [f"{i:0{width}d}" for i in range(len(fluxes))]
+    elif len(names) != len(fluxes):
+        msg = f"Expected {len(fluxes)} names, got {len(names)}"
+        raise ValueError(msg)
+    is_709 = is_709_fluxes(fluxes[0]) if len(fluxes) else True
+    template_digest = hashlib.blake2b(ms.json.encode(template), digest_size=16).hexdigest()
+    tasks = []
+    for i, name in enumerate(names):
+        directory = root / name
+        digest = _run_digest(
+            template_digest,
+            digest_arrays(fluxes.energy_bins, fluxes.fluxes[i]),
+            fluxes.comments[i],
+            float(fluxes.norms[i]),
+            name,
+        )
+        digest_path = directory / DIGEST_FILE
+        if digest_path.exists() and digest_path.read_text(encoding="utf-8") == digest:
+            continue
+        tasks.append(
+            (directory, name, fluxes.fluxes[i], fluxes.comments[i], fluxes.norms[i], digest)
+        )
+    if workers > 1 and len(tasks) > 1:
+        chunk_size = -(-len(tasks) // (4 * workers))
+        chunks = [tasks[i : i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(
+                _write_run_directories_chunk,
+                chunks,
+                [fluxes.energy_bins] * len(chunks),
+                [template] * len(chunks),
+                [is_709] * len(chunks),
+            ):
+                pass
+    else:
+        _write_run_directories_chunk(tasks, fluxes.energy_bins, template, is_709=is_709)
+    return [task[0] for task in tasks]
+
+
+def _run_digest(
+    template_digest: str, fluxes_digest: str, comment: str, norm: float, name: str
+) -> str:
+    text = "\n".join([_LAYOUT_VERSION, template_digest, fluxes_digest, comment, repr(norm), name])
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _write_run_directories_chunk(
+    tasks: Sequence[tuple[Path, str, NDArrayFloat, str, float, str]],
+    energy_bins: NDArrayFloat,
+    template: RunTemplate,
+    is_709: bool,  # noqa: FBT001 - positional for executor.map()
+) -> None:
+    # is_709 is defined by caller: identity of fispact_709_bins() is lost on pickling
+    if is_709:
+        energy_bins = fispact_709_bins()
+    files = template.format_files(arbitrary=not is_709)
+    flux_file = "fluxes" if is_709 else "arb_flux"
+    for directory, name, values, comment, norm, digest in tasks:
+        fluxes = Fluxes(energy_bins, values, comment, float(norm))
+        text = format_709_fluxes(fluxes) if is_709 else format_arbitrary_fluxes(fluxes)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / flux_file).write_text(text, encoding="utf-8")
+        (directory / "files").write_text(files, encoding="utf-8")
+        deck = template.format_input(fluxes.total, name, arbitrary=not is_709)
+        (directory / f"{template.input_name}.i").write_text(deck, encoding="utf-8")
+        # the digest is written last: an interrupted directory is regenerated next time
+        (directory / DIGEST_FILE).write_text(digest, encoding="utf-8")
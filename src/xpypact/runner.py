@@ -0,0 +1,155 @@
+"""Run FISPACT in local processes and collect the results as the jobs finish.
+
+The runner launches FISPACT in the run directories (see :mod:`xpypact.run_config`)
+with limited concurrency. As soon as a job finishes, its JSON output is loaded
+and passed to a sink, for example, :meth:`xpypact.collector.FullDataCollector.append`.
+So, the aggregation of the results overlaps with the computation.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import subprocess
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path  # noqa: TC003 - required for Struct field
+
+import msgspec as ms
+
+from xpypact.inventory import from_json
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from xpypact.collector import FullDataCollector
+    from xpypact.inventory import Inventory
+
+    Sink = Callable[["FispactJob", Inventory], object]
+
+
+class FispactJob(ms.Struct, frozen=True):  # pylint: disable=too-few-public-methods
+    """FISPACT run directory with identifiers of the results in the collected data.
+
+    Attrs:
+        directory: run directory with input and `files` files
+        material_id: identifier #1 for the collector
+        case_id: identifier #2 for the collector
+    """
+
+    directory: Path
+    material_id: int = 0
+    case_id: int = 0
+
+
+class JobResult(ms.Struct):  # pylint: disable=too-few-public-methods
+    """Outcome of a FISPACT job.
+
+    Attrs:
+        job: the job
+        attempts: the number of launches made
+        error: the last error, empty on success
+    """
+
+    job: FispactJob
+    attempts: int
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        """Check if the job succeeded.
+
+        Returns
+        -------
+        True, if the JSON output is loaded and passed to the sink
+        """
+        return not self.error
+
+
+class FispactRunner(ms.Struct):
+    """Launch FISPACT over run directories with limited concurrency and retries.
+
+    FISPACT is started in a run directory as `<command> <input_name> <files_name>`
+    and is expected to produce `<input_name>.json` there.
+
+    Attrs:
+        command: the executable and its options
+        input_name: input file name without extension, outputs are named the same way
+        files_name: FISPACT `files` file name
+        max_workers: the number of concurrently running jobs
+        retries: the number of relaunches of a failed job
+        timeout: seconds to wait for a job, None - no limit
+    """
+
+    command: list[str] = ms.field(default_factory=lambda: ["fispact"])
+    input_name: str = "inventory"
+    files_name: str = "files"
+    max_workers: int = 1
+    retries: int = 0
+    timeout: float | None = None
+
+    def run(
+        self,
+        jobs: Iterable[FispactJob],
+        sink: FullDataCollector | Sink,
+    ) -> list[JobResult]:
+        """Run the jobs and pass the loaded inventories to the sink as the jobs finish.
+
+        The sink is called from the calling thread only, one inventory at a time.
+
+        Parameters
+        ----------
+        jobs
+            the jobs to run
+        sink
+            collector to append the inventories to, or callable taking job and inventory
+
+        Returns
+        -------
+        list[JobResult]: outcomes of the jobs in order of completion
+        """
+        consume = _as_sink(sink)
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = [executor.submit(self._run_job, job) for job in jobs]
+            for future in as_completed(pending):
+                result, inventory = future.result()
+                if inventory is not None:
+                    consume(result.job, inventory)
+                results.append(result)
+        return results
+
+    def _run_job(self, job: FispactJob) -> tuple[JobResult, Inventory | None]:
+        output = job.directory / f"{self.input_name}.json"
+        error = ""
+        for attempt in range(1, self.retries + 2):
+            output.unlink(missing_ok=True)
+            try:
+                completed = subprocess.run(  # noqa: S603 - the command is configured by user
+                    [*self.command, self.input_name, self.files_name],
+                    cwd=job.directory,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    timeout=self.timeout,
+                    check=False,
+                )
+                if completed.returncode != 0:
+                    stderr = completed.stderr.decode(errors="replace").strip()
+                    error = f"Exit code {completed.returncode}: {stderr}"
+                    continue
+                return JobResult(job, attempt), from_json(output)  # type: ignore[arg-type]
+            except subprocess.TimeoutExpired:
+                error = f"Timeout {self.timeout}s expired"
+            except (OSError, ms.DecodeError, ms.ValidationError) as ex:
+                error = f"{type(ex).__name__}: {ex}"
+        return JobResult(job, self.retries + 1, error), None
+
+
+def _as_sink(sink: FullDataCollector | Sink) -> Sink:
+    if callable(sink):
+        return sink
+
+    def _append(job: FispactJob, inventory: Inventory) -> None:
+        sink.append(inventory, job.material_id, job.case_id)
+
+    return _append
@@ -6,8 +6,10 @@ from typing import TYPE_CHECKING, Any
 
 import sys
 
+from functools import lru_cache
+
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Sequence
 
     from _typeshed import SupportsWrite
 
@@ -46,3 +48,41 @@ def print_cols(
             i = 0
 
     return i
+
+
+def format_cols(
+    seq: Sequence[Any],
+    max_columns: int = 6,
+    fmt: str = "{}",
+) -> str:
+    """Format sequence in columns at once.
+
+    The output is the same as from :func:`print_cols` followed by a new line,
+    if the last row is not complete, but is produced with one call of :meth:`str.format`.
+
+    Parameters
+    ----------
+    seq
+        sequence to format, for numpy arrays pass ``array.tolist()`` for speed
+    max_columns
+        max columns in a line
+    fmt
+        format string for one item
+
+    Returns
+    -------
+    str: the formatted rows, each ends with new line
+    """
+    return _cols_template(len(seq), max_columns, fmt).format(*seq)
+
+
+@lru_cache(maxsize=64)
+def _cols_template(size: int, max_columns: int, fmt: str) -> str:
+    if size == 0:
+        return ""
+    full_rows, rest = divmod(size, max_columns)
+    row = " ".join([fmt] * max_columns) + "\n"
+    template = row * full_rows
+    if rest:
+        template += " ".join([fmt] * rest) + "\n"
+    return template
@@ -10,6 +10,7 @@ import numpy as np
 import pytest
 
 from xpypact import inventory
+from xpypact.collector import FullDataCollector
 
 if TYPE_CHECKING:
     from xpypact.inventory import Inventory
@@ -60,6 +61,43 @@ def inventory_with_gamma() -> inventory.Inventory:
         return inventory.from_json(fid.read().decode("utf-8"))
 
 
+@pytest.fixture(scope="session")
+def collector(inventory_with_gamma: Inventory) -> FullDataCollector:
+    """Collect the inventory with gamma as two materials.
+
+    Don't append to the collector in tests: it is shared by the session.
+
+    Parameters
+    ----------
+    inventory_with_gamma
+        fixture - inventory to collect
+
+    Returns
+    -------
+    collector with material_id 1 and 2, case_id 1
+    """
+    collector = FullDataCollector()
+    collector.append(inventory_with_gamma, material_id=1, case_id=1)
+    collector.append(inventory_with_gamma, material_id=2, case_id=1)
+    return collector
+
+
+@pytest.fixture(scope="session")
+def result(collector: FullDataCollector) -> FullDataCollector.Result:
+    """Get the collected result of the inventory with gamma as two materials.
+
+    Parameters
+    ----------
+    collector
+        fixture - the collector
+
+    Returns
+    -------
+    the collected result
+    """
+    return collector.get_result()
+
+
 @pytest.fixture(scope="session")
 def one_cell(data: Path) -> Inventory:
     """Load inventory from one-cell JSON.
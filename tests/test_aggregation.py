@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from contextlib import closing
+
+import polars as pl
+import pytest
+
+from duckdb import connect
+from polars.testing import assert_frame_equal
+
+from xpypact.aggregation import NUCLIDE_QUANTITIES, aggregate_by_element, dominant_nuclides
+from xpypact.dao.duckdb import DuckDBDAO, save
+
+if TYPE_CHECKING:
+    from xpypact.collector import FullDataCollector
+    from xpypact.inventory import Inventory
+
+
+@pytest.mark.parametrize("by_mass_number", [False, True])
+def test_result_timestep_element(
+    result: FullDataCollector.Result,
+    by_mass_number: bool,  # noqa: FBT001
+) -> None:
+    actual = result.timestep_element(by_mass_number=by_mass_number)
+    assert isinstance(actual, pl.DataFrame)
+    lazy = result.timestep_element(by_mass_number=by_mass_number, lazy=True)
+    assert isinstance(lazy, pl.LazyFrame)
+    assert_frame_equal(lazy.collect(engine="streaming"), actual)
+    expected = (
+        result.timestep_nuclide.join(result.nuclide, on="zai")
+        .group_by("material_id", "case_id", "time_step_number", "element", "mass_number")
+        .agg(pl.col(NUCLIDE_QUANTITIES).sum())
+    )
+    keys = ["material_id", "case_id", "time_step_number"]
+    if not by_mass_number:
+        expected = expected.group_by(*keys, "element").agg(pl.col(NUCLIDE_QUANTITIES).sum())
+    assert actual.height == expected.height
+    assert_frame_equal(
+        actual.group_by(keys).agg(pl.col(NUCLIDE_QUANTITIES).sum()),
+        expected.group_by(keys).agg(pl.col(NUCLIDE_QUANTITIES).sum()),
+        check_row_order=False,
+        rel_tol=1e-5,
+    )
+    assert actual.schema["z"] == pl.UInt8
+
+
+def test_aggregate_without_keys() -> None:
+    df = pl.DataFrame(
+        {"zai": [260540, 260560, 260561, 10030], "activity": [1.0, 2.0, 3.0, 4.0]},
+        schema={"zai": pl.UInt32, "activity": pl.Float32},
+    )
+    assert aggregate_by_element(df).rows() == [(1, 4.0), (26, 6.0)]
+    assert aggregate_by_element(df, by_mass_number=True).rows() == [
+        (1, 3, 4.0),
+        (26, 54, 1.0),
+        (26, 56, 5.0),
+    ]
+
+
+@pytest.mark.parametrize("by_mass_number", [False, True])
+def test_dao_query_elements(
+    result: FullDataCollector.Result,
+    by_mass_number: bool,  # noqa: FBT001
+) -> None:
+    with closing(connect()) as con:
+        save(con, result)
+        dao = DuckDBDAO(con)
+        actual = dao.query_elements(by_mass_number=by_mass_number).pl()
+        expected = result.timestep_element(by_mass_number=by_mass_number)
+        assert isinstance(expected, pl.DataFrame)
+        assert_frame_equal(actual, expected, check_dtypes=False, rel_tol=1e-5)
+        actual = dao.query_elements(material_ids=2, time_steps=[1], by_mass_number=by_mass_number)
+        assert_frame_equal(
+            actual.pl(),
+            expected.filter(material_id=2, time_step_number=1),
+            check_dtypes=False,
+            rel_tol=1e-5,
+        )
+
+
+def test_dao_top_nuclides(result: FullDataCollector.Result) -> None:
+    with closing(connect()) as con:
+        save(con, result)
+        dao = DuckDBDAO(con)
+        dao.create_aggregates()
+        order = ["material_id", "case_id", "time_step_number", "quantity", "rank"]
+        actual = dao.load_timestep_top_nuclides().pl().sort(order)
+    expected = result.dominant_nuclides(["activity", "heat", "dose"], top_n=20).sort(order)
+    assert_frame_equal(actual, expected, rel_tol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "top_n, cum_fraction",
+    [(20, None), (None, 0.99), (5, 0.9), (None, None)],
+)
+def test_dominant_nuclides(
+    inventory_with_gamma: Inventory,
+    result: FullDataCollector.Result,
+    top_n: int | None,
+    cum_fraction: float | None,
+) -> None:
+    quantities = ["dose", "heat", "activity"]
+    from_inventory = dominant_nuclides(
+        inventory_with_gamma, quantities, top_n=top_n, cum_fraction=cum_fraction
+    )
+    from_table = result.dominant_nuclides(quantities, top_n=top_n, cum_fraction=cum_fraction)
+    assert_frame_equal(
+        from_table.filter(material_id=2).drop("material_id", "case_id"),
+        from_inventory,
+        check_dtypes=False,
+        rel_tol=1e-5,
+    )
+    lazy = dominant_nuclides(
+        result.timestep_nuclide.lazy(), quantities, top_n=top_n, cum_fraction=cum_fraction
+    )
+    assert_frame_equal(lazy.collect(), from_table)
+    by_group = from_table.group_by("material_id", "time_step_number", "quantity").agg(
+        pl.len().alias("count"),
+        pl.col("rank").max(),
+        pl.col("cumulative_fraction").max(),
+        pl.col("value").is_sorted(descending=True).alias("sorted"),
+    )
+    assert (by_group["count"] == by_group["rank"]).all()
+    assert by_group["sorted"].all()
+    if top_n is not None:
+        assert by_group["count"].max() <= top_n
+    if cum_fraction is None and top_n is None:
+        assert by_group["cumulative_fraction"].min() == pytest.approx(1.0)
+
+
+def test_dominant_nuclides_cum_fraction() -> None:
+    df = pl.DataFrame(
+        {
+            "time_step_number": [1, 1, 1, 1, 2],
+            "zai": [10010, 20040, 30060, 40090, 10010],
+            "dose": [6.0, 3.0, 1.0, 0.0, 0.0],
+        },
+    )
+    actual = dominant_nuclides(df, "dose", cum_fraction=0.9)
+    assert actual.select("zai", "fraction").rows() == [(10010, 0.6), (20040, 0.3)]
+    actual = dominant_nuclides(df, "dose", top_n=None, cum_fraction=0.95)
+    assert actual["zai"].to_list() == [10010, 20040, 30060]
+    assert actual["rank"].to_list() == [1, 2, 3]
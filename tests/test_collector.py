@@ -3,14 +3,17 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import duckdb as db
+import numpy as np
 import polars as pl
 import pytest
 
-from numpy.testing import assert_allclose
+from numpy.testing import assert_allclose, assert_array_equal
 from polars.testing import assert_frame_equal
 
 from xpypact.collector import FullDataCollector
 from xpypact.dao.duckdb.implementation import save
+from xpypact.flux_bank import FluxBank
+from xpypact.fluxes import FISPACT_709_BINS, InconsistentEnergyBinsError
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -123,6 +126,27 @@ def test_one_cell_json(
         collected.save_to_parquets(tmp_path, override=False)
 
 
+@pytest.mark.parametrize(
+    "first, second",
+    [(None, ["material_id"]), (["material_id"], None)],
+)
+def test_save_to_parquets_switch_layout(
+    inventory_with_gamma: Inventory,
+    tmp_path: Path,
+    first: list[str] | None,
+    second: list[str] | None,
+) -> None:
+    """Override of single file datasets with partitioned ones and vice versa."""
+    collected = (
+        FullDataCollector().append(inventory_with_gamma, material_id=1, case_id=1).get_result()
+    )
+    collected.save_to_parquets(tmp_path, partition_by=first)
+    collected.save_to_parquets(tmp_path, override=True, partition_by=second)
+    assert (tmp_path / "timestep.parquet").is_dir() == (second is not None)
+    timestep = pl.read_parquet(tmp_path / "timestep.parquet", hive_partitioning=True)
+    assert timestep.height == collected.timestep.height
+
+
 def test_polars_filter() -> None:
     """Trying to reproduce the unexpected Polars behavior in the above test."""
     initial = pl.DataFrame(
@@ -153,5 +177,47 @@ def test_polars_filter() -> None:
     assert_frame_equal(actual, expected)
 
 
+def test_flux_tables(inventory_with_gamma: Inventory, tmp_path: Path) -> None:
+    rng = np.random.default_rng(1)
+    bank = FluxBank(FISPACT_709_BINS, rng.uniform(size=(3, 709)), ["a", "b", "c"], np.ones(3))
+    collector = FullDataCollector().append(inventory_with_gamma, material_id=1, case_id=1)
+    assert collector.get_result().flux is None
+    collector.append_fluxes(FluxBank.from_fluxes([bank[2], bank[0]]), case_ids=[3, 1])
+    collector.append_fluxes(FluxBank.from_fluxes([bank[1]]), case_ids=[2])
+    result = collector.get_result()
+    assert result.flux is not None
+    assert result.flux["case_id"].to_list() == [1, 2, 3]
+    assert result.flux_bins is not None
+    assert result.flux_bins.height == 710
+    result.save_to_parquets(tmp_path)
+    loaded = FluxBank.from_tables(
+        pl.read_parquet(tmp_path / "flux.parquet"),
+        pl.read_parquet(tmp_path / "flux_bins.parquet"),
+    )
+    assert_array_equal(loaded.energy_bins, FISPACT_709_BINS)
+    assert_array_equal(loaded.fluxes, bank.fluxes)
+    assert loaded.comments == bank.comments
+
+
+def test_append_fluxes_errors() -> None:
+    bank = FluxBank(FISPACT_709_BINS, np.ones((1, 709)), ["a"], np.ones(1))
+    collector = FullDataCollector().append_fluxes(bank, [1])
+    with pytest.raises(ValueError, match="Expected 1 case_ids, got 2"):
+        collector.append_fluxes(bank, [1, 2])
+    other = FluxBank(np.arange(1.0, 4.0), np.ones((1, 2)), ["b"], np.ones(1))
+    with pytest.raises(InconsistentEnergyBinsError):
+        collector.append_fluxes(other, [2])
+
+
+def test_append_fluxes_duplicates() -> None:
+    bank = FluxBank(FISPACT_709_BINS, np.ones((2, 709)), ["a", "b"], np.ones(2))
+    collector = FullDataCollector().append_fluxes(bank, [1, 2])
+    with pytest.raises(ValueError, match=r"cases \[2\] are already appended"):
+        collector.append_fluxes(bank, [2, 3])
+    with pytest.raises(ValueError, match=r"cases \[4\] are already appended"):
+        collector.append_fluxes(bank, [4, 4])
+    assert collector.flux_case_ids == [1, 2]
+
+
 if __name__ == "__main__":
     pytest.main()
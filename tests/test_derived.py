@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from contextlib import closing
+
+import polars as pl
+import pytest
+
+from duckdb import connect
+from numpy.testing import assert_allclose
+from polars.testing import assert_frame_equal
+
+from xpypact.collector import FullDataCollector
+from xpypact.dao.duckdb import DuckDBDAO, save
+from xpypact.derived import DERIVED_QUANTITIES, DerivedQuantityError, select_derived, with_derived
+
+if TYPE_CHECKING:
+    from xpypact.inventory import Inventory
+
+KEYS = ["material_id", "case_id", "time_step_number"]
+
+
+def test_specific_activity(result: FullDataCollector.Result) -> None:
+    actual = result.with_derived("timestep_nuclide", ["specific_activity"]).collect()
+    assert actual.columns == [*result.timestep_nuclide.columns, "specific_activity"]
+    expected = result.timestep_nuclide.join(result.timestep.select(*KEYS, "mass"), on=KEYS)
+    assert_allclose(actual["specific_activity"], expected["activity"] / expected["mass"], rtol=1e-6)
+    timestep = result.with_derived("timestep", ["specific_dose"]).collect()
+    assert_allclose(timestep["specific_dose"], result.timestep["dose"] / result.timestep["mass"])
+
+
+def test_energy_rate(collector: FullDataCollector, result: FullDataCollector.Result) -> None:
+    actual = result.with_derived("timestep_gamma", ["energy_rate"]).collect()
+    expected = collector.timestep_gamma.sort(*KEYS, "g")
+    assert_allclose(actual["energy_rate"], expected["rate"], rtol=1e-5)
+
+
+def test_zero_mass() -> None:
+    timestep = pl.DataFrame(
+        {"material_id": [1], "case_id": [1], "time_step_number": [1], "mass": [0.0]}
+    )
+    nuclides = timestep.select(*KEYS, zai=pl.lit(10010), activity=pl.lit(1.0))
+    actual = with_derived(nuclides, "timestep_nuclide", ["specific_activity"], timestep=timestep)
+    assert actual["specific_activity"].to_list() == [None]
+
+
+def test_errors(result: FullDataCollector.Result) -> None:
+    with pytest.raises(DerivedQuantityError, match="Unknown derived quantities"):
+        select_derived("timestep", ["photons"])
+    with pytest.raises(DerivedQuantityError, match="timestep table is required"):
+        with_derived(result.timestep_nuclide, "timestep_nuclide", ["specific_heat"])
+    with pytest.raises(DerivedQuantityError, match="gbins are required"):
+        with_derived(result.timestep_gamma, "timestep_gamma", ["energy_rate"])  # type: ignore[type-var]
+
+
+def test_duckdb(result: FullDataCollector.Result) -> None:
+    with closing(connect()) as con:
+        dao = DuckDBDAO(con)
+        save(con, result)
+        dao.create_derived_views()
+        save(con, result)  # the views survive replacing the tables
+        for table, quantities in DERIVED_QUANTITIES.items():
+            expected = result.with_derived(table).collect()
+            order = [c for c in [*KEYS, "zai", "g"] if c in expected.columns]
+            actual = con.table(f"{table}_derived").pl().sort(order)
+            assert_frame_equal(
+                actual.select(quantities.keys()),
+                expected.sort(order).select(quantities.keys()),
+                check_dtypes=False,
+                rel_tol=1e-5,
+            )
+        actual = dao.query_derived(
+            "timestep_gamma", quantities=["energy_rate"], material_ids=2, time_steps=[1, 2]
+        ).pl()
+        assert actual.columns == [*result.timestep_gamma.columns, "energy_rate"]  # type: ignore[union-attr]
+        assert set(actual["material_id"]) == {2}
+        assert set(actual["time_step_number"]) == {1, 2}
+        assert (actual["energy_rate"] >= 0.0).all()
+        dao.drop_schema()
+
+
+def test_duckdb_without_gamma(inventory_without_gamma: Inventory) -> None:
+    result = FullDataCollector().append(inventory_without_gamma, 1, 1).get_result()
+    with closing(connect()) as con:
+        save(con, result)
+        DuckDBDAO(con).create_derived_views()
+        assert con.table("timestep_nuclide_derived").pl().height == result.timestep_nuclide.height
+        assert "timestep_gamma_derived" not in DuckDBDAO(con).get_tables_info().pl()["table_name"]
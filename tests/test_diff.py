@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from contextlib import closing
+
+import polars as pl
+import pytest
+
+from duckdb import connect
+
+from xpypact.collector import FullDataCollector
+from xpypact.dao.duckdb import DuckDBDAO, save
+from xpypact.diff import (
+    DIFF_SUMMARY_SCHEMA,
+    Tolerance,
+    Tolerances,
+    diff_databases,
+    diff_frames,
+    diff_inventories,
+    diff_results,
+)
+
+if TYPE_CHECKING:
+    from xpypact.inventory import Inventory
+
+ZAI = 290640
+STABLE_ZAI = 290630
+
+
+def _collect(inventory: Inventory, material_ids: list[int]) -> FullDataCollector.Result:
+    collector = FullDataCollector()
+    for material_id in material_ids:
+        collector.append(inventory, material_id=material_id, case_id=1)
+    return collector.get_result()
+
+
+def _perturb(result: FullDataCollector.Result, factor: float) -> FullDataCollector.Result:
+    """Scale activity of one nuclide in material 2 and drop a stable nuclide there."""
+    material = pl.col("material_id") == 2
+    timestep_nuclide = result.timestep_nuclide.with_columns(
+        pl.when(material & (pl.col("zai") == ZAI))
+        .then(pl.col("activity") * factor)
+        .otherwise(pl.col("activity")),
+    ).filter(~(material & (pl.col("zai") == STABLE_ZAI)))
+    return FullDataCollector.Result(
+        rundata=result.rundata,
+        time_step_times=result.time_step_times,
+        timestep=result.timestep,
+        nuclide=result.nuclide,
+        timestep_nuclide=timestep_nuclide,
+        gbins=result.gbins,
+        timestep_gamma=result.timestep_gamma,
+    )
+
+
+def test_diff_frames() -> None:
+    left = pl.DataFrame({"k": [1, 2, 3], "x": [1.0, 2.0, 3.0], "y": [0.0, 1.0, 1.0]})
+    right = pl.DataFrame({"k": [1, 2, 4], "x": [1.0, 2.1, 1e-9], "y": [0.0, 1.0, 0.0]})
+    summary, differing = diff_frames(
+        left, right, ["k"], ["x", "y"], Tolerances(quantities={"x": Tolerance(0.01, 1e-6)})
+    )
+    summary = summary.sort("quantity").collect()
+    assert summary["rows"].to_list() == [4, 4]
+    assert summary["only_left"].to_list() == [1, 1]
+    assert summary["only_right"].to_list() == [1, 1]
+    assert summary["differing"].to_list() == [2, 1], "x: k=2, 3, y: k=3, k=4 is within atol"
+    differing = differing.sort("quantity", "k").collect()
+    assert differing.select("k", "quantity").rows() == [(2, "x"), (3, "x"), (3, "y")]
+    assert differing["right"][1] is None
+
+
+def test_diff_inventories_equal(inventory_with_gamma: Inventory) -> None:
+    actual = diff_inventories(inventory_with_gamma, inventory_with_gamma)
+    assert actual.ok
+    assert set(actual.summary["table"]) == {"timestep", "timestep_nuclide", "timestep_gamma"}
+    assert actual.summary.schema == pl.Schema(DIFF_SUMMARY_SCHEMA)
+    assert (actual.summary["max_abs_diff"] == 0.0).all()
+
+
+@pytest.mark.parametrize("partition_size", [1, 100])
+def test_diff_results(inventory_with_gamma: Inventory, partition_size: int) -> None:
+    left = _collect(inventory_with_gamma, [1, 2, 3])
+    right = _perturb(left, 1.1)
+    actual = diff_results(left, right, partition_size=partition_size)
+    assert not actual.ok
+    summary = actual.summary.filter(table="timestep_nuclide").sort("quantity")
+    time_steps = left.timestep.filter(material_id=2).height
+    assert summary["rows"].unique().to_list() == [left.timestep_nuclide.height]
+    assert summary["only_left"].unique().to_list() == [time_steps]
+    activity = summary.filter(quantity="activity")
+    assert activity["max_rel_diff"].item() == pytest.approx(0.1 / 1.1, rel=1e-5)
+    differing = actual.differing["timestep_nuclide"]
+    assert (differing["material_id"] == 2).all()
+    assert differing.filter(pl.col("right").is_not_null())["zai"].unique().to_list() == [ZAI]
+    assert differing.filter(pl.col("right").is_not_null())["quantity"].unique().to_list() == [
+        "activity"
+    ]
+    relaxed = diff_results(
+        left, right, tolerances=Tolerances(Tolerance(atol=1e30), {"activity": Tolerance(rtol=0.1)})
+    )
+    assert relaxed.ok
+
+
+def test_diff_databases(inventory_with_gamma: Inventory) -> None:
+    left = _collect(inventory_with_gamma, [1, 2, 3])
+    right = _perturb(left, 1.1)
+    with closing(connect()) as left_con, closing(connect()) as right_con:
+        daos = []
+        for con, result in ((left_con, left), (right_con, right)):
+            dao = DuckDBDAO(con)
+            dao.create_schema()
+            save(con, result)
+            daos.append(dao)
+        actual = diff_databases(*daos, partition_size=2)
+    expected = diff_results(left, right)
+    assert actual.summary.equals(expected.summary)
+    columns = ["material_id", "time_step_number", "zai", "quantity"]
+    assert (
+        actual.differing["timestep_nuclide"]
+        .sort(columns)
+        .select(columns)
+        .equals(expected.differing["timestep_nuclide"].sort(columns).select(columns))
+    )
+
+
+def test_diff_databases_without_gamma(inventory_without_gamma: Inventory) -> None:
+    left = _collect(inventory_without_gamma, [1, 2])
+    assert left.timestep_gamma is None
+    with closing(connect()) as left_con, closing(connect()) as right_con:
+        daos = []
+        for con in (left_con, right_con):
+            save(con, left)
+            daos.append(DuckDBDAO(con))
+        actual = diff_databases(*daos)
+    assert actual.ok
+    assert set(actual.summary["table"]) == {"timestep", "timestep_nuclide"}
@@ -5,18 +5,25 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import datetime as dt
+import threading
 
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing
 
+import numpy as np
 import polars as pl
 import pytest
 
-from duckdb import InvalidInputException, connect
+from duckdb import CatalogException, InvalidInputException, connect
+from numpy.testing import assert_array_equal
+from polars.testing import assert_frame_equal
 
 from xpypact.collector import FullDataCollector
 from xpypact.dao.duckdb import DuckDBDAO as DataAccessObject
-from xpypact.dao.duckdb import create_indices
-from xpypact.dao.duckdb.implementation import save
+from xpypact.dao.duckdb import create_indices, list_snapshots, prune_snapshots
+from xpypact.dao.duckdb.implementation import DuckDBDAOQueryError, save
+from xpypact.flux_bank import FluxBank
+from xpypact.fluxes import FISPACT_709_BINS
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -90,3 +97,212 @@ def _check_gbins(dao: DataAccessObject) -> None:
     assert not gamma.filter(time_step_number=2, g=1).is_empty()
     gamma2 = dao.load_gamma(2).pl()
     assert not gamma2.is_empty()
+
+
+def test_query(result: FullDataCollector.Result) -> None:
+    """Test queries with filters and projections pushed down to DuckDB."""
+    with closing(connect()) as con:
+        dao = DataAccessObject(con)
+        save(con, result)
+        timesteps = dao.query_timesteps(material_ids=2, columns=["time_step_number", "flux"]).pl()
+        assert timesteps.columns == ["time_step_number", "flux"]
+        assert timesteps.height == 2
+        nuclides = dao.query_nuclides(
+            material_ids=[1, 2],
+            case_ids=1,
+            time_steps=2,
+            zai=(290630, 832100),
+            columns=["material_id", "zai", "activity"],
+        ).pl()
+        assert nuclides.height == 4
+        assert set(nuclides["zai"]) == {290630, 832100}
+        nuclides = dao.query_nuclides(material_ids=[2], time_steps=2, zai=[832100]).pl()
+        assert nuclides.height == 1
+        assert nuclides.columns == dao.load_time_step_nuclides().columns
+        assert len(dao._statements) == 3, "The same query shape should reuse a statement"  # noqa: SLF001
+        gamma = dao.query_gamma(material_ids=1, time_steps=[2]).pl()
+        assert gamma.height == dao.load_gamma(2).filter("material_id = 1").pl().height
+        assert dao.query_gamma(case_ids=[]).pl().is_empty()
+        with pytest.raises(DuckDBDAOQueryError, match="Cannot project timestep_nuclide"):
+            dao.query_nuclides(columns=["zai", "no_such_column"])
+
+
+def test_checkout(inventory_with_gamma: Inventory) -> None:
+    """Test concurrent queries over thread-local cursors."""
+    with closing(connect()) as con:
+        dao = DataAccessObject(con)
+        dao.configure(threads=2, memory_limit="1GB")
+        assert con.sql("select current_setting('threads')").fetchone() == (2,)
+        dc = FullDataCollector()
+        for material_id in range(1, 5):
+            dc.append(inventory_with_gamma, material_id=material_id, case_id=1)
+        save(con, dc.get_result())
+
+        def _count(material_id: int) -> tuple[int, int]:
+            with dao.checkout() as local_dao, dao.checkout() as same_dao:
+                assert local_dao is same_dao
+                assert local_dao.con is not con
+                nuclides = local_dao.query_nuclides(material_ids=material_id, columns=["zai"])
+                return threading.get_ident(), nuclides.pl().height
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(_count, range(1, 5)))
+
+        assert len({height for _, height in results}) == 1
+        assert len(dao._cursors) == len({ident for ident, _ in results})  # noqa: SLF001
+        dao.close_cursors()
+        assert not dao._cursors  # noqa: SLF001
+
+
+def test_save_swaps_tables_atomically(inventory_with_gamma: Inventory) -> None:
+    """Test that readers see a consistent dataset while it is reloaded."""
+    with closing(connect()) as con:
+        dao = DataAccessObject(con)
+        dc = FullDataCollector()
+        dc.append(inventory_with_gamma, material_id=1, case_id=1)
+        first = dc.get_result()
+        save(con, first)
+        assert list_snapshots(con) == []
+        dc.append(inventory_with_gamma, material_id=2, case_id=1)
+        second = dc.get_result()
+        with dao.checkout() as reader:
+            reader.con.begin()
+            assert reader.query_timesteps(columns=["material_id"]).pl().n_unique() == 1
+            save(con, second, keep_snapshot=True)
+            assert reader.query_timesteps(columns=["material_id"]).pl().n_unique() == 1
+            assert reader.query_nuclides(material_ids=2).pl().is_empty()
+            reader.con.commit()
+            assert reader.query_timesteps(columns=["material_id"]).pl().n_unique() == 2
+        assert list_snapshots(con) == [1]
+        assert con.table("timestep__v1").pl().height == first.timestep.height
+        save(con, second, keep_snapshot=True)
+        save(con, second)
+        assert list_snapshots(con) == [1, 2]
+        assert not [
+            name for name in dao.get_tables_info().pl()["table_name"] if name.endswith("__staging")
+        ]
+        assert prune_snapshots(con, keep=1) == [1]
+        assert list_snapshots(con) == [2]
+        assert prune_snapshots(con) == [2]
+        assert list_snapshots(con) == []
+        assert dao.has_schema()
+
+
+def test_aggregates(inventory_with_gamma: Inventory) -> None:
+    """Test maintenance of the aggregate tables."""
+    with closing(connect()) as con:
+        dao = DataAccessObject(con)
+        dc = FullDataCollector()
+        dc.append(inventory_with_gamma, material_id=1, case_id=1)
+        save(con, dc.get_result())
+        assert not dao.has_aggregates()
+        dao.create_aggregates()
+        assert dao.has_aggregates()
+        dc.append(inventory_with_gamma, material_id=2, case_id=1)
+        save(con, dc.get_result())
+        elements = dao.load_timestep_elements().pl()
+        assert elements.select("material_id").n_unique() == 2
+        assert_frame_equal(
+            elements.sort("material_id", "case_id", "time_step_number", "z"),
+            dao.query_elements().pl(),
+        )
+        expected = (
+            dao.load_time_step_nuclides()
+            .pl()
+            .join(dao.load_nuclides().pl().select("zai", "element"), on="zai")
+            .group_by("material_id", "case_id", "time_step_number", "element")
+            .agg(pl.col("activity").sum())
+            .sort("material_id", "case_id", "time_step_number", "element")
+        )
+        actual = (
+            elements.join(
+                dao.load_nuclides()
+                .pl()
+                .select((pl.col("zai") // 10000).cast(pl.UInt8).alias("z"), "element")
+                .unique(),
+                on="z",
+            )
+            .select(expected.columns)
+            .sort("material_id", "case_id", "time_step_number", "element")
+        )
+        assert_frame_equal(actual, expected, check_exact=False, rel_tol=1e-5)
+        top = (
+            dao.load_timestep_top_nuclides()
+            .filter("material_id = 1 and time_step_number = 2 and quantity = 'activity'")
+            .order("rank")
+            .pl()
+        )
+        assert 0 < top.height <= 20
+        assert top["rank"].to_list() == list(range(1, top.height + 1))
+        assert top["value"].is_sorted(descending=True)
+        assert top["fraction"].sum() <= 1.0 + 1e-6
+        heights = dao.load_timestep_top_nuclides().pl().group_by("material_id").len()
+        con.execute("delete from timestep_top_nuclides where material_id = 2")
+        dao.refresh_aggregates([(2, 1)])
+        assert (
+            dao.load_timestep_top_nuclides()
+            .pl()
+            .group_by("material_id")
+            .len()
+            .sort("material_id")
+            .equals(heights.sort("material_id"))
+        )
+        dao.drop_schema()
+        assert not dao.has_aggregates()
+
+
+def test_refresh_aggregates_rollback(inventory_with_gamma: Inventory) -> None:
+    """Failed refresh retains the aggregates and doesn't leave open transaction."""
+    with closing(connect()) as con:
+        dao = DataAccessObject(con)
+        save(con, FullDataCollector().append(inventory_with_gamma, 1, 1).get_result())
+        dao.create_aggregates()
+        expected = dao.load_timestep_elements().pl()
+        con.execute("alter table timestep_nuclide rename to broken")
+        with pytest.raises(CatalogException):
+            dao.refresh_aggregates([(1, 1)])
+        assert_frame_equal(dao.load_timestep_elements().pl(), expected)
+        con.execute("alter table broken rename to timestep_nuclide")
+        dao.refresh_aggregates([(1, 1)])
+        assert dao.load_timestep_elements().pl().height == expected.height
+
+
+@pytest.mark.parametrize("partition_by", [None, ["material_id"], ["material_id", "case_id"]])
+def test_attach_parquet(
+    result: FullDataCollector.Result, tmp_path: Path, partition_by: list[str] | None
+) -> None:
+    """Test access to parquet files without importing them into a database."""
+    result.save_to_parquets(tmp_path, partition_by=partition_by)
+    result.save_to_parquets(tmp_path, override=True, partition_by=partition_by)
+    with closing(connect()) as con:
+        dao = DataAccessObject(con).attach_parquet(tmp_path)
+        assert dao.has_schema()
+        assert dao.load_rundata().pl().height == 2
+        timesteps = dao.load_time_steps().pl()
+        assert dict(timesteps.schema)["material_id"] == pl.UInt32
+        assert timesteps.height == result.timestep.height
+        nuclides = dao.query_nuclides(material_ids=2, time_steps=2, zai=290630).pl()
+        assert nuclides.height == 1
+        assert dao.load_gamma(2).filter("material_id = 1").pl().height == 24
+
+
+def test_flux(inventory_with_gamma: Inventory) -> None:
+    """Test storing and loading of the case spectra."""
+    rng = np.random.default_rng(2)
+    bank = FluxBank(FISPACT_709_BINS, rng.uniform(size=(3, 709)), ["a", "b", "c"], np.ones(3))
+    with closing(connect()) as con:
+        dao = DataAccessObject(con)
+        dao.create_schema()
+        dc = FullDataCollector().append(inventory_with_gamma, material_id=1, case_id=1)
+        dc.append_fluxes(bank, case_ids=[30, 10, 20])
+        save(con, dc.get_result())
+        assert str(dao.query_flux(columns=["fluxes"]).types[0]) == "DOUBLE[709]"
+        case_ids, loaded = dao.load_flux_bank()
+        assert case_ids.tolist() == [10, 20, 30]
+        assert_array_equal(loaded.energy_bins, FISPACT_709_BINS)
+        assert_array_equal(loaded.fluxes, bank.fluxes[[1, 2, 0]])
+        assert loaded.comments == ["b", "c", "a"]
+        case_ids, loaded = dao.load_flux_bank(case_ids=[20])
+        assert case_ids.tolist() == [20]
+        assert_array_equal(loaded.fluxes[0], bank.fluxes[2])
+        assert dao.query_flux(columns=["case_id", "norm"]).columns == ["case_id", "norm"]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import polars as pl
+import pytest
+
+from numpy.testing import assert_allclose
+
+from xpypact.ensemble import EnsembleStatistics, ensemble_statistics
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+CASES = 200
+
+
+@pytest.fixture(scope="module")
+def ensemble() -> pl.DataFrame:
+    """Two materials, two nuclides, the second nuclide is missing in the odd cases."""
+    rng = np.random.default_rng(2024)
+    rows = []
+    for case_id in range(CASES):
+        for material_id in (1, 2):
+            activity = rng.lognormal(mean=material_id, sigma=0.5)
+            rows.append((material_id, case_id, 1, 10010, activity, 2.0 * activity))
+            if case_id % 2 == 0:
+                rows.append((material_id, case_id, 1, 10020, 1.0, 0.0))
+    return pl.DataFrame(
+        rows,
+        schema={
+            "material_id": pl.UInt32,
+            "case_id": pl.UInt32,
+            "time_step_number": pl.UInt32,
+            "zai": pl.UInt32,
+            "activity": pl.Float32,
+            "heat": pl.Float32,
+        },
+        orient="row",
+    )
+
+
+def _expected(ensemble: pl.DataFrame, quantiles: list[float]) -> pl.DataFrame:
+    keys = ["material_id", "time_step_number", "zai"]
+    full = (
+        ensemble.select("material_id", "case_id", "time_step_number")
+        .unique()
+        .join(ensemble.select("zai").unique(), how="cross")
+        .join(ensemble, on=["material_id", "case_id", "time_step_number", "zai"], how="left")
+        .fill_null(0.0)
+        .unpivot(on=["activity", "heat"], index=[*keys, "case_id"], variable_name="quantity")
+        .with_columns(pl.col("value").cast(pl.Float64))
+    )
+    return (
+        full.group_by(*keys, "quantity")
+        .agg(
+            pl.col("value").mean().alias("mean"),
+            pl.col("value").std().alias("std"),
+            *(pl.col("value").quantile(q, "lower").alias(f"p{100 * q:g}") for q in quantiles),
+        )
+        .sort(*keys, "quantity")
+    )
+
+
+@pytest.mark.parametrize("cases_per_chunk", [7, CASES])
+def test_ensemble_statistics(ensemble: pl.DataFrame, cases_per_chunk: int) -> None:
+    quantiles = [0.05, 0.5, 0.95]
+    actual = ensemble_statistics(
+        ensemble, quantiles=quantiles, relative_accuracy=0.01, cases_per_chunk=cases_per_chunk
+    )
+    expected = _expected(ensemble, quantiles)
+    assert actual.columns == [
+        "material_id",
+        "time_step_number",
+        "zai",
+        "quantity",
+        "cases",
+        "mean",
+        "std",
+        "min",
+        "max",
+        "p5",
+        "p50",
+        "p95",
+    ]
+    assert (actual["cases"] == CASES).all()
+    assert_allclose(actual["mean"], expected["mean"], rtol=1e-6)
+    assert_allclose(actual["std"], expected["std"], rtol=1e-6)
+    for q in ("p5", "p50", "p95"):
+        assert_allclose(actual[q], expected[q], rtol=0.02, err_msg=q)
+    missing = actual.filter(zai=10020, quantity="activity")
+    assert missing["min"].to_list() == [0.0, 0.0]
+    assert missing["mean"].to_list() == [0.5, 0.5]
+
+
+def test_merge(ensemble: pl.DataFrame) -> None:
+    def _statistics(frame: pl.DataFrame) -> EnsembleStatistics:
+        return EnsembleStatistics(
+            keys=["material_id", "time_step_number", "zai"], quantities=["activity"]
+        ).update(frame)
+
+    half = pl.col("case_id") < CASES // 2
+    merged = _statistics(ensemble.filter(half)).merge(_statistics(ensemble.filter(~half)))
+    expected = _statistics(ensemble).result()
+    actual = merged.result()
+    assert_allclose(actual["mean"], expected["mean"], rtol=1e-9)
+    assert_allclose(actual["std"], expected["std"], rtol=1e-9)
+    assert actual.select("p5", "p50", "p95").equals(expected.select("p5", "p50", "p95"))
+
+
+def test_parquet_dataset(ensemble: pl.DataFrame, tmp_path: Path) -> None:
+    path = tmp_path / "timestep_nuclide.parquet"
+    ensemble.write_parquet(path, partition_by=["material_id"])
+    actual = ensemble_statistics(path, cases_per_chunk=50)
+    expected = ensemble_statistics(ensemble)
+    assert_allclose(actual["mean"], expected["mean"], rtol=1e-9)
+    assert (
+        actual["quantity"].cast(pl.String).to_list()
+        == expected["quantity"].cast(pl.String).to_list()
+    )
+
+
+def test_no_data() -> None:
+    with pytest.raises(ValueError, match="No data"):
+        EnsembleStatistics(keys=["zai"], quantities=["activity"]).result()
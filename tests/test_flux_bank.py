@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import polars as pl
+import pytest
+
+from numpy.testing import assert_allclose, assert_array_equal
+
+from xpypact.flux_bank import FluxBank
+from xpypact.fluxes import (
+    FISPACT_709_BINS,
+    Fluxes,
+    InconsistentEnergyBinsError,
+    are_fluxes_close,
+    are_fluxes_equal,
+    deduplicate_fluxes,
+    is_709_fluxes,
+    read_709_fluxes,
+    read_arb_fluxes,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture(scope="module")
+def arb_bank(data: Path) -> FluxBank:
+    arb_flux = read_arb_fluxes(data / "arb_flux_2")  # type: ignore[arg-type]
+    return FluxBank.from_fluxes(
+        Fluxes(arb_flux.energy_bins, arb_flux.fluxes * i, f"case {i}", 1.0 + i) for i in range(3)
+    )
+
+
+@pytest.fixture(scope="module")
+def bank_709(data: Path) -> FluxBank:
+    fluxes = read_709_fluxes(data / "fluxes_1")  # type: ignore[arg-type]
+    return FluxBank(FISPACT_709_BINS.copy(), np.stack([fluxes.fluxes] * 2), ["a", "b"], [1.0, 2.0])
+
+
+def test_constructor(arb_bank: FluxBank, bank_709: FluxBank) -> None:
+    assert len(arb_bank) == 3
+    assert arb_bank.fluxes.shape == (3, 7)
+    assert arb_bank.fluxes.flags["C_CONTIGUOUS"]
+    assert bank_709.energy_bins is FISPACT_709_BINS
+    assert all(is_709_fluxes(f) for f in bank_709)
+    assert arb_bank[2].comment == "case 2"
+    assert arb_bank[2].norm == 3.0
+    with pytest.raises(ValueError, match="Incompatible shapes of bins and fluxes"):
+        FluxBank(arb_bank.energy_bins[:-1], arb_bank.fluxes, arb_bank.comments, arb_bank.norms)
+    with pytest.raises(ValueError, match="Incompatible sizes of fluxes, comments and norms"):
+        FluxBank(arb_bank.energy_bins, arb_bank.fluxes, ["a"], arb_bank.norms)
+    with pytest.raises(InconsistentEnergyBinsError):
+        FluxBank.from_fluxes([arb_bank[0], bank_709[0]])
+    with pytest.raises(ValueError, match="Cannot stack empty sequence of spectra"):
+        FluxBank.from_fluxes([])
+
+
+def test_vectorized_operations(arb_bank: FluxBank) -> None:
+    assert_allclose(arb_bank.totals, [f.total for f in arb_bank])
+    normalized = arb_bank.normalized()
+    assert_allclose(normalized.totals, [0.0, 1.0, 1.0])
+    assert_allclose(arb_bank.mean_energies[1:], arb_bank.mean_energies[1])
+    assert arb_bank.mean_energies[0] == 0.0
+    first = arb_bank[1]
+    mids = 0.5 * (first.energy_bins[1:] + first.energy_bins[:-1])
+    assert arb_bank.mean_energies[1] == pytest.approx(np.sum(first.fluxes * mids) / first.total)
+    per_lethargy = arb_bank.per_unit_lethargy()
+    widths = np.log(first.energy_bins[1:] / first.energy_bins[:-1])
+    assert_allclose(per_lethargy[1], first.fluxes / widths)
+
+
+def test_parquet_and_arrow_round_trip(arb_bank: FluxBank, tmp_path: Path) -> None:
+    path = tmp_path / "bank.parquet"
+    arb_bank.write_parquet(path)
+    for loaded in [FluxBank.read_parquet(path), FluxBank.from_arrow(arb_bank.to_arrow())]:
+        assert_array_equal(loaded.energy_bins, arb_bank.energy_bins)
+        assert_array_equal(loaded.fluxes, arb_bank.fluxes)
+        assert loaded.comments == arb_bank.comments
+        assert_array_equal(loaded.norms, arb_bank.norms)
+
+
+@pytest.mark.parametrize("kind", ["709", "arb"])
+def test_directory_round_trip(
+    arb_bank: FluxBank, bank_709: FluxBank, tmp_path: Path, kind: str
+) -> None:
+    bank = bank_709 if kind == "709" else arb_bank
+    paths = bank.to_directory(tmp_path / "fluxes")
+    assert [p.name for p in paths] == [f"fluxes_{i}" for i in range(len(bank))]
+    loaded = FluxBank.from_directory(tmp_path / "fluxes", kind=kind)  # type: ignore[arg-type]
+    assert all(are_fluxes_equal(a, b) for a, b in zip(loaded, bank, strict=True))
+    assert loaded.comments == bank.comments
+    assert_array_equal(loaded.norms, bank.norms)
+
+
+def test_deduplicate(arb_bank: FluxBank) -> None:
+    fluxes = np.concatenate([arb_bank.fluxes[[2, 1]], -arb_bank.fluxes[[0]], arb_bank.fluxes])
+    bank = FluxBank(arb_bank.energy_bins, fluxes, [""] * 6, np.ones(6))
+    representatives, inverse = bank.deduplicate()
+    assert representatives.tolist() == [0, 1, 2]
+    assert inverse.tolist() == [0, 1, 2, 2, 1, 0]
+    expected = deduplicate_fluxes(bank)
+    assert_array_equal(representatives, expected[0])
+    assert_array_equal(inverse, expected[1])
+    assert bank.digests() == [f.digest for f in bank]
+
+
+@pytest.mark.parametrize("rtol, atol", [(1e-5, 1e-8), (1e-2, 0.0), (0.0, 1e-3)])
+def test_group_close(rtol: float, atol: float) -> None:
+    rng = np.random.default_rng(2024)
+    base = rng.uniform(0.0, 1.0, size=(20, 709))
+    fluxes = base[rng.integers(0, base.shape[0], size=300)]
+    fluxes *= 1.0 + rng.choice([0.0, 1e-6, 1e-3, 5e-3, 2e-2], size=(300, 1))
+    bank = FluxBank(FISPACT_709_BINS, fluxes, [""] * 300, np.ones(300))
+    representatives, inverse = bank.group_close(rtol=rtol, atol=atol)
+    expected_representatives: list[int] = []
+    members = list(bank)
+    assigned = [-1] * len(members)
+    for i, f in enumerate(members):
+        if assigned[i] >= 0:
+            continue
+        assigned[i] = len(expected_representatives)
+        expected_representatives.append(i)
+        for j in range(i + 1, len(members)):
+            if assigned[j] < 0 and are_fluxes_close(members[j], f, rtol=rtol, atol=atol):
+                assigned[j] = assigned[i]
+    expected_inverse = assigned
+    assert representatives.tolist() == expected_representatives
+    assert inverse.tolist() == expected_inverse
+    assert representatives.size < len(members)
+
+
+def test_tables_round_trip(arb_bank: FluxBank) -> None:
+    flux, flux_bins = arb_bank.to_tables([5, 6, 7])
+    assert flux.columns == ["case_id", "comment", "norm", "fluxes"]
+    loaded = FluxBank.from_tables(flux, flux_bins.reverse())
+    assert_array_equal(loaded.energy_bins, arb_bank.energy_bins)
+    assert_array_equal(loaded.fluxes, arb_bank.fluxes)
+    as_lists = flux.with_columns(pl.col("fluxes").arr.to_list())
+    assert_array_equal(FluxBank.from_tables(as_lists, flux_bins).fluxes, arb_bank.fluxes)
+    with pytest.raises(ValueError, match="Expected 3 case_ids, got 1"):
+        arb_bank.to_tables([1])
@@ -12,10 +12,13 @@ import pytest
 from numpy.testing import assert_almost_equal, assert_array_equal
 
 from xpypact.fluxes import (
+    FISPACT_709_BINS,
     Fluxes,
+    InconsistentEnergyBinsError,
     StandardFluxesDataSizeError,
     are_fluxes_close,
     are_fluxes_equal,
+    deduplicate_fluxes,
     define_709_bins_and_fluxes,
     define_arb_bins_and_fluxes,
     is_709_fluxes,
@@ -23,7 +26,10 @@ from xpypact.fluxes import (
     print_arbitrary_fluxes,
     read_709_fluxes,
     read_arb_fluxes,
+    read_fluxes_many,
+    write_fluxes_many,
 )
+from xpypact.utils.xpypact_io import print_cols
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -206,6 +212,119 @@ def test_read_709_fluxes(data: Path) -> None:
     assert fluxes.fluxes.size == 709
 
 
+@pytest.mark.parametrize("workers", [1, 2])
+def test_read_fluxes_many_709(data: Path, fluxes_1: Fluxes, tmp_path: Path, workers: int) -> None:
+    text = (data / "fluxes_1").read_bytes()
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"fluxes_{i}"
+        path.write_bytes(text if i % 2 else text.rstrip())
+        paths.append(path)
+    energy_bins, fluxes, comments, norms = read_fluxes_many(paths, workers=workers)
+    assert energy_bins is FISPACT_709_BINS
+    assert fluxes.shape == (5, 709)
+    for row in fluxes:
+        assert_array_equal(row, fluxes_1.fluxes)
+    assert comments == [fluxes_1.comment] * 5
+    assert_array_equal(norms, 1.0)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_read_fluxes_many_arb(arb_flux_2: Fluxes, tmp_path: Path, workers: int) -> None:
+    paths = []
+    for i in range(4):
+        flux = Fluxes(arb_flux_2.energy_bins, arb_flux_2.fluxes * (i + 1), f"case {i}", 0.5 * i)
+        path = tmp_path / f"arb_flux_{i}"
+        with path.open("w") as stream:
+            print_arbitrary_fluxes(flux, stream, max_columns=i + 1)
+        paths.append(path)
+    energy_bins, fluxes, comments, norms = read_fluxes_many(paths, kind="arb", workers=workers)
+    assert_array_equal(energy_bins, arb_flux_2.energy_bins)
+    assert_array_equal(fluxes, np.outer(np.arange(1, 5), arb_flux_2.fluxes))
+    assert comments == [f"case {i}" for i in range(4)]
+    assert_array_equal(norms, 0.5 * np.arange(4))
+
+
+def test_read_fluxes_many_fails(data: Path) -> None:
+    with pytest.raises(StandardFluxesDataSizeError):
+        read_fluxes_many([data / "arb_flux_1"])
+    with pytest.raises(InconsistentEnergyBinsError):
+        read_fluxes_many([data / "arb_flux_1", data / "arb_flux_2"], kind="arb")
+    paths = [data / "arb_flux_1", data / "arb_flux_1", data / "arb_flux_2"]
+    with pytest.raises(InconsistentEnergyBinsError):
+        read_fluxes_many(paths, kind="arb", workers=2)
+
+
+def test_digest(arb_flux_1: Fluxes, arb_flux_2: Fluxes, fluxes_1: Fluxes) -> None:
+    copy_1 = Fluxes(arb_flux_1.energy_bins.copy(), arb_flux_1.fluxes.copy(), "other", 2.0)
+    assert copy_1.digest == arb_flux_1.digest
+    assert copy_1 != arb_flux_1
+    assert arb_flux_1.digest != arb_flux_2.digest
+    zeros = np.zeros(709)
+    f709 = Fluxes(fluxes_1.energy_bins, zeros, fluxes_1.comment, fluxes_1.norm)
+    assert hash(f709) != hash(fluxes_1), "Spectra with the same comment should not collide"
+    f709_negative_zero = Fluxes(fluxes_1.energy_bins, -zeros, fluxes_1.comment, fluxes_1.norm)
+    assert f709 == f709_negative_zero
+    assert hash(f709) == hash(f709_negative_zero)
+    assert len({f709, f709_negative_zero, fluxes_1}) == 2
+
+
+def test_deduplicate_fluxes(arb_flux_1: Fluxes, arb_flux_2: Fluxes) -> None:
+    copy_2 = Fluxes(arb_flux_2.energy_bins, arb_flux_2.fluxes.copy(), "copy", 3.0)
+    fluxes = [arb_flux_2, arb_flux_1, copy_2, arb_flux_1, arb_flux_2]
+    representatives, inverse = deduplicate_fluxes(fluxes)
+    assert representatives.tolist() == [0, 1]
+    assert inverse.tolist() == [0, 1, 0, 1, 0]
+    assert all(
+        are_fluxes_equal(f, fluxes[representatives[r]])
+        for f, r in zip(fluxes, inverse, strict=True)
+    )
+
+
+def _print_per_value(fluxes: Fluxes, fid: StringIO, max_columns: int, *, arbitrary: bool) -> None:
+    """Reproduce the original printers based on print_cols to check byte identity."""
+    sequences = [(fluxes.fluxes[::-1], "{:.5e}")]
+    if arbitrary:
+        sequences.insert(0, (fluxes.energy_bins[::-1], "{:.6e}"))
+    for sequence, fmt in sequences:
+        if print_cols(sequence, fid, max_columns, fmt=fmt) != 0:
+            print(file=fid)
+    print(fluxes.norm, file=fid)
+    print(fluxes.comment, file=fid, end="")
+
+
+@pytest.mark.parametrize("max_columns", [1, 3, 5, 7, 10])
+def test_printers_are_byte_identical_to_print_cols(
+    arb_flux_2: Fluxes, fluxes_1: Fluxes, max_columns: int
+) -> None:
+    expected, actual = StringIO(), StringIO()
+    _print_per_value(arb_flux_2, expected, max_columns, arbitrary=True)
+    print_arbitrary_fluxes(arb_flux_2, actual, max_columns)
+    assert actual.getvalue() == expected.getvalue()
+    expected, actual = StringIO(), StringIO()
+    _print_per_value(fluxes_1, expected, max_columns, arbitrary=False)
+    print_709_fluxes(fluxes_1, actual, max_columns)
+    assert actual.getvalue() == expected.getvalue()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_write_fluxes_many(
+    arb_flux_2: Fluxes, fluxes_1: Fluxes, tmp_path: Path, workers: int
+) -> None:
+    fluxes = [fluxes_1, arb_flux_2, fluxes_1]
+    paths = [tmp_path / f"{i}" for i in range(len(fluxes))]
+    write_fluxes_many(fluxes, paths, workers=workers)
+    for f, path in zip(fluxes, paths, strict=True):
+        expected = StringIO()
+        if is_709_fluxes(f):
+            print_709_fluxes(f, expected)
+        else:
+            print_arbitrary_fluxes(f, expected)
+        assert path.read_text(encoding="utf-8") == expected.getvalue()
+    assert read_709_fluxes(paths[0]) == fluxes_1  # type: ignore[arg-type]
+    assert read_arb_fluxes(paths[1]) == arb_flux_2  # type: ignore[arg-type]
+
+
 def assert_bin(
     fluxes: Fluxes,
     _bin: int,
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import polars as pl
+import pytest
+
+from numpy.testing import assert_allclose
+from polars.testing import assert_frame_equal
+
+from xpypact.gamma import (
+    from_gamma_array,
+    gbins_boundaries,
+    rebin_gamma,
+    rebin_gamma_array,
+    to_gamma_array,
+)
+
+if TYPE_CHECKING:
+    from xpypact.collector import FullDataCollector
+
+
+def test_gamma_array_round_trip(result: FullDataCollector.Result) -> None:
+    assert result.timestep_gamma is not None
+    assert result.gbins is not None
+    groups = result.gbins.height - 1
+    spectra, values = to_gamma_array(result.timestep_gamma, groups)
+    assert values.shape == (spectra.height, groups)
+    assert_frame_equal(from_gamma_array(spectra, values), result.timestep_gamma)
+
+
+@pytest.mark.parametrize("conserve", ["energy", "photons"])
+def test_rebin_gamma(result: FullDataCollector.Result, conserve: str) -> None:
+    assert result.timestep_gamma is not None
+    assert result.gbins is not None
+    gbins = gbins_boundaries(result.gbins)
+    target_bins = np.array([gbins[0], 0.5, 1.0, 3.0, gbins[-1]])
+    actual = result.rebin_gamma(target_bins, conserve)  # type: ignore[arg-type]
+    assert actual is not None
+    assert actual["g"].unique().to_list() == [1, 2, 3, 4]
+
+    def _totals(frame: pl.DataFrame, bins: np.ndarray) -> np.ndarray:
+        keys = ["material_id", "case_id", "time_step_number"]
+        rates = frame["rate"].cast(pl.Float64).to_numpy()
+        if conserve == "energy":
+            rates = rates * (0.5 * (bins[1:] + bins[:-1]))[frame["g"].to_numpy() - 1]
+        return (frame.with_columns(rate=rates).group_by(keys).agg(pl.col("rate").sum()).sort(keys))[
+            "rate"
+        ].to_numpy()
+
+    assert_allclose(_totals(actual, target_bins), _totals(result.timestep_gamma, gbins), rtol=1e-5)
+
+
+def test_rebin_gamma_array() -> None:
+    gbins = np.array([0.01, 0.1, 1.0, 10.0])
+    values = np.array([[1.0, 2.0, 3.0], [0.0, 0.0, 1.0]])
+    assert_allclose(rebin_gamma_array(values, gbins, gbins), values)
+    split = rebin_gamma_array(values[0], gbins, np.array([0.01, 0.1, 0.55, 1.0, 10.0]), "photons")
+    assert_allclose(split, [1.0, 1.0, 1.0, 3.0])
+    target_bins = np.array([0.01, 10.0])
+    mids = 0.5 * (gbins[1:] + gbins[:-1])
+    energy = rebin_gamma_array(values[0], gbins, target_bins, "energy", measure="photons")
+    assert_allclose(energy * 0.5 * (target_bins[0] + target_bins[1]), [values[0] @ mids])
+    photons = rebin_gamma_array(values[0], gbins, target_bins, "photons", measure="energy")
+    assert_allclose(photons / (0.5 * (target_bins[0] + target_bins[1])), [values[0] @ (1 / mids)])
+    with pytest.raises(ValueError, match="Unknown conserve"):
+        rebin_gamma_array(values, gbins, gbins, "lethargy")  # type: ignore[arg-type]
+    with pytest.raises(ValueError, match="Unknown measure"):
+        rebin_gamma_array(values, gbins, gbins, measure="MeV")  # type: ignore[arg-type]
+
+
+def test_rebin_gamma_without_keys() -> None:
+    timestep_gamma = pl.DataFrame({"g": [1, 2], "rate": [1.0, 2.0]})
+    actual = rebin_gamma(timestep_gamma, np.array([0.0, 1.0, 2.0]), np.array([0.0, 2.0]), "photons")
+    assert actual.rows() == [(1, 3.0)]
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import polars as pl
+import pytest
+
+from numpy.testing import assert_allclose, assert_array_equal
+
+from xpypact.gamma_source import GammaSourceBank
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from xpypact.collector import FullDataCollector
+
+
+@pytest.fixture(scope="module")
+def sources(result: FullDataCollector.Result) -> GammaSourceBank:
+    sources = result.gamma_sources()
+    assert sources is not None
+    return sources
+
+
+def test_gamma_sources(collector: FullDataCollector, sources: GammaSourceBank) -> None:
+    spectrum = collector.get_timestep_gamma_as_spectrum()
+    assert spectrum is not None
+    keys = ["material_id", "case_id", "time_step_number"]
+    expected = spectrum.group_by(keys).agg(pl.col("rate").cast(pl.Float64).sum()).sort(keys)
+    assert sources.keys.equals(expected.select(keys))
+    assert_allclose(sources.intensities, expected["rate"], rtol=1e-5)
+    positive = sources.intensities > 0.0
+    assert_array_equal(sources.cdf[positive, -1], 1.0)
+    assert_array_equal(sources.cdf[~positive], 0.0)
+    assert np.all(np.diff(sources.cdf, axis=1) >= 0.0)
+    assert_allclose(sources.probabilities.sum(axis=1), positive.astype(float))
+
+
+def test_selection_and_rebinning(
+    result: FullDataCollector.Result, sources: GammaSourceBank
+) -> None:
+    energy_bins = np.array([sources.energy_bins[0], 1.0, sources.energy_bins[-1]])
+    actual = result.gamma_sources(
+        selection=pl.DataFrame({"material_id": [2]}, schema={"material_id": pl.UInt32}),
+        energy_bins=energy_bins,
+    )
+    assert actual is not None
+    assert (actual.keys["material_id"] == 2).all()
+    selected = (sources.keys["material_id"] == 2).to_numpy()
+    assert_allclose(actual.intensities, sources.intensities[selected], rtol=1e-12)
+    assert actual.cdf.shape == (selected.sum(), 2)
+
+
+def test_sample(sources: GammaSourceBank) -> None:
+    source = int(np.argmax(sources.intensities))
+    rng = np.random.default_rng(1)
+    energies = sources.sample(np.full(20000, source), rng)
+    counts, _ = np.histogram(energies, bins=sources.energy_bins)
+    assert_allclose(counts / energies.size, sources.probabilities[source], atol=0.01)
+
+
+def test_parquet_round_trip(sources: GammaSourceBank, tmp_path: Path) -> None:
+    path = tmp_path / "sources.parquet"
+    sources.write_parquet(path)
+    actual = GammaSourceBank.read_parquet(path)
+    assert_array_equal(actual.energy_bins, sources.energy_bins)
+    assert actual.keys.equals(sources.keys)
+    assert_array_equal(actual.intensities, sources.intensities)
+    assert_array_equal(actual.cdf, sources.cdf)
+
+
+def test_mcnp(sources: GammaSourceBank, tmp_path: Path) -> None:
+    path = tmp_path / "sdef.txt"
+    sources.write_mcnp(path, first_distribution=10)
+    text = path.read_text(encoding="utf-8")
+    assert text.startswith("c material_id=1 case_id=1 time_step_number=1")
+    assert f"SI{10 + len(sources) - 1} H " in text
+    assert text.count("\nSP") == np.count_nonzero(sources.intensities > 0.0)
+
+
+def test_incompatible_sizes(sources: GammaSourceBank) -> None:
+    with pytest.raises(ValueError, match="Incompatible sizes"):
+        GammaSourceBank(sources.energy_bins, sources.keys, sources.intensities[:1], sources.cdf)
+    with pytest.raises(ValueError, match="Incompatible shapes"):
+        GammaSourceBank(sources.energy_bins[:-1], sources.keys, sources.intensities, sources.cdf)
+
+
+@pytest.fixture
+def with_empty() -> GammaSourceBank:
+    keys = pl.DataFrame({"material_id": [1, 2]}, schema={"material_id": pl.UInt32})
+    return GammaSourceBank(
+        np.array([0.0, 1.0, 2.0]), keys, np.array([1.0, 0.0]), np.array([[0.5, 1.0], [0.0, 0.0]])
+    )
+
+
+def test_sample_zero_intensity(with_empty: GammaSourceBank) -> None:
+    rng = np.random.default_rng(1)
+    assert with_empty.sample(np.array([0, 0]), rng).shape == (2,)
+    with pytest.raises(ValueError, match=r"zero intensity: \[1\]"):
+        with_empty.sample(np.array([0, 1, 1]), rng)
+
+
+def test_mcnp_zero_intensity(with_empty: GammaSourceBank) -> None:
+    text = with_empty.format_mcnp()
+    assert "SP1 D 0 " in text
+    assert "c material_id=2 intensity=0, no distribution 2\n" in text
+    assert "SI2" not in text
+    assert "SP2" not in text
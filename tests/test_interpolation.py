@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import math
+
+import numpy as np
+import polars as pl
+import pytest
+
+from numpy.testing import assert_allclose
+from polars.testing import assert_frame_equal
+
+from xpypact.aggregation import NUCLIDE_QUANTITIES
+from xpypact.collector import FullDataCollector, TimeStepNuclideSchema, TimeStepSchema
+from xpypact.interpolation import cooling_steps, extrapolate_decay, interpolate_nuclides
+
+if TYPE_CHECKING:
+    from xpypact.inventory import Inventory
+
+HALF_LIFE = 1000.0
+PARENT, DAUGHTER = 270600, 280600
+COOLING_TIMES = [0.0, 1000.0, 3000.0, 10000.0]
+
+
+def _decay_chain(t: float) -> tuple[float, float]:
+    parent = 1e20 * math.exp(-math.log(2.0) / HALF_LIFE * t)
+    return parent, 1e20 - parent
+
+
+@pytest.fixture(scope="module")
+def decay_tables() -> tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]:
+    """Two nuclides: the parent decays, the stable daughter grows in."""
+    times = [0.0, *COOLING_TIMES]
+    fluxes = [1e10, 1e10, 0.0, 0.0, 0.0]
+    timestep = pl.DataFrame(
+        {
+            "material_id": 1,
+            "case_id": 1,
+            "time_step_number": range(1, len(times) + 1),
+            "cooling_time": times,
+            "flux": fluxes,
+        },
+    )
+    timestep = timestep.cast({k: TimeStepSchema[k] for k in timestep.columns})
+    rows = []
+    for step, t in enumerate(times, start=1):
+        parent, daughter = _decay_chain(t)
+        rows.append((step, PARENT, parent, 2.0 * parent))
+        rows.append((step, DAUGHTER, daughter, 0.0))
+    timestep_nuclide = pl.DataFrame(
+        rows,
+        schema=["time_step_number", "zai", "atoms", "activity"],
+        orient="row",
+    ).with_columns(material_id=pl.lit(1), case_id=pl.lit(1))
+    timestep_nuclide = timestep_nuclide.cast(
+        {k: TimeStepNuclideSchema[k] for k in timestep_nuclide.columns}
+    )
+    nuclide = pl.DataFrame({"zai": [PARENT, DAUGHTER], "half_life": [HALF_LIFE, 0.0]})
+    return timestep, timestep_nuclide, nuclide
+
+
+def test_cooling_steps(decay_tables: tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]) -> None:
+    steps = cooling_steps(decay_tables[0]).collect()
+    assert steps["time_step_number"].to_list() == [2, 3, 4, 5]
+    assert steps["cooling_time"].to_list() == COOLING_TIMES
+
+
+def test_interpolate_decay(
+    decay_tables: tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame],
+) -> None:
+    times = [0.0, 500.0, 1000.0, 2000.0, 7000.0, 10000.0, 20000.0]
+    actual = interpolate_nuclides(*decay_tables, times)
+    assert actual.columns == ["material_id", "case_id", "cooling_time", "zai", "atoms", "activity"]
+    assert actual["cooling_time"].unique().to_list() == times[:-1], "out of range is skipped"
+    parent = actual.filter(pl.col("zai") == PARENT)
+    expected = np.array([_decay_chain(t)[0] for t in times[:-1]])
+    assert_allclose(parent["atoms"].to_numpy(), expected, rtol=1e-6)
+    assert_allclose(parent["activity"].to_numpy(), 2.0 * expected, rtol=1e-6)
+    daughter = actual.filter(pl.col("zai") == DAUGHTER)["atoms"].to_numpy()
+    expected = np.array([_decay_chain(t)[1] for t in times[:-1]])
+    assert_allclose(daughter[[0, 2, 5]], expected[[0, 2, 5]], rtol=1e-6)
+    assert np.all(np.diff(daughter) > 0.0), "ingrowth is monotonic"
+    assert np.all(daughter <= 1e20)
+
+
+def test_interpolate_zero_at_interval_end(
+    decay_tables: tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame],
+) -> None:
+    timestep, timestep_nuclide, nuclide = decay_tables
+    timestep_nuclide = timestep_nuclide.filter(
+        (pl.col("zai") == PARENT) | (pl.col("time_step_number") > 2),
+    )
+    actual = interpolate_nuclides(timestep, timestep_nuclide, nuclide, [500.0])
+    daughter = actual.filter(pl.col("zai") == DAUGHTER)["atoms"].item()
+    assert daughter == pytest.approx(0.5 * _decay_chain(1000.0)[1], rel=1e-6)
+
+
+def test_result_interpolate_nuclides(one_cell: Inventory) -> None:
+    collector = FullDataCollector()
+    collector.append(one_cell, material_id=1, case_id=1)
+    collector.append(one_cell, material_id=2, case_id=3)
+    result = collector.get_result()
+    steps = cooling_steps(result.timestep).collect()
+    times = steps.filter(material_id=1)["cooling_time"].to_list()
+    actual = result.interpolate_nuclides(times)
+    expected = (
+        result.timestep_nuclide.join(steps, on=["material_id", "case_id", "time_step_number"])
+        .select("material_id", "case_id", "cooling_time", "zai", *NUCLIDE_QUANTITIES)
+        .sort("material_id", "case_id", "cooling_time", "zai")
+    )
+    assert_frame_equal(actual, expected, check_dtypes=False, rel_tol=1e-5)
+    between = result.interpolate_nuclides([0.5 * (times[-2] + times[-1])])
+    assert between.height > 0
+    assert between.filter(pl.col("activity") < 0.0).is_empty()
+
+
+@pytest.mark.parametrize("with_chains", [False, True])
+def test_extrapolate_decay(
+    decay_tables: tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame],
+    with_chains: bool,  # noqa: FBT001
+) -> None:
+    chains = pl.DataFrame({"parent": [PARENT], "daughter": [DAUGHTER]}) if with_chains else None
+    times = [5000.0, 10000.0, 12000.0, 20000.0]
+    actual = extrapolate_decay(*decay_tables, times, chains=chains)
+    assert actual["cooling_time"].unique().to_list() == times[2:], "only after the last step"
+    assert actual["time_step_number"].unique().to_list() == [6, 7]
+    assert actual["synthetic"].all()
+    assert actual.schema["atoms"] == pl.Float32
+    parent = actual.filter(pl.col("zai") == PARENT)
+    expected = np.array([_decay_chain(t)[0] for t in times[2:]])
+    assert_allclose(parent["atoms"].to_numpy(), expected, rtol=1e-6)
+    assert_allclose(parent["activity"].to_numpy(), 2.0 * expected, rtol=1e-6)
+    assert_allclose(parent["error_bound"].to_numpy(), 0.0, atol=1e-6)
+    daughter = actual.filter(pl.col("zai") == DAUGHTER)
+    error_bound = daughter["error_bound"].to_numpy()
+    if with_chains:
+        expected = np.array([_decay_chain(t)[1] for t in times[2:]])
+        assert_allclose(daughter["atoms"].to_numpy(), expected, rtol=1e-6)
+        assert_allclose(error_bound, 0.0, atol=1e-6)
+    else:
+        assert_allclose(daughter["atoms"].to_numpy(), _decay_chain(10000.0)[1], rtol=1e-6)
+        assert np.all(error_bound > 0.0)
+        assert error_bound[1] > error_bound[0], "error grows with time"
+
+
+def test_extrapolate_without_previous_step(
+    decay_tables: tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame],
+) -> None:
+    timestep, timestep_nuclide, nuclide = decay_tables
+    actual = extrapolate_decay(
+        timestep.filter(time_step_number=1),
+        timestep_nuclide.filter(time_step_number=1),
+        nuclide,
+        [1000.0],
+    )
+    assert actual["error_bound"].is_null().all()
+    parent = actual.filter(pl.col("zai") == PARENT)["atoms"].item()
+    assert parent == pytest.approx(0.5e20, rel=1e-6)
+
+
+def test_result_extrapolate_decay(one_cell: Inventory) -> None:
+    collector = FullDataCollector()
+    collector.append(one_cell, material_id=1, case_id=1)
+    result = collector.get_result()
+    last_time = result.timestep["cooling_time"].max()
+    actual = result.extrapolate_decay([2.0 * last_time])  # type: ignore[operator]
+    last = result.timestep_nuclide.filter(
+        time_step_number=result.timestep["time_step_number"].max()
+    )
+    assert actual.height == last.height
+    assert actual["time_step_number"].unique().to_list() == [last["time_step_number"][0] + 1]
+    assert actual["activity"].sum() < last["activity"].sum()
+    assert (actual["activity"] <= last["activity"] * (1.0 + 1e-6)).all(), "no ingrowth"
+    assert actual["error_bound"].is_not_null().all()
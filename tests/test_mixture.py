@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import polars as pl
+import pytest
+
+from polars.testing import assert_frame_equal
+
+from xpypact.aggregation import NUCLIDE_QUANTITIES
+from xpypact.mixture import MixtureError, mix_table
+
+if TYPE_CHECKING:
+    from xpypact.collector import FullDataCollector
+
+
+def test_mix_table() -> None:
+    table = pl.DataFrame(
+        {
+            "material_id": [1, 1, 2, 2],
+            "case_id": [1, 1, 1, 1],
+            "time_step_number": [1, 1, 1, 1],
+            "zai": [10010, 10020, 10010, 260560],
+            "atoms": [1.0, 2.0, 3.0, 4.0],
+        },
+        schema_overrides={"atoms": pl.Float32},
+    )
+    composition = pl.DataFrame(
+        {"mixture": [10, 10, 20], "material": [1, 2, 2], "fraction": [0.25, 0.75, 1.0]},
+    )
+    actual = mix_table(table, composition)
+    assert actual.columns == table.columns
+    assert actual.schema == table.schema
+    assert actual.select("material_id", "zai", "atoms").rows() == [
+        (10, 10010, 2.5),
+        (10, 10020, 0.5),
+        (10, 260560, 3.0),
+        (20, 10010, 3.0),
+        (20, 260560, 4.0),
+    ]
+    assert_frame_equal(mix_table(table.lazy(), composition).collect(), actual)
+
+
+def test_mix_result(result: FullDataCollector.Result) -> None:
+    composition = pl.DataFrame(
+        {"mixture": [5, 5, 6], "material": [1, 2, 2], "fraction": [0.5, 0.5, 2.0]},
+    )
+    actual = result.mix(composition)
+    assert actual.rundata["material_id"].to_list() == [5, 6]
+    assert actual.timestep.schema == result.timestep.schema
+    source = result.timestep_nuclide.filter(material_id=1).drop("material_id")
+    mixed = actual.timestep_nuclide.filter(material_id=5).drop("material_id")
+    assert_frame_equal(mixed, source, rel_tol=1e-6)
+    doubled = actual.timestep_nuclide.filter(material_id=6).drop("material_id")
+    assert_frame_equal(
+        doubled,
+        source.with_columns(pl.col(NUCLIDE_QUANTITIES) * 2.0),
+        rel_tol=1e-6,
+    )
+    timestep = actual.timestep.filter(material_id=6)
+    expected = result.timestep.filter(material_id=2)
+    assert_frame_equal(
+        timestep.select("cooling_time", "flux"), expected.select("cooling_time", "flux")
+    )
+    assert_frame_equal(
+        timestep.select("activity", "mass"),
+        expected.select(pl.col("activity", "mass") * 2.0),
+        rel_tol=1e-6,
+    )
+    assert actual.timestep_gamma is not None
+    assert result.timestep_gamma is not None
+    assert actual.timestep_gamma.height == result.timestep_gamma.height
+    assert actual.nuclide is result.nuclide
+
+
+def test_mix_result_with_missing_component(result: FullDataCollector.Result) -> None:
+    composition = pl.DataFrame({"mixture": [1, 1], "material": [1, 3], "fraction": [0.5, 0.5]})
+    with pytest.raises(MixtureError, match=r"\[3\]"):
+        result.mix(composition)
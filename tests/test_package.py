@@ -3,12 +3,27 @@
 from __future__ import annotations
 
 import re
+import subprocess
+import sys
 
 from pathlib import Path
 from re import sub as substitute
 
+import pytest
+
+import xpypact
+
 from xpypact import __version__
 
+# modules which are slow to import and are not needed for light usage of xpypact
+HEAVY_MODULES = (
+    "concurrent.futures.process",
+    "duckdb",
+    "importlib.metadata",
+    "mckit_nuclides",
+    "polars",
+)
+
 
 def _find_version_from_project_toml() -> str:
     toml_path = Path(__file__).parent.parent / "pyproject.toml"
@@ -33,3 +48,33 @@ def test_package() -> None:
     """Check if only current version is installed in working environment."""
     version = _find_version_from_project_toml()
     assert __version__ == _normalize_version(version), "Run 'uv sync'"
+
+
+@pytest.mark.parametrize("module", ["xpypact", "xpypact.fluxes", "xpypact.inventory"])
+def test_import_is_light(module: str) -> None:
+    """Check if importing of a light module doesn't pull in heavy modules."""
+    code = (
+        f"import sys, {module}; "
+        f"print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)); "
+        "print('FISPACT_709_BINS' in vars(sys.modules['xpypact.fluxes']) "
+        "if 'xpypact.fluxes' in sys.modules else False)"
+    )
+    output = subprocess.run(  # noqa: S603 - the interpreter running the tests
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    assert output == ["[]", "False"]
+
+
+def test_lazy_attributes() -> None:
+    from xpypact.collector import FullDataCollector  # noqa: PLC0415
+    from xpypact.fluxes import FISPACT_709_BINS, fispact_709_bins  # noqa: PLC0415
+
+    assert xpypact.FullDataCollector is FullDataCollector
+    assert "Inventory" in dir(xpypact)
+    assert xpypact.__author__ in xpypact.__copyright__
+    with pytest.raises(AttributeError, match="has no attribute 'no_such_attribute'"):
+        _ = xpypact.no_such_attribute
+    assert FISPACT_709_BINS is fispact_709_bins()
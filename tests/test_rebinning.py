@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from numpy.testing import assert_allclose, assert_array_equal
+
+from xpypact.flux_bank import FluxBank
+from xpypact.fluxes import FISPACT_709_BINS, Fluxes, rebin_fluxes
+from xpypact.rebinning import RebinningError, overlap_matrix, rebin
+
+
+@pytest.mark.parametrize(
+    "source, target, conserve, expected",
+    [
+        ([1.0, 2.0, 4.0], [1.0, 4.0], "energy", [[1.0], [1.0]]),
+        ([1.0, 4.0], [1.0, 2.0, 4.0], "energy", [[1.0 / 3.0, 2.0 / 3.0]]),
+        ([1.0, 4.0], [1.0, 2.0, 4.0], "lethargy", [[0.5, 0.5]]),
+        ([1.0, 4.0], [2.0, 3.0], "energy", [[1.0 / 3.0]]),
+        ([0.0, 1.0, 2.0], [0.5, 1.5], "energy", [[0.5], [0.5]]),
+    ],
+)
+def test_overlap_matrix(source, target, conserve, expected) -> None:
+    actual = overlap_matrix(np.array(source), np.array(target), conserve)
+    assert_allclose(actual, expected)
+    assert not actual.flags.writeable
+
+
+def test_overlap_matrix_is_cached() -> None:
+    source = np.logspace(-5, 7, 101)
+    assert overlap_matrix(source, FISPACT_709_BINS) is overlap_matrix(
+        source.copy(), FISPACT_709_BINS
+    )
+
+
+@pytest.mark.parametrize(
+    "source, conserve",
+    [
+        ([1.0], "energy"),
+        ([2.0, 1.0], "energy"),
+        ([0.0, 1.0], "lethargy"),
+        ([1.0, 2.0], "area"),
+    ],
+)
+def test_overlap_matrix_bad_bins(source, conserve) -> None:
+    with pytest.raises(RebinningError):
+        overlap_matrix(np.array(source), np.array([1.0, 2.0]), conserve)
+
+
+@pytest.mark.parametrize("conserve", ["lethargy", "energy"])
+def test_rebin_batch(conserve) -> None:
+    source = FISPACT_709_BINS[np.r_[0:709:4, 709]]  # coarse groups with bounds from 709 bins
+    rng = np.random.default_rng(7)
+    values = rng.uniform(size=(5, source.size - 1))
+    actual = rebin(values, source, FISPACT_709_BINS, conserve)
+    assert actual.shape == (5, 709)
+    assert_allclose(actual.sum(axis=1), values.sum(axis=1))
+    for row, expected in zip(values, actual, strict=True):
+        assert_allclose(rebin(row, source, FISPACT_709_BINS, conserve), expected)
+    assert_allclose(rebin(actual, FISPACT_709_BINS, source, conserve), values)
+
+
+def test_rebin_wrong_size() -> None:
+    with pytest.raises(RebinningError, match="Cannot rebin 2 values"):
+        rebin(np.ones(2), np.array([1.0, 2.0]), np.array([1.0, 2.0]))
+
+
+def test_rebin_fluxes_and_bank() -> None:
+    source = np.array([1.0e-5, 1.0, 1.0e3, 1.0e9])
+    fluxes = Fluxes(source, np.array([1.0, 2.0, 3.0]), "test", 2.0)
+    actual = rebin_fluxes(fluxes)
+    assert actual.energy_bins is FISPACT_709_BINS
+    assert actual.comment == "test"
+    assert actual.norm == 2.0
+    assert actual.total == pytest.approx(6.0)
+    bank = FluxBank.from_fluxes([fluxes, fluxes]).rebin()
+    assert bank.energy_bins is FISPACT_709_BINS
+    assert_array_equal(bank.fluxes[1], actual.fluxes)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import msgspec as ms
+import numpy as np
+import pytest
+
+from numpy.testing import assert_allclose, assert_array_equal
+
+from xpypact.flux_bank import FluxBank
+from xpypact.fluxes import read_709_fluxes, read_arb_fluxes
+from xpypact.run_config import DIGEST_FILE, IrradiationStep, RunTemplate, write_run_directories
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+TEMPLATE = RunTemplate(
+    material="DENSITY 7.93\nMASS 1.0 1\nFE 100.0",
+    schedule=(
+        IrradiationStep(3.1536e7),
+        IrradiationStep(3600.0, 0.5),
+        IrradiationStep(60.0, 0.0),
+        IrradiationStep(86400.0, 0.0),
+    ),
+    nuclear_data={"ind_nuc": "/data/index", "xs_endf": "/data/xs"},
+    title="steel",
+)
+
+
+@pytest.fixture
+def bank_709(data: Path) -> FluxBank:
+    fluxes = read_709_fluxes(data / "fluxes_1")  # type: ignore[arg-type]
+    return FluxBank.from_fluxes(
+        [fluxes, fluxes, fluxes]
+    ).normalized()  # the totals are equal to 1.0
+
+
+def test_format_input() -> None:
+    expected = """CLOBBER
+JSON
+GETXS 1 709
+GETDECAY 1
+FISPACT
+* steel case
+DENSITY 7.93
+MASS 1.0 1
+FE 100.0
+FLUX 2.000000e+10
+TIME 3.153600e+07 SECS ATOMS
+FLUX 1.000000e+10
+TIME 3.600000e+03 SECS ATOMS
+FLUX 0.000000e+00
+ZERO
+TIME 6.000000e+01 SECS ATOMS
+FLUX 0.000000e+00
+TIME 8.640000e+04 SECS ATOMS
+END
+* END
+"""
+    assert TEMPLATE.format_input(2.0e10, "case") == expected
+    assert "GETXS -1 709\n" in TEMPLATE.format_input(1.0, arbitrary=True)
+    template = ms.structs.replace(TEMPLATE, library_groups=1102)
+    assert "GETXS -1 1102\n" in template.format_input(1.0, arbitrary=True)
+
+
+def test_format_files() -> None:
+    assert TEMPLATE.format_files() == "ind_nuc /data/index\nxs_endf /data/xs\nfluxes fluxes\n"
+    assert TEMPLATE.format_files(arbitrary=True).endswith("arb_flux arb_flux\n")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_write_run_directories(tmp_path: Path, bank_709: FluxBank, workers: int) -> None:
+    written = write_run_directories(tmp_path, bank_709, TEMPLATE, workers=workers)
+    assert written == [tmp_path / name for name in ("0", "1", "2")]
+    for i, directory in enumerate(written):
+        actual = read_709_fluxes(directory / "fluxes")  # type: ignore[arg-type]
+        assert_allclose(actual.fluxes, bank_709.fluxes[i], rtol=1e-5)
+        assert (directory / "files").read_text() == TEMPLATE.format_files()
+        deck = (directory / "inventory.i").read_text()
+        assert "FLUX 1.000000e+00\n" in deck
+        assert (directory / DIGEST_FILE).exists()
+    assert write_run_directories(tmp_path, bank_709, TEMPLATE, workers=workers) == []
+    bank_709.fluxes[1] *= 2.0
+    assert write_run_directories(tmp_path, bank_709, TEMPLATE, workers=workers) == [tmp_path / "1"]
+    assert "FLUX 2.000000e+00\n" in (tmp_path / "1" / "inventory.i").read_text()
+    changed = RunTemplate(TEMPLATE.material, TEMPLATE.schedule[:1], TEMPLATE.nuclear_data)
+    assert len(write_run_directories(tmp_path, bank_709, changed, workers=workers)) == 3
+
+
+def test_write_run_directories_arbitrary(tmp_path: Path, data: Path) -> None:
+    fluxes = read_arb_fluxes(data / "arb_flux_2")  # type: ignore[arg-type]
+    bank = FluxBank.from_fluxes([fluxes])
+    (directory,) = write_run_directories(tmp_path, bank, TEMPLATE, names=["arb"])
+    loaded = read_arb_fluxes(directory / "arb_flux")  # type: ignore[arg-type]
+    assert_array_equal(loaded.energy_bins, fluxes.energy_bins)
+    assert_array_equal(loaded.fluxes, fluxes.fluxes)
+    assert fluxes.fluxes.size != 709
+    assert "GETXS -1 709\n" in (directory / "inventory.i").read_text()
+    with pytest.raises(ValueError, match="Expected 1 names, got 2"):
+        write_run_directories(tmp_path, bank, TEMPLATE, names=["a", "b"])
+    assert np.isclose(bank.totals[0], fluxes.total)
+
+
+def test_write_run_directories_arbitrary_709_groups(tmp_path: Path) -> None:
+    energy_bins = np.logspace(-5, 7, 710)
+    bank = FluxBank(energy_bins, np.ones((1, 709)), ["arb"], np.ones(1))
+    (directory,) = write_run_directories(tmp_path, bank, TEMPLATE)
+    assert (directory / "arb_flux").exists()
+    assert not (directory / "fluxes").exists()
+    assert (directory / "files").read_text().endswith("arb_flux arb_flux\n")
+    deck = (directory / "inventory.i").read_text()
+    assert "GETXS -1 709\n" in deck
+    assert "GETXS 1 709\n" not in deck
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import sys
+
+from xpypact.collector import FullDataCollector
+from xpypact.runner import FispactJob, FispactRunner
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from xpypact.inventory import Inventory
+
+# FISPACT stub: copies the JSON given in file "source" to <input>.json,
+# fails as many times as there are lines in the file "failures"
+STUB = """
+import shutil, sys
+from pathlib import Path
+
+input_name, files_name = sys.argv[1:]
+assert Path(files_name).exists()
+failures = Path("failures")
+if failures.exists():
+    lines = failures.read_text().splitlines()
+    if lines:
+        failures.write_text("\\n".join(lines[1:]))
+        sys.exit("Failure on demand")
+shutil.copy(Path("source").read_text(), input_name + ".json")
+"""
+
+
+def _make_jobs(tmp_path: Path, source: Path, failures: list[int]) -> list[FispactJob]:
+    jobs = []
+    for case_id, failures_number in enumerate(failures, start=1):
+        directory = tmp_path / f"case-{case_id}"
+        directory.mkdir(parents=True)
+        (directory / "files").touch()
+        (directory / "source").write_text(str(source))
+        (directory / "failures").write_text("\n".join(["x"] * failures_number))
+        jobs.append(FispactJob(directory, material_id=1, case_id=case_id))
+    return jobs
+
+
+def _runner(tmp_path: Path, **kwargs: int) -> FispactRunner:
+    stub = tmp_path / "fispact_stub.py"
+    stub.write_text(STUB)
+    return FispactRunner(command=[sys.executable, str(stub)], **kwargs)  # type: ignore[arg-type]
+
+
+def test_runner_feeds_collector(tmp_path: Path, data: Path) -> None:
+    jobs = _make_jobs(tmp_path, data / "Ag-1.json", [0, 1, 0])
+    collector = FullDataCollector()
+    results = _runner(tmp_path, max_workers=2, retries=1).run(jobs, collector)
+    assert all(r.ok for r in results)
+    assert sorted((r.job.case_id, r.attempts) for r in results) == [(1, 1), (2, 2), (3, 1)]
+    assert sorted(collector.rundata["case_id"].to_list()) == [1, 2, 3]
+    assert (jobs[0].directory / "inventory.json").exists()
+
+
+def test_runner_reports_failures(tmp_path: Path, data: Path) -> None:
+    jobs = _make_jobs(tmp_path, data / "Ag-1.json", [0, 3])
+    jobs.append(FispactJob(tmp_path / "case-1", case_id=3))  # the same directory again
+    (tmp_path / "bad.json").write_text("{")
+    bad = _make_jobs(tmp_path / "bad", tmp_path / "bad.json", [0])
+    received: list[tuple[int, Inventory]] = []
+    results = _runner(tmp_path, retries=1).run(
+        [*jobs, *bad], lambda job, inventory: received.append((job.case_id, inventory))
+    )
+    failed = {r.job.directory.name: r for r in results if not r.ok}
+    assert sorted(failed) == ["case-1", "case-2"]
+    assert failed["case-1"].job is bad[0]
+    assert "DecodeError" in failed["case-1"].error
+    assert failed["case-2"].attempts == 2
+    assert sorted(case_id for case_id, _ in received) == [1, 3]
+    results = _runner(tmp_path).run(jobs[1:2], received.append)
+    assert results[0].error == "Exit code 1: Failure on demand"